@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the CLI entry points.
+
+Runs each entry point under `python -X importtime`, subtracts the modules the
+bare interpreter already imports, and checks the remaining import cost against
+a per-entry-point budget. Also fails if a startup path pulls in the HTTP/TLS
+stack, which must only be imported on the first network call.
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --runs 10 --scale 2.0
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (python args, import budget in ms)
+ENTRY_POINTS = {
+    "deploy.py --help": (["deploy.py", "--help"], 80),
+    "check_server_status.py --help": (["check_server_status.py", "--help"], 60),
+    "import zeabur_api": (["-c", "import zeabur_api"], 30),
+    "import deploy_state": (["-c", "import deploy_state"], 30),
+}
+
+# Modules that must stay out of every startup path.
+FORBIDDEN = ("requests", "urllib3", "urllib.request", "http.client", "ssl")
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def run_importtime(py_args: list) -> tuple:
+    """Run once; return (wall_ms, {top_level_module: cumulative_us}, all_modules)."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *py_args],
+        cwd=HERE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    top_level = {}
+    modules = set()
+    for line in proc.stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if not m:
+            continue
+        cumulative, indent, name = int(m.group(2)), m.group(3), m.group(4)
+        modules.add(name)
+        if not indent:
+            top_level[name] = cumulative
+    return wall_ms, top_level, modules
+
+
+def measure(py_args: list, baseline: set, runs: int) -> dict:
+    walls, totals = [], []
+    heaviest = {}
+    modules = set()
+    for _ in range(runs):
+        wall_ms, top_level, seen = run_importtime(py_args)
+        own = {k: v for k, v in top_level.items() if k not in baseline}
+        walls.append(wall_ms)
+        totals.append(sum(own.values()) / 1000)
+        for k, v in own.items():
+            heaviest[k] = min(v, heaviest.get(k, v))
+        modules |= seen
+    return {
+        "wall_ms": statistics.median(walls),
+        "import_ms": statistics.median(totals),
+        "heaviest": sorted(heaviest.items(), key=lambda kv: kv[1], reverse=True)[:5],
+        "forbidden": sorted(m for m in modules if m in FORBIDDEN),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Guard CLI startup time against per-entry-point budgets.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per entry point (median is used, default: 5)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiply every budget (for slow CI machines, default: 1.0)")
+    args = parser.parse_args()
+
+    # Whatever the bare interpreter imports (site, encodings, ...) is not ours.
+    _, _, baseline = run_importtime(["-c", "pass"])
+
+    failed = False
+    for name, (py_args, budget_ms) in ENTRY_POINTS.items():
+        result = measure(py_args, baseline, args.runs)
+        budget = budget_ms * args.scale
+        over = result["import_ms"] > budget
+        status = "FAIL" if over or result["forbidden"] else "ok"
+        failed = failed or status == "FAIL"
+        print(f"{status:4} {name}: imports {result['import_ms']:.1f}ms (budget {budget:.0f}ms), "
+              f"wall {result['wall_ms']:.1f}ms")
+        for mod, us in result["heaviest"]:
+            print(f"       {us / 1000:7.1f}ms  {mod}")
+        if result["forbidden"]:
+            print(f"       forbidden at startup: {', '.join(result['forbidden'])}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
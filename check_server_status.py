@@ -5,15 +5,18 @@ Token-only Zeabur status checker with endpoint fallback.
 Usage:
   python check_server_status.py --env-file .env
   python check_server_status.py --zeabur-token sk-xxx --service-id service-xxxxxxxx
+  python check_server_status.py --env-file .env --bot my-bot
+  python check_server_status.py --env-file .env --bot my-bot --quick
+  python check_server_status.py --accounts team-a.env,team-b.env,sk-yyy
 """
 
 import argparse
 import json
 import os
 import sys
-import urllib.error
-import urllib.request
+import time
 
+from deploy_state import DEFAULT_STATE_FILE, DeployState
 
 DEFAULT_ENDPOINTS = [
     "https://api.zeabur.com/graphql",
@@ -21,35 +24,106 @@ DEFAULT_ENDPOINTS = [
 ]
 
 
-def load_env_file(path: str):
+def read_env_file(path: str) -> dict:
+    values = {}
     if not path or not os.path.exists(path):
-        return
+        return values
     with open(path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line or line.startswith("#") or "=" not in line:
                 continue
             key, value = line.split("=", 1)
-            os.environ[key.strip()] = value.strip()
+            values[key.strip()] = value.strip()
+    return values
+
+
+def load_env_file(path: str):
+    os.environ.update(read_env_file(path))
 
 
-def post_graphql(endpoint: str, token: str, query: str):
-    req = urllib.request.Request(
-        endpoint,
-        data=json.dumps({"query": query}).encode("utf-8"),
-        method="POST",
-    )
+def graphql_request(endpoint: str, token: str, body: dict):
+    # Deferred: urllib.request pulls in http.client/ssl (~100ms cold).
+    import urllib.request
+
+    from json_stream import accept_encoding
+
+    req = urllib.request.Request(endpoint, data=json.dumps(body).encode("utf-8"), method="POST")
     req.add_header("Authorization", f"Bearer {token}")
     req.add_header("Content-Type", "application/json")
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        return resp.status, json.loads(resp.read().decode("utf-8", "replace"))
+    req.add_header("Accept-Encoding", accept_encoding())
+    return req
+
+
+def read_body(resp) -> bytes:
+    from json_stream import decoded_chunks
+
+    return b"".join(decoded_chunks(resp, resp.headers.get("Content-Encoding")))
+
+
+def post_graphql(endpoint: str, token: str, operation: str, variables: dict = None):
+    """POST a named operation (zeabur_ops.OPERATIONS). Returns (status, parsed JSON)."""
+    import urllib.error
+    import urllib.request
+
+    from zeabur_ops import execute
+
+    status = None
+
+    def post(body):
+        nonlocal status
+        req = graphql_request(endpoint, token, body)
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                status = resp.status
+                return json.loads(read_body(resp).decode("utf-8", "replace"))
+        except urllib.error.HTTPError as e:
+            # GraphQL request errors (e.g. unknown persisted query) come back as 400/422.
+            if e.code not in (400, 422):
+                raise
+            text = read_body(e).decode("utf-8", "replace")
+            try:
+                data = json.loads(text)
+            except ValueError:
+                data = None
+            if not isinstance(data, dict) or "errors" not in data:
+                raise RuntimeError(f"HTTP {e.code} {text[:300]}")
+            status = e.code
+            return data
+
+    data = execute(post, endpoint, operation, variables)
+    return status, data
+
+
+def stream_graphql(endpoint: str, token: str, operation: str, stream_path: tuple, variables: dict = None):
+    """Yield elements of the array at stream_path while the response is still downloading.
 
+    The document is always sent in full (no hash-only retry mid-stream).
+    """
+    import urllib.request
+
+    from json_stream import JSONStreamSplitter, decoded_chunks
+    from zeabur_ops import request_body
+
+    body = request_body(endpoint, operation, variables, force_query=True)
+    splitter = JSONStreamSplitter([stream_path])
+    with urllib.request.urlopen(graphql_request(endpoint, token, body), timeout=30) as resp:
+        for chunk in decoded_chunks(resp, resp.headers.get("Content-Encoding")):
+            for _, item in splitter.feed(chunk):
+                yield item
+    splitter.close()
+    errors = splitter.captured.get(("errors",))
+    if errors:
+        raise RuntimeError(errors[0].get("message"))
+
+
+def gql_with_fallback(token: str, operation: str, endpoints, variables: dict = None):
+    import urllib.error
 
-def gql_with_fallback(token: str, query: str, endpoints):
     last_error = None
     for endpoint in endpoints:
         try:
-            _, data = post_graphql(endpoint, token, query)
+            _, data = post_graphql(endpoint, token, operation, variables)
             return endpoint, data
         except urllib.error.HTTPError as e:
             body = e.read().decode("utf-8", "replace")
@@ -63,90 +137,309 @@ def gql_with_fallback(token: str, query: str, endpoints):
     raise RuntimeError(last_error or "All endpoints failed")
 
 
+def endpoint_schema(endpoint: str, token: str):
+    """Cached schema for endpoint (introspected at most once per TTL), or None."""
+    from zeabur_schema import load_schema
+
+    try:
+        return load_schema(lambda: post_graphql(endpoint, token, "Introspect")[1], endpoint)
+    except Exception:
+        return None
+
+
+def check_token(token: str, endpoints) -> tuple:
+    """Verify the token on the first reachable endpoint. Returns (endpoint, schema, username).
+
+    The viewer field (me/user) is picked from that endpoint's schema.
+    """
+    from zeabur_schema import viewer_operation
+
+    last_error = None
+    for endpoint in endpoints:
+        schema = endpoint_schema(endpoint, token)
+        op = viewer_operation(schema)
+        try:
+            _, data = gql_with_fallback(token, op, [endpoint])
+        except RuntimeError as e:
+            last_error = str(e)
+            continue
+        if "errors" in data:
+            raise RuntimeError(f"token check failed: {data['errors'][0].get('message')}")
+        return endpoint, schema, data["data"][op.lower()]["username"]
+    raise RuntimeError(last_error or "All endpoints failed")
+
+
+def server_extras(server: dict) -> str:
+    from zeabur_schema import SERVER_OPTIONAL_FIELDS
+
+    extras = [f"{k}: {server[k]}" for k in SERVER_OPTIONAL_FIELDS if server.get(k) is not None]
+    return "".join(f" | {e}" for e in extras)
+
+
 def normalize_service_id(value: str):
     if not value:
         return ""
     return value.removeprefix("service-").strip()
 
 
+def resolve_accounts(spec: str) -> list:
+    """Parse --accounts: comma-separated env files and/or raw tokens -> [(label, token)].
+
+    Env files are labelled by file name, or by relative path when two share a
+    name (a/.env, b/.env); any remaining duplicate label gets a #N suffix.
+    """
+    items = [x.strip() for x in spec.split(",") if x.strip()]
+    basenames = [os.path.basename(item) for item in items if os.path.exists(item)]
+    accounts, used = [], set()
+    for item in items:
+        if os.path.exists(item):
+            token = read_env_file(item).get("ZEABUR_TOKEN")
+            if not token:
+                raise ValueError(f"{item}: no ZEABUR_TOKEN")
+            label = os.path.basename(item)
+            if basenames.count(label) > 1:
+                label = os.path.relpath(item)
+        else:
+            label, token = f"{item[:6]}***", item
+        base, n = label, 1
+        while label in used:
+            n += 1
+            label = f"{base}#{n}"
+        used.add(label)
+        accounts.append((label, token))
+    return accounts
+
+
+def fetch_account(label: str, token: str, project_regions: dict = None) -> dict:
+    """Query one account (own endpoint selection) and build its topology.
+
+    project_regions (see DeployState.project_regions) places projects on their
+    servers when the schema-less Projects listing has no region.
+    """
+    from topology import Topology
+
+    start = time.time()
+    result = {"label": label, "endpoint": None, "username": None, "topology": None, "timings": {}, "error": None}
+    try:
+        from zeabur_schema import projects_operation, servers_operation
+
+        endpoint, schema, username = check_token(token, DEFAULT_ENDPOINTS)
+        result["endpoint"] = endpoint
+        result["username"] = username
+        result["timings"]["me"] = time.time() - start
+
+        t = time.time()
+        _, servers_data = gql_with_fallback(token, servers_operation(schema), [endpoint])
+        if "errors" in servers_data:
+            raise RuntimeError(f"servers query error: {servers_data['errors'][0].get('message')}")
+        result["timings"]["servers"] = time.time() - t
+
+        t = time.time()
+        edges = list(stream_graphql(endpoint, token, projects_operation(schema), ("data", "projects", "edges")))
+        result["timings"]["projects"] = time.time() - t
+        result["topology"] = Topology.build(servers_data["data"].get("servers", []), [e["node"] for e in edges],
+                                            project_regions)
+    except Exception as e:
+        result["error"] = str(e)
+    result["timings"]["total"] = time.time() - start
+    return result
+
+
+def multi_account_status(accounts: list, args):
+    """Query every account concurrently and print one merged view."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    state = DeployState(args.state_file or os.environ.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE)
+    regions = state.project_regions()
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=len(accounts)) as pool:
+        results = list(pool.map(lambda a: fetch_account(*a, regions), accounts))
+    wall = time.time() - start
+
+    print(f"Accounts: {len(results)} (wall {wall:.2f}s, slowest {max(r['timings']['total'] for r in results):.2f}s)")
+    width = max(len(r["label"]) for r in results)
+    for r in results:
+        timings = r["timings"]
+        if r["error"]:
+            print(f"- {r['label']:<{width}} | ERROR: {r['error']} ({timings['total']:.2f}s)")
+            continue
+        topo = r["topology"]
+        phases = " ".join(f"{k}={timings[k] * 1000:.0f}ms" for k in ("me", "servers", "projects"))
+        print(f"- {r['label']:<{width}} | {r['username']} | {r['endpoint']} | "
+              f"{len(topo.servers)} server(s), {len(topo.projects)} project(s), {len(topo.services)} service(s) | "
+              f"{phases} total={timings['total']:.2f}s")
+
+    print("\nServices:")
+    for r in results:
+        if r["error"]:
+            continue
+        for project in r["topology"].projects.values():
+            for svc in project.services:
+                domains = ",".join(d.domain for d in svc.domains) or "(none)"
+                print(f"- [{r['label']}] {project.name} | service {svc.id} | {svc.name} | {svc.status} | domains: {domains}")
+
+    if args.save_topology:
+        from urllib.parse import quote
+
+        root, ext = os.path.splitext(args.save_topology)
+        for r in results:
+            if r["topology"]:
+                # Labels are unique; percent-encoding keeps them unique as file names.
+                path = f"{root}.{quote(r['label'], safe='')}{ext or '.json'}"
+                r["topology"].save(path)
+                print(f"Topology snapshot saved to {path}")
+
+    target_sid = normalize_service_id(args.service_id or "")
+    if target_sid:
+        print(f"\nTarget service lookup: {target_sid}")
+        for r in results:
+            svc = r["topology"].service(target_sid) if r["topology"] else None
+            if svc:
+                print(f"account: {r['label']} ({r['username']})")
+                print(f"project_id: {svc.project.id}")
+                print(f"service_status: {svc.status}")
+                break
+        else:
+            print("Result: service not found in any account.")
+    if any(r["error"] for r in results):
+        sys.exit(1)
+
+
+def quick_status(token: str, args):
+    """Fast read-only path: resolve the target locally and issue a single query."""
+    state = DeployState(args.state_file or os.environ.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE)
+    bot = state.get(args.bot) if args.bot else None
+    if args.bot and not bot:
+        print(f"Bot '{args.bot}' not found in {state.path}")
+        sys.exit(1)
+    target_sid = normalize_service_id(args.service_id or (bot or {}).get("service_id") or "")
+    if not target_sid:
+        print("Error: --quick needs --bot or --service-id.")
+        sys.exit(1)
+    bot = bot or state.by_service_id(target_sid) or {}
+
+    _, data = gql_with_fallback(token, "ServiceStatus", DEFAULT_ENDPOINTS, {"id": target_sid})
+    if "errors" in data:
+        print(f"Error: {data['errors'][0].get('message')}")
+        sys.exit(1)
+    svc = data["data"]["service"]
+    label = bot.get("name") or target_sid
+    print(f"{label} | {svc.get('name')} | {svc.get('status')} | {bot.get('domain') or '(no domain)'}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Check Zeabur server/project/service status via API token only.")
     parser.add_argument("--zeabur-token", help="Zeabur API token (sk-xxx)")
     parser.add_argument("--env-file", default=".env", help="Path to .env file (default: .env)")
     parser.add_argument("--service-id", help="Optional service id. Supports both service-xxxx and raw _id.")
+    parser.add_argument("--bot", help="Optional bot name from the deployment state store.")
+    parser.add_argument("--state-file", help=f"Deployment state store (default: OPENCLAW_STATE_FILE or {DEFAULT_STATE_FILE})")
+    parser.add_argument("--save-topology", metavar="PATH",
+                        help="Write the account topology snapshot (JSON) for reuse by other tools.")
+    parser.add_argument("--quick", action="store_true",
+                        help="Only report the target service status (one request, no account listing).")
+    parser.add_argument("--accounts",
+                        help="Comma-separated env files and/or tokens; queries every account concurrently.")
     args = parser.parse_args()
 
+    if args.accounts:
+        try:
+            accounts = resolve_accounts(args.accounts)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if not accounts:
+            print("Error: --accounts is empty.")
+            sys.exit(1)
+        multi_account_status(accounts, args)
+        return
+
     load_env_file(args.env_file)
     token = args.zeabur_token or os.environ.get("ZEABUR_TOKEN")
     if not token:
         print("Error: missing ZEABUR_TOKEN (set in .env or --zeabur-token).")
         sys.exit(1)
 
-    # Step 1: verify token and pick reachable endpoint
-    endpoint, me_data = gql_with_fallback(token, "query{me{username}}", DEFAULT_ENDPOINTS)
-    if "errors" in me_data:
-        print(f"Error: token check failed: {me_data['errors'][0].get('message')}")
+    if args.quick:
+        quick_status(token, args)
+        return
+
+    from zeabur_schema import projects_operation, servers_operation
+
+    # Step 1: verify token and pick reachable endpoint (viewer field chosen from the cached schema)
+    try:
+        endpoint, schema, username = check_token(token, DEFAULT_ENDPOINTS)
+    except RuntimeError as e:
+        print(f"Error: {e}")
         sys.exit(1)
-    username = me_data["data"]["me"]["username"]
     print(f"API endpoint: {endpoint}")
     print(f"Token owner: {username}")
 
-    # Step 2: dedicated servers (server-level state in schema is not stable across versions)
-    _, servers_data = gql_with_fallback(token, "query{servers{_id name ip}}", [endpoint])
+    # Step 2: dedicated servers (optional fields only where this endpoint's schema has them)
+    _, servers_data = gql_with_fallback(token, servers_operation(schema), [endpoint])
     if "errors" in servers_data:
         print(f"Servers query error: {servers_data['errors'][0].get('message')}")
         sys.exit(1)
     servers = servers_data["data"].get("servers", [])
     print(f"\nDedicated servers: {len(servers)}")
     for s in servers:
-        print(f"- {s.get('_id')} | {s.get('name')} | {s.get('ip')}")
-
-    # Step 3: projects + service runtime status
-    projects_query = (
-        "query{projects{edges{node{_id name "
-        "services{_id name status domains{domain}} "
-        "environments{_id name}}}}}"
-    )
-    _, projects_data = gql_with_fallback(token, projects_query, [endpoint])
-    if "errors" in projects_data:
-        print(f"Projects query error: {projects_data['errors'][0].get('message')}")
+        print(f"- {s.get('_id')} | {s.get('name')} | {s.get('ip')}{server_extras(s)}")
+
+    # Step 3: projects + service runtime status (printed as each edge arrives)
+    print("\nProjects:")
+    edges = []
+    try:
+        for edge in stream_graphql(endpoint, token, projects_operation(schema), ("data", "projects", "edges")):
+            edges.append(edge)
+            p = edge["node"]
+            envs = p.get("environments", [])
+            env_label = ",".join([f"{e.get('_id')}({e.get('name')})" for e in envs]) if envs else "(none)"
+            print(f"- {p.get('_id')} | {p.get('name')} | envs: {env_label}")
+            for svc in p.get("services", []):
+                domains = [d.get("domain") for d in (svc.get("domains") or []) if d.get("domain")]
+                domains_label = ",".join(domains) if domains else "(none)"
+                print(f"  service {svc.get('_id')} | {svc.get('name')} | {svc.get('status')} | domains: {domains_label}")
+    except Exception as e:
+        print(f"Projects query error: {e}")
         sys.exit(1)
+    print(f"({len(edges)} project(s))")
 
-    edges = projects_data["data"]["projects"]["edges"]
-    print(f"\nProjects: {len(edges)}")
-    for edge in edges:
-        p = edge["node"]
-        envs = p.get("environments", [])
-        env_label = ",".join([f"{e.get('_id')}({e.get('name')})" for e in envs]) if envs else "(none)"
-        print(f"- {p.get('_id')} | {p.get('name')} | envs: {env_label}")
-        for svc in p.get("services", []):
-            domains = [d.get("domain") for d in (svc.get("domains") or []) if d.get("domain")]
-            domains_label = ",".join(domains) if domains else "(none)"
-            print(f"  service {svc.get('_id')} | {svc.get('name')} | {svc.get('status')} | domains: {domains_label}")
-
-    # Step 4: optional target service lookup
-    target_sid = normalize_service_id(args.service_id or "")
+    from topology import Topology
+
+    state = DeployState(args.state_file or os.environ.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE)
+    topo = Topology.build(servers, [edge["node"] for edge in edges], state.project_regions())
+    if args.save_topology:
+        topo.save(args.save_topology)
+        print(f"Topology snapshot saved to {args.save_topology}")
+
+    # Step 4: optional target service lookup (O(1) via state store + topology indexes)
+    bot = None
+    if args.bot:
+        bot = state.get(args.bot)
+        if not bot:
+            print(f"\nBot '{args.bot}' not found in {state.path}")
+            sys.exit(1)
+    target_sid = normalize_service_id(args.service_id or (bot or {}).get("service_id") or "")
     if not target_sid:
         return
 
     print(f"\nTarget service lookup: {target_sid}")
-    found = False
-    for edge in edges:
-        p = edge["node"]
-        env_id = p.get("environments", [{}])[0].get("_id") if p.get("environments") else None
-        for svc in p.get("services", []):
-            if svc.get("_id") == target_sid:
-                found = True
-                print(f"project_id: {p.get('_id')}")
-                print(f"project_name: {p.get('name')}")
-                print(f"service_name: {svc.get('name')}")
-                print(f"service_status: {svc.get('status')}")
-                print(f"environment_id: {env_id or '(none)'}")
-                break
-        if found:
-            break
-    if not found:
+    bot = bot or state.by_service_id(target_sid)
+    svc = topo.service(target_sid)
+    if not svc:
+        if bot:
+            print(f"Warning: state record for '{bot['name']}' is stale.")
         print("Result: service not found in current token scope.")
+        return
+    env = svc.environment
+    if bot:
+        print(f"bot_name: {bot['name']}")
+    print(f"project_id: {svc.project.id}")
+    print(f"project_name: {svc.project.name}")
+    print(f"service_name: {svc.name}")
+    print(f"service_status: {svc.status}")
+    print(f"environment_id: {env.id if env else '(none)'}")
+    print(f"domains: {','.join(d.domain for d in svc.domains) or '(none)'}")
 
 
 if __name__ == "__main__":
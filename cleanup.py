@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Find and remove orphaned OpenClaw projects left behind by failed deploys.
+
+A project is a candidate when its name matches --name-prefix, it is not
+referenced by the local state store (or the legacy PROJECT_ID in .env), and
+it looks abandoned: no service is RUNNING, or no service has a domain. Bots
+in the state store are never touched.
+
+By default only the plan is printed; pass --yes to delete. Deletion runs
+concurrently (bounded by --concurrency) and each API call is retried with
+backoff: domains are removed first, then services, then the project.
+
+Usage:
+    python cleanup.py --env-file .env                 # show plan
+    python cleanup.py --env-file .env --yes --concurrency 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from check_server_status import load_env_file
+from deploy_state import DEFAULT_STATE_FILE, DeployState
+
+
+def orphan_reasons(project: dict) -> list:
+    services = project.get("services") or []
+    reasons = []
+    if not services:
+        reasons.append("no services")
+    elif not any(s.get("status") == "RUNNING" for s in services):
+        reasons.append("no service RUNNING")
+    if not any(s.get("domains") for s in services):
+        reasons.append("no domain")
+    return reasons
+
+
+def find_candidates(projects: list, known_project_ids: set, name_prefix: str = "openclaw") -> list:
+    """Return [(project, reasons)] for projects that look orphaned."""
+    candidates = []
+    for p in projects:
+        if p["_id"] in known_project_ids or not (p.get("name") or "").startswith(name_prefix):
+            continue
+        reasons = orphan_reasons(p)
+        if reasons:
+            candidates.append((p, reasons))
+    return candidates
+
+
+def with_retries(fn, *args, attempts: int = 3, backoff: float = 1.0):
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn(*args)
+        except Exception:
+            if attempt == attempts:
+                raise
+            time.sleep(backoff * 2 ** (attempt - 1))
+
+
+def delete_project_tree(client, project: dict, attempts: int = 3) -> dict:
+    """Remove domains, services and the project itself. Returns a result record."""
+    done = []
+    try:
+        env = (project.get("environments") or [{}])[0].get("_id")
+        for svc in project.get("services") or []:
+            for d in svc.get("domains") or []:
+                if d.get("domain"):
+                    with_retries(client.remove_domain, d["domain"], attempts=attempts)
+                    done.append(f"domain {d['domain']}")
+            if env:
+                with_retries(client.delete_service, svc["_id"], env, attempts=attempts)
+                done.append(f"service {svc['_id']}")
+        with_retries(client.delete_project, project["_id"], attempts=attempts)
+        done.append(f"project {project['_id']}")
+        return {"project": project, "ok": True, "done": done, "error": None}
+    except Exception as e:
+        return {"project": project, "ok": False, "done": done, "error": str(e)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean up orphaned OpenClaw projects, services and domains.")
+    parser.add_argument("--zeabur-token", help="Zeabur API token (sk-xxx)")
+    parser.add_argument("--env-file", default=".env", help="Path to .env file (default: .env)")
+    parser.add_argument("--state-file", help=f"Deployment state store (default: OPENCLAW_STATE_FILE or {DEFAULT_STATE_FILE})")
+    parser.add_argument("--name-prefix", default="openclaw", help="Only consider projects whose name starts with this (default: openclaw)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Projects deleted in parallel (default: 4)")
+    parser.add_argument("--retries", type=int, default=3, help="Attempts per API call (default: 3)")
+    parser.add_argument("--allow-empty-state", action="store_true",
+                        help="Proceed even if the state store has no bots (every matching project is unknown)")
+    parser.add_argument("--yes", action="store_true", help="Actually delete (default: print the plan only)")
+    args = parser.parse_args()
+
+    load_env_file(args.env_file)
+    token = args.zeabur_token or os.environ.get("ZEABUR_TOKEN")
+    if not token:
+        print("Error: missing ZEABUR_TOKEN (set in .env or --zeabur-token).")
+        sys.exit(1)
+
+    state = DeployState(args.state_file or os.environ.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE)
+    known = {b["project_id"] for b in state.all() if b.get("project_id")}
+    if os.environ.get("PROJECT_ID"):
+        known.add(os.environ["PROJECT_ID"])  # legacy .env deploy not migrated to the store yet
+    if not known and not args.allow_empty_state:
+        print(f"Error: {state.path} has no bots; refusing to treat every project as orphaned.")
+        print("       Pass --allow-empty-state if that is really intended.")
+        sys.exit(1)
+
+    from zeabur_api import ZeaburClient
+
+    client = ZeaburClient(token)
+    projects = client.list_projects()
+    candidates = find_candidates(projects, known, args.name_prefix)
+
+    print(f"Projects: {len(projects)} total, {len(known)} known, {len(candidates)} orphan candidate(s)")
+    for p, reasons in candidates:
+        services = p.get("services") or []
+        domains = [d["domain"] for s in services for d in (s.get("domains") or []) if d.get("domain")]
+        print(f"- {p['_id']} | {p.get('name')} | {len(services)} service(s) | "
+              f"domains: {','.join(domains) or '(none)'} | {'; '.join(reasons)}")
+    if not candidates:
+        return
+    if not args.yes:
+        print("\nPlan only. Re-run with --yes to delete.")
+        return
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, min(args.concurrency, len(candidates)))) as pool:
+        results = list(pool.map(lambda c: delete_project_tree(client, c[0], args.retries), candidates))
+    failed = [r for r in results if not r["ok"]]
+    for r in results:
+        p = r["project"]
+        if r["ok"]:
+            print(f"  OK   {p['_id']} ({len(r['done'])} object(s) removed)")
+        else:
+            print(f"  FAIL {p['_id']}: {r['error']} (removed before failure: {', '.join(r['done']) or 'nothing'})")
+    print(f"\nDeleted {len(results) - len(failed)}/{len(results)} project(s) in {time.time() - start:.1f}s")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Long-running OpenClaw controller: warm API connections, cached topology,
+deploy/update/status jobs over a local HTTP API, and a reconcile loop.
+
+The API listens on a Unix socket (default) or 127.0.0.1:PORT; on a TCP port
+a bearer token is always required (one is generated and printed if none is
+given) and POST bodies must be application/json. Status reads
+are served from the cached topology; deploy/update jobs run deploy.main()
+in-process on a single worker thread (one mutation at a time), so the
+endpoint choice and pooled connections stay warm between jobs. Each job
+reads its settings from its own copy of the controller's launch environment
+minus per-bot settings (os.environ is never touched); the controller's own
+.env is never exported to jobs. A deploy job for a bot already in the state
+store is rejected unless its args include --force-new; use an update job.
+
+Every --interval seconds the reconcile loop refreshes the topology and
+compares each bot in the state store with what Zeabur reports: service
+missing, not RUNNING, or domain detached. With --heal, bots whose service
+is not RUNNING are restarted (at most once per --heal-cooldown).
+
+API:
+    GET  /healthz
+    GET  /status                 all bots (cached)
+    GET  /status/<bot>
+    POST /refresh                refresh topology now
+    POST /jobs                   {"type": "deploy"|"update", "bot": "...", "env_file": "...", "args": [...]}
+    GET  /jobs                   recent jobs
+    GET  /jobs/<id>              job state and captured output
+
+Usage:
+    python controller.py --env-file .env
+    python controller.py --env-file .env --port 8790 --interval 60 --heal
+    curl --unix-socket .openclaw-controller.sock http://localhost/status
+    curl --unix-socket .openclaw-controller.sock http://localhost/jobs -H 'Content-Type: application/json' \\
+        -d '{"type": "update", "bot": "my-bot", "env_file": "bots/my-bot.env", "args": ["--reload"]}'
+"""
+
+import argparse
+import io
+import json
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingUnixStreamServer
+
+from deploy_state import DEFAULT_STATE_FILE, DeployState
+
+DEFAULT_SOCKET = ".openclaw-controller.sock"
+MAX_JOBS_KEPT = 100
+# Per-bot settings deploy.py reads from the environment; never inherited by jobs.
+BOT_ENV_KEYS = {
+    "ZEABUR_TOKEN", "GATEWAY_TOKEN", "BOT_NAME", "SUBDOMAIN", "PROFILE", "DM_POLICY",
+    "PROJECT_ID", "SERVICE_ID", "ENVIRONMENT_ID", "DOMAIN",
+    "KIMI_API_KEY", "MOONSHOT_API_KEY", "ANTHROPIC_API_KEY", "OPENAI_API_KEY",
+    "TELEGRAM_BOT_TOKEN", "TELEGRAM_USER_ID", "DISCORD_BOT_TOKEN", "BRAVE_API_KEY",
+    "TELEGRAM_WEBHOOK_URL", "TELEGRAM_WEBHOOK_SECRET", "TELEGRAM_WEBHOOK_PATH",
+    "TELEGRAM_WEBHOOK_MAX_CONNECTIONS", "TELEGRAM_ALLOWED_UPDATES", "TELEGRAM_WEBHOOK_IP",
+}
+
+
+def log(msg: str):
+    # stderr: job output capture redirects stdout only
+    print(f"{time.strftime('%H:%M:%S')} {msg}", file=sys.stderr, flush=True)
+
+
+class JobStdout:
+    """sys.stdout replacement that routes writes from a job's thread into that job's buffer."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def _target(self):
+        return getattr(self.local, "buffer", None) or self.stream
+
+    def write(self, data):
+        return self._target().write(data)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def bot_drift(bot: dict, topo) -> list:
+    """Differences between a state store record and the live topology."""
+    if not bot.get("service_id"):
+        return ["no service id in state store"]
+    svc = topo.service(bot["service_id"])
+    if not svc:
+        return ["service missing"]
+    drift = []
+    if svc.status != "RUNNING":
+        drift.append(f"status {svc.status}")
+    if bot.get("domain") and bot["domain"] not in {d.domain for d in svc.domains}:
+        drift.append(f"domain {bot['domain']} detached")
+    return drift
+
+
+class Controller:
+    def __init__(self, token: str, state_path: str, interval: float, heal: bool, heal_cooldown: float):
+        from zeabur_api import ZeaburClient
+
+        self.client = ZeaburClient(token)
+        self.state = DeployState(state_path)
+        self.interval = interval
+        self.heal = heal
+        self.heal_cooldown = heal_cooldown
+        self.topology = None
+        self.drift = {}
+        self.last_healed = {}
+        self.jobs = {}
+        self.job_queue = queue.Queue()
+        self.active_bot = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._next_job_id = 1
+        self.base_env = {k: v for k, v in os.environ.items() if k not in BOT_ENV_KEYS}
+
+    # === Topology / reconcile ===
+    def refresh(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from topology import Topology
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            servers = pool.submit(self.client.list_servers)
+            projects = pool.submit(self.client.list_projects)
+            with self._lock:
+                self.state.load()
+                regions = self.state.project_regions()
+            topo = Topology.build(servers.result(), projects.result(), regions)
+        with self._lock:
+            self.topology = topo
+            self.drift = {b["name"]: bot_drift(b, topo) for b in self.state.all()}
+        log(f"topology refreshed: {len(topo.projects)} project(s), {len(topo.services)} service(s) "
+            f"in {time.time() - start:.2f}s")
+
+    def reconcile(self):
+        self.refresh()
+        for name, drift in self.drift.items():
+            if not drift:
+                continue
+            log(f"drift {name}: {', '.join(drift)}")
+            if not self.heal or name == self.active_bot:
+                continue
+            bot = self.state.get(name)
+            svc = self.topology.service(bot["service_id"]) if bot.get("service_id") else None
+            if not svc or svc.status == "RUNNING" or not bot.get("environment_id"):
+                continue
+            if time.time() - self.last_healed.get(name, 0) < self.heal_cooldown:
+                continue
+            try:
+                self.client.restart(svc.id, bot["environment_id"])
+                self.last_healed[name] = time.time()
+                log(f"healed {name}: restart issued")
+            except Exception as e:
+                log(f"heal {name} failed: {e}")
+
+    def reconcile_loop(self):
+        while True:
+            try:
+                self.reconcile()
+            except Exception as e:
+                log(f"reconcile failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def status(self, name: str = None):
+        with self._lock:
+            topo = self.topology
+            bots = [self.state.get(name)] if name else self.state.all()
+            if name and not bots[0]:
+                return None
+            result = []
+            for bot in bots:
+                svc = topo.service(bot.get("service_id")) if topo else None
+                result.append({
+                    "name": bot["name"],
+                    "service_id": bot.get("service_id"),
+                    "domain": bot.get("domain"),
+                    "image_tag": bot.get("image_tag"),
+                    "status": svc.status if svc else None,
+                    "drift": self.drift.get(bot["name"], []),
+                })
+        return {"topology_age": round(time.time() - topo.created_at, 1) if topo else None, "bots": result}
+
+    # === Jobs ===
+    def submit(self, spec: dict) -> dict:
+        if spec.get("type") not in ("deploy", "update"):
+            raise ValueError("type must be 'deploy' or 'update'")
+        bot = spec.get("bot")
+        if not bot:
+            raise ValueError("bot is required")
+        extra = [str(a) for a in spec.get("args") or []]
+        with self._lock:
+            self.state.load()
+            known = self.state.get(bot) is not None
+        if spec["type"] == "update" and not known:
+            raise ValueError(f"bot '{bot}' not in state store; use a deploy job")
+        if spec["type"] == "deploy" and known and "--force-new" not in extra:
+            raise ValueError(f"bot '{bot}' already in state store; use an update job "
+                             f"(or pass --force-new in args to replace it)")
+        argv = ["--bot-name", bot, "--state-file", self.state.path]
+        if spec.get("env_file"):
+            argv += ["--env-file", spec["env_file"]]
+        argv += extra
+        with self._lock:
+            job = {
+                "id": str(self._next_job_id), "type": spec["type"], "bot": bot, "argv": argv,
+                "state": "queued", "exit_code": None, "output": "",
+                "created_at": time.time(), "started_at": None, "finished_at": None,
+            }
+            self._next_job_id += 1
+            self.jobs[job["id"]] = job
+            for old in sorted(self.jobs, key=int)[:-MAX_JOBS_KEPT]:
+                del self.jobs[old]
+        self.job_queue.put(job)
+        return job
+
+    def job_worker(self):
+        import deploy
+
+        while True:
+            job = self.job_queue.get()
+            job["state"], job["started_at"] = "running", time.time()
+            self.active_bot = job["bot"]
+            log(f"job {job['id']} {job['type']} {job['bot']} started")
+            output = io.StringIO()
+            job["_buffer"] = output
+            stdout = sys.stdout if isinstance(sys.stdout, JobStdout) else None
+            if stdout:
+                stdout.local.buffer = output
+            try:
+                # A fresh settings dict per job: its env file loads into this copy,
+                # so no bot (or the controller's .env) leaks into os.environ.
+                deploy.main(job["argv"], env=dict(self.base_env))
+                job["exit_code"] = 0
+            except SystemExit as e:
+                job["exit_code"] = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception as e:
+                output.write(f"\nError: {e}\n")
+                job["exit_code"] = 1
+            finally:
+                if stdout:
+                    stdout.local.buffer = None
+            job["output"] = output.getvalue()
+            job.pop("_buffer", None)
+            job["state"] = "done" if job["exit_code"] == 0 else "failed"
+            job["finished_at"] = time.time()
+            self.active_bot = None
+            log(f"job {job['id']} {job['state']} in {job['finished_at'] - job['started_at']:.1f}s")
+            self._wake.set()  # refresh topology after every mutation
+
+    def job_view(self, job: dict) -> dict:
+        view = {k: v for k, v in job.items() if not k.startswith("_")}
+        if job.get("_buffer") is not None:
+            view["output"] = job["_buffer"].getvalue()
+        return view
+
+
+def make_handler(controller: Controller, api_token: str = None):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status: int, payload):
+            data = json.dumps(payload, indent=2).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorized(self) -> bool:
+            if api_token and self.headers.get("Authorization") != f"Bearer {api_token}":
+                self._send(401, {"error": "unauthorized"})
+                return False
+            return True
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            parts = [p for p in self.path.split("?")[0].split("/") if p]
+            if parts == ["healthz"]:
+                self._send(200, {"ok": True, "topology": controller.topology is not None})
+            elif parts[:1] == ["status"] and len(parts) <= 2:
+                result = controller.status(parts[1] if len(parts) == 2 else None)
+                self._send(200, result) if result else self._send(404, {"error": "unknown bot"})
+            elif parts == ["jobs"]:
+                self._send(200, [controller.job_view(j) for j in list(controller.jobs.values())])
+            elif parts[:1] == ["jobs"] and len(parts) == 2 and parts[1] in controller.jobs:
+                self._send(200, controller.job_view(controller.jobs[parts[1]]))
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+            if content_type != "application/json":
+                # Also blocks browser "simple" cross-site POSTs (text/plain, form posts).
+                self._send(415, {"error": "Content-Type must be application/json"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send(400, {"error": "invalid JSON"})
+                return
+            path = self.path.split("?")[0].rstrip("/")
+            if path == "/refresh":
+                controller._wake.set()
+                self._send(202, {"ok": True})
+            elif path == "/jobs":
+                try:
+                    job = controller.submit(body)
+                except ValueError as e:
+                    self._send(400, {"error": str(e)})
+                    return
+                self._send(202, controller.job_view(job))
+            else:
+                self._send(404, {"error": "not found"})
+
+    return Handler
+
+
+class UnixHTTPServer(ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("local", 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the OpenClaw controller (local API + reconcile loop).")
+    parser.add_argument("--zeabur-token", help="Zeabur API token (sk-xxx)")
+    parser.add_argument("--env-file", default=".env", help="Path to .env file (default: .env)")
+    parser.add_argument("--state-file", help=f"Deployment state store (default: OPENCLAW_STATE_FILE or {DEFAULT_STATE_FILE})")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Unix socket path (default: {DEFAULT_SOCKET})")
+    parser.add_argument("--port", type=int, help="Listen on 127.0.0.1:PORT instead of the Unix socket (always token-protected)")
+    parser.add_argument("--api-token", help="Require 'Authorization: Bearer <token>' (default: OPENCLAW_CONTROLLER_TOKEN)")
+    parser.add_argument("--interval", type=float, default=60, help="Reconcile interval in seconds (default: 60)")
+    parser.add_argument("--heal", action="store_true", help="Restart bots whose service is not RUNNING")
+    parser.add_argument("--heal-cooldown", type=float, default=600, help="Min seconds between heals per bot (default: 600)")
+    args = parser.parse_args()
+
+    from check_server_status import read_env_file
+
+    # The controller's own settings stay local; os.environ is the jobs' base.
+    settings = dict(os.environ, **read_env_file(args.env_file))
+    token = args.zeabur_token or settings.get("ZEABUR_TOKEN")
+    if not token:
+        print("Error: missing ZEABUR_TOKEN (set in .env or --zeabur-token).")
+        sys.exit(1)
+
+    state_path = args.state_file or settings.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE
+    controller = Controller(token, state_path, args.interval, args.heal, args.heal_cooldown)
+    api_token = args.api_token or settings.get("OPENCLAW_CONTROLLER_TOKEN")
+    if args.port and not api_token:
+        # Any local process or browser page can reach a TCP port; never serve it open.
+        api_token = secrets.token_urlsafe(32)
+        log(f"generated API token (send 'Authorization: Bearer <token>'): {api_token}")
+    handler = make_handler(controller, api_token)
+    sys.stdout = JobStdout(sys.stdout)
+
+    if args.port:
+        server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+        where = f"http://127.0.0.1:{args.port}"
+    else:
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+        server = UnixHTTPServer(args.socket, handler)
+        os.chmod(args.socket, 0o600)
+        where = f"unix:{args.socket}"
+
+    threading.Thread(target=controller.reconcile_loop, daemon=True).start()
+    threading.Thread(target=controller.job_worker, daemon=True).start()
+    log(f"controller listening on {where} (reconcile every {args.interval:g}s{', heal on' if args.heal else ''})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if not args.port and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,27 +17,71 @@ Or with .env file:
 import argparse
 import json
 import os
+import re
 import secrets
 import sys
 import time
 
-try:
-    import requests
-except ImportError:
-    print("Error: 'requests' package required. Install with: pip install requests")
-    sys.exit(1)
+from deploy_state import DEFAULT_STATE_FILE, DeployState, config_hash
 
 API_URL = "https://api.zeabur.com/graphql"
 API_FALLBACK_URL = "https://api.zeabur.cn/graphql"
 ACTIVE_API_URL = API_URL
+HISTORY = None  # deploy_history.RunRecorder for the current run
+SESSION = None  # requests.Session, see http()
 OPENCLAW_IMAGE = "ghcr.io/openclaw/openclaw:2026.2.9"
 # Run gateway on 3000. Webhook listener (when enabled) binds to 8787.
 GATEWAY_CMD = "node dist/index.js gateway --bind lan --port 3000"
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "openclaw-template.yaml")
+
+# Performance profiles: container resources (rendered into the template) and
+# the Node heap limit. The heap is kept at ~75% of memory so V8 collects before
+# the container hits its limit; the default heap is far smaller and causes long
+# GC pauses for tool-heavy bots. webhook_connections is Telegram's
+# max_connections: how many webhook deliveries may be in flight at once.
+PERFORMANCE_PROFILES = {
+    "small": {"cpu": 0.5, "memory_mb": 1024, "heap_mb": 768, "webhook_connections": 20},
+    "standard": {"cpu": 1, "memory_mb": 2048, "heap_mb": 1536, "webhook_connections": 40},
+    "heavy": {"cpu": 2, "memory_mb": 4096, "heap_mb": 3072, "webhook_connections": 80},
+}
+DEFAULT_PROFILE = "standard"
+
+# Update types a Telegram bot can receive (setWebhook allowed_updates).
+TELEGRAM_UPDATE_TYPES = (
+    "message", "edited_message", "channel_post", "edited_channel_post",
+    "business_connection", "business_message", "edited_business_message", "deleted_business_messages",
+    "message_reaction", "message_reaction_count", "inline_query", "chosen_inline_result",
+    "callback_query", "shipping_query", "pre_checkout_query", "purchased_paid_media",
+    "poll", "poll_answer", "my_chat_member", "chat_member", "chat_join_request",
+    "chat_boost", "removed_chat_boost",
+)
+
+
+def http():
+    """Return a shared requests.Session, created on first network call.
+
+    Keeps --help and argument validation free of the HTTP/TLS import cost, and
+    reuses TLS connections across the dozens of API calls in one deploy.
+    """
+    global SESSION
+    if SESSION is None:
+        try:
+            import requests
+        except ImportError:
+            print("Error: 'requests' package required. Install with: pip install requests")
+            sys.exit(1)
+        SESSION = requests.Session()
+    return SESSION
+
 
+class EndpointBlocked(Exception):
+    """Endpoint refused the request at the network edge (Cloudflare 1010)."""
 
-def gql(token: str, query: str) -> dict:
-    """Execute a GraphQL query against Zeabur API."""
+
+def gql(token: str, operation: str, variables: dict = None) -> dict:
+    """Execute a named GraphQL operation (see zeabur_ops.OPERATIONS) against Zeabur API."""
     global ACTIVE_API_URL
+    from zeabur_ops import execute
 
     headers = {
         "Authorization": f"Bearer {token}",
@@ -49,28 +93,32 @@ def gql(token: str, query: str) -> dict:
 
     last_error = None
     for endpoint in endpoints:
-        try:
-            r = requests.post(
-                endpoint,
-                headers=headers,
-                json={"query": query},
-                timeout=30,
-            )
+        def post(body):
+            r = http().post(endpoint, headers=headers, json=body, timeout=30)
             # Some networks block api.zeabur.com with Cloudflare 1010.
             if r.status_code == 403 and "1010" in (r.text or "") and endpoint != API_FALLBACK_URL:
-                print(f"  Warning: Zeabur API blocked at {endpoint} (1010), retrying {API_FALLBACK_URL}")
-                continue
-            r.raise_for_status()
+                raise EndpointBlocked(endpoint)
             try:
                 data = r.json()
             except ValueError:
+                r.raise_for_status()
                 raise RuntimeError(f"Invalid JSON response from Zeabur API ({endpoint}): {r.text[:300]}")
+            if not r.ok and not (isinstance(data, dict) and "errors" in data):
+                r.raise_for_status()
+            return data
+
+        try:
+            data = execute(post, endpoint, operation, variables)
             if "errors" in data:
                 raise RuntimeError(f"GraphQL error: {json.dumps(data['errors'], indent=2)}")
             if endpoint != ACTIVE_API_URL:
                 ACTIVE_API_URL = endpoint
                 print(f"  Using Zeabur API endpoint: {ACTIVE_API_URL}")
             return data["data"]
+        except EndpointBlocked:
+            print(f"  Warning: Zeabur API blocked at {endpoint} (1010), retrying {API_FALLBACK_URL}")
+            last_error = f"{endpoint}: blocked (1010)"
+            continue
         except Exception as e:
             last_error = f"{endpoint}: {e}"
             continue
@@ -78,6 +126,8 @@ def gql(token: str, query: str) -> dict:
 
 
 def step(n: int, msg: str):
+    if HISTORY:
+        HISTORY.begin_step(msg)
     print(f"\n{'='*60}")
     print(f"  Step {n}: {msg}")
     print(f"{'='*60}")
@@ -85,7 +135,7 @@ def step(n: int, msg: str):
 
 def verify_token(token: str) -> str:
     """Verify Zeabur API token by listing projects."""
-    data = gql(token, "query{projects{edges{node{_id name}}}}")
+    data = gql(token, "ProjectNames")
     projects = [e["node"] for e in data["projects"]["edges"]]
     print(f"  Token valid. Found {len(projects)} existing project(s).")
     for p in projects:
@@ -95,7 +145,7 @@ def verify_token(token: str) -> str:
 
 def find_existing_deployment(token, project_id, service_id, env_id):
     """Verify that the stored deployment IDs are still valid on Zeabur."""
-    data = gql(token, f'query{{service(_id:"{service_id}"){{name status}}}}')
+    data = gql(token, "ServiceStatus", {"id": service_id})
     service = data["service"]
     print(f"  Found existing service: {service['name']} ({service['status']})")
     return True  # IDs are valid
@@ -103,7 +153,7 @@ def find_existing_deployment(token, project_id, service_id, env_id):
 
 def get_server(token: str) -> dict:
     """Find dedicated server."""
-    data = gql(token, "query{servers{_id name ip}}")
+    data = gql(token, "Servers")
     servers = data["servers"]
     if not servers:
         raise RuntimeError(
@@ -117,60 +167,83 @@ def get_server(token: str) -> dict:
 
 def create_project(token: str, server_id: str, name: str = "openclaw") -> str:
     """Create project on dedicated server."""
-    data = gql(
-        token,
-        f'mutation{{createProject(region:"server-{server_id}",name:"{name}"){{_id}}}}',
-    )
+    data = gql(token, "CreateProject", {"region": f"server-{server_id}", "name": name})
     project_id = data["createProject"]["_id"]
     print(f"  Project ID: {project_id}")
     return project_id
 
 
-def deploy_template(token: str, project_id: str) -> dict:
-    """Deploy OpenClaw template."""
-    yaml_content = f"""apiVersion: zeabur.com/v1
-kind: Template
-metadata:
-    name: OpenClaw-EasyClaw
-spec:
-    description: OpenClaw AI Assistant deployed by EasyClaw
-    services:
-        - name: openclaw
-          template: PREBUILT
-          spec:
-            source:
-                image: {OPENCLAW_IMAGE}
-            ports:
-                - id: web
-                  port: 8787
-                  type: HTTP
-            env:
-                NODE_ENV:
-                    default: production
-            volumes:
-                - id: openclaw-data
-                  dir: /home/node/.openclaw"""
-
-    # Escape for GraphQL string
-    yaml_escaped = yaml_content.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
-    data = gql(
-        token,
-        f'mutation{{deployTemplate(projectID:"{project_id}",rawSpecYaml:"{yaml_escaped}"){{_id}}}}',
-    )
+def node_options(profile: str) -> str:
+    """NODE_OPTIONS value for a performance profile."""
+    return f"--max-old-space-size={PERFORMANCE_PROFILES[profile]['heap_mb']}"
+
+
+def render_template(image: str = OPENCLAW_IMAGE, profile: str = DEFAULT_PROFILE,
+                    path: str = TEMPLATE_PATH) -> str:
+    """Render openclaw-template.yaml with the image and a performance profile.
+
+    The file stays a valid standalone template (usable from the dashboard); this
+    only swaps the image and adds NODE_OPTIONS plus a resources block to the
+    openclaw service spec.
+    """
+    settings = PERFORMANCE_PROFILES[profile]
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().rstrip("\n").split("\n")
+
+    out = []
+    for i, line in enumerate(lines):
+        m = re.match(r"^(\s*)image:\s*\S+\s*$", line)
+        if m:
+            out.append(f"{m.group(1)}image: {image}")
+            continue
+        m = re.match(r"^(\s*)env:\s*$", line)
+        if m:
+            key_indent = m.group(1)
+            following = lines[i + 1] if i + 1 < len(lines) else ""
+            child = re.match(r"^(\s*)", following).group(1)
+            if len(child) <= len(key_indent):  # empty env: block
+                child = key_indent + "  "
+            indent = child[len(key_indent):]
+            out.append(f"{key_indent}resources:")
+            out.append(f"{child}cpu: {settings['cpu']}")
+            out.append(f"{child}memory: {settings['memory_mb']}")
+            out.append(line)
+            out.append(f"{child}NODE_OPTIONS:")
+            out.append(f"{child}{indent}default: {node_options(profile)}")
+            continue
+        out.append(line)
+    return "\n".join(out)
+
+
+def deploy_template(token: str, project_id: str, profile: str = DEFAULT_PROFILE, exclude=(),
+                    server_id: str = None) -> dict:
+    """Deploy OpenClaw template. Services in `exclude` (ids) are not picked as the result."""
+    yaml_content = render_template(OPENCLAW_IMAGE, profile)
+    print(f"  Profile: {profile} ({node_options(profile)})")
+
+    gql(token, "DeployTemplate", {"projectID": project_id, "yaml": yaml_content})
     print(f"  Deployed successfully")
 
     # Get service and environment IDs
     time.sleep(2)
-    proj_data = gql(
-        token,
-        f'query{{project(_id:"{project_id}"){{services{{_id name}} environments{{_id name}}}}}}',
-    )
-    project = proj_data["project"]
-    service = project["services"][0]
-    env = project["environments"][0]
-    print(f"  Service: {service['name']} ({service['_id']})")
-    print(f"  Environment: {env['name']} ({env['_id']})")
-    return {"service_id": service["_id"], "environment_id": env["_id"]}
+    from topology import Topology
+
+    proj_data = gql(token, "ProjectServices", {"id": project_id})
+    servers = [{"_id": server_id}] if server_id else []
+    topo = Topology.build(servers, [dict(proj_data["project"], _id=project_id)],
+                          {project_id: f"server-{server_id}"} if server_id else None)
+    services = [s for s in topo.services_named("openclaw") if s.id not in exclude]
+    if not services:
+        # A second template deploy into the same project may get a suffixed name.
+        services = [s for s in topo.project(project_id).services
+                    if s.id not in exclude and (s.name or "").startswith("openclaw")]
+    if not services:
+        raise RuntimeError(f"Template deployed but no 'openclaw' service found in project {project_id}")
+    service = services[0]
+    env = service.environment
+    print(f"  Service: {service.name} ({service.id})")
+    print(f"  Environment: {env.name} ({env.id})")
+    return {"service_id": service.id, "environment_id": env.id}
 
 
 def set_env_var(token: str, service_id: str, env_id: str, key: str, value: str):
@@ -180,14 +253,16 @@ def set_env_var(token: str, service_id: str, env_id: str, key: str, value: str):
     try:
         gql(
             token,
-            f'mutation{{createEnvironmentVariable(serviceID:"{service_id}",environmentID:"{env_id}",key:"{key}",value:"{value}"){{key}}}}',
+            "CreateEnvVar",
+            {"serviceID": service_id, "environmentID": env_id, "key": key, "value": value},
         )
     except RuntimeError as e:
         if "VARIABLE_ALREADY_EXISTS" in str(e):
             # Variable exists — update it via the data Map argument
             gql(
                 token,
-                f'mutation{{updateEnvironmentVariable(serviceID:"{service_id}",environmentID:"{env_id}",data:{{{key}:"{value}"}})}}',
+                "UpdateEnvVars",
+                {"serviceID": service_id, "environmentID": env_id, "data": {key: value}},
             )
             print(f"  Updated {key} = {display}")
             return
@@ -208,6 +283,7 @@ def configure_service(
     telegram_webhook_url: str = None,
     telegram_webhook_secret: str = None,
     telegram_webhook_path: str = None,
+    profile: str = DEFAULT_PROFILE,
 ):
     """Configure environment variables."""
 
@@ -217,6 +293,7 @@ def configure_service(
     set_env_var(token, service_id, env_id, "OPENCLAW_HOME", "/home/node")
     # Avoid mDNS/Bonjour name-length crashes inside containers.
     set_env_var(token, service_id, env_id, "OPENCLAW_DISABLE_BONJOUR", "1")
+    set_env_var(token, service_id, env_id, "NODE_OPTIONS", node_options(profile))
 
     # AI provider
     if ai_provider and ai_key:
@@ -335,6 +412,48 @@ def build_config(
     return config
 
 
+def default_allowed_updates(dm_policy="allowlist", group_policy="disabled") -> list:
+    """Update types the bot actually handles under its DM/group policy.
+
+    Everything else (channel posts, polls, reactions, ...) would only cost a
+    webhook delivery that OpenClaw ignores.
+    """
+    updates = ["message", "edited_message", "callback_query"]
+    if dm_policy == "disabled" and group_policy == "disabled":
+        # Nobody may talk to the bot; keep messages so it can still refuse them.
+        updates = ["message"]
+    if group_policy != "disabled":
+        updates.append("my_chat_member")
+    return updates
+
+
+def webhook_options(profile=DEFAULT_PROFILE, dm_policy="allowlist", max_connections=None,
+                    allowed_updates=None, ip_address=None, group_policy="disabled") -> dict:
+    """setWebhook tuning: explicit values, else the profile / policy defaults.
+
+    max_connections may be a string (from .env); anything invalid raises ValueError.
+    """
+    if max_connections is None:
+        max_connections = PERFORMANCE_PROFILES[profile]["webhook_connections"]
+    try:
+        max_connections = int(max_connections)
+    except (TypeError, ValueError):
+        raise ValueError(f"Telegram max_connections must be an integer, got {max_connections!r}") from None
+    if not 1 <= max_connections <= 100:
+        raise ValueError(f"Telegram max_connections must be 1-100, got {max_connections}")
+    if isinstance(allowed_updates, str):
+        allowed_updates = [u.strip() for u in allowed_updates.split(",") if u.strip()]
+    if not allowed_updates:
+        allowed_updates = default_allowed_updates(dm_policy, group_policy)
+    unknown = [u for u in allowed_updates if u not in TELEGRAM_UPDATE_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown Telegram update type(s): {', '.join(unknown)}")
+    options = {"max_connections": max_connections, "allowed_updates": list(allowed_updates)}
+    if ip_address:
+        options["ip_address"] = ip_address
+    return options
+
+
 def resolve_provider_id(ai_provider, model_primary):
     """Resolve provider ID used by auth profiles."""
     if model_primary and "/" in model_primary:
@@ -356,6 +475,37 @@ def resolve_provider_id(ai_provider, model_primary):
     return provider_map.get(provider, provider)
 
 
+# .env keys holding an AI key, in the order deploy.py picks them.
+AI_KEY_ENV = (
+    ("KIMI_API_KEY", "kimi-coding"),
+    ("MOONSHOT_API_KEY", "moonshot"),
+    ("ANTHROPIC_API_KEY", "anthropic"),
+    ("OPENAI_API_KEY", "openai"),
+)
+
+
+def ai_settings(env) -> tuple:
+    """(provider, key) from the first AI key set in env, or (None, None)."""
+    for var, provider in AI_KEY_ENV:
+        if env.get(var):
+            return provider, env[var]
+    return None, None
+
+
+def default_bot_name(env, subdomain: str = None, project_name: str = "openclaw") -> str:
+    """State store key for a deploy: BOT_NAME, else the subdomain, else the
+    project name for a legacy .env holding only IDs. None when deploy.py would
+    generate a name.
+    """
+    if env.get("BOT_NAME"):
+        return env["BOT_NAME"]
+    if subdomain:
+        return subdomain
+    if all(env.get(k) for k in ("PROJECT_ID", "SERVICE_ID", "ENVIRONMENT_ID")):
+        return project_name
+    return None
+
+
 def resolve_ai_env_var(ai_provider):
     """Map AI provider to its env var name."""
     if not ai_provider:
@@ -376,20 +526,85 @@ def resolve_ai_env_var(ai_provider):
 
 def update_service_image(token, service_id, env_id, tag):
     """Update Docker image tag (triggers redeployment)."""
-    gql(token,
-        f'mutation{{updateServiceImage(serviceID:"{service_id}",environmentID:"{env_id}",tag:"{tag}")}}'
-    )
+    gql(token, "UpdateServiceImage", {"serviceID": service_id, "environmentID": env_id, "tag": tag})
     print(f"  Image updated to tag: {tag}")
 
 
-def save_deployment_ids(env_file, project_id, service_id, env_id, domain):
-    """Append deployment IDs to the .env file for future updates."""
-    with open(env_file, "a") as f:
-        f.write(f"\n# Deployment IDs (auto-generated, do not delete)\n")
-        f.write(f"PROJECT_ID={project_id}\n")
-        f.write(f"SERVICE_ID={service_id}\n")
-        f.write(f"ENVIRONMENT_ID={env_id}\n")
-        f.write(f"DOMAIN={domain}\n")
+def save_deployment_ids(state, bot_name, project_id, service_id, env_id, domain, **extra):
+    """Record deployment IDs in the local state store for future updates."""
+    return state.put(
+        bot_name,
+        project_id=project_id,
+        service_id=service_id,
+        environment_id=env_id,
+        domain=domain,
+        **extra,
+    )
+
+
+def auth_profiles(ai_provider, ai_key, config):
+    """Auth profile payload for the default agent, or None without a key."""
+    provider_id = resolve_provider_id(ai_provider, config["agents"]["defaults"]["model"]["primary"])
+    if not (provider_id and ai_key):
+        return None
+    return {
+        "profiles": {
+            f"{provider_id}:default": {
+                "type": "api_key",
+                "provider": provider_id,
+                "key": ai_key,
+            }
+        }
+    }
+
+
+def runtime_hash(image_tag, profile, gateway_token, telegram_token=None, discord_token=None, brave_api_key=None):
+    """Hash of settings only read at container start (image, heap, CLI flags, env).
+
+    When it matches the stored value, a config-only change can be hot reloaded.
+    """
+    return config_hash({
+        "image_tag": image_tag,
+        "profile": profile,
+        "gateway_token": gateway_token,
+        "telegram_token": telegram_token,
+        "discord_token": discord_token,
+        "brave_api_key": brave_api_key,
+    })
+
+
+def reload_config(token: str, service_id: str, env_id: str, config: dict, auth_payload: dict = None) -> bool:
+    """Write config + auth profile into the running container; the gateway's
+    config watcher applies them without a restart.
+
+    Files are written to a temp name and renamed so the watcher never reads a
+    partial file. Returns False (after printing why) when the command could not
+    run, so the caller can fall back to a restart.
+    """
+    import base64
+    import shlex
+
+    files = [("/home/node/.openclaw/openclaw.json", config)]
+    if auth_payload:
+        files.append(("/home/node/.openclaw/agents/main/agent/auth-profiles.json", auth_payload))
+    script = []
+    for path, payload in files:
+        data = base64.b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+        script.append(f"mkdir -p {shlex.quote(os.path.dirname(path))}")
+        script.append(f"printf %s {data} | base64 -d > {path}.tmp && mv {path}.tmp {path}")
+    try:
+        data = gql(token, "ExecuteCommand", {
+            "serviceID": service_id, "environmentID": env_id, "command": ["sh", "-c", " && ".join(script)],
+        })
+    except RuntimeError as e:
+        print(f"  Warning: executeCommand failed: {e}")
+        return False
+    result = data["executeCommand"]
+    if result["exitCode"] != 0:
+        print(f"  Warning: config write exited {result['exitCode']}: {(result.get('output') or '')[:200]}")
+        return False
+    print(f"  Wrote {len(files)} file(s); gateway reloads them in place.")
+    return True
 
 
 def set_start_command(
@@ -404,6 +619,7 @@ def set_start_command(
     telegram_webhook_url=None,
     telegram_webhook_secret=None,
     telegram_webhook_path=None,
+    profile=DEFAULT_PROFILE,
 ):
     """Set startup command with config and doctor --fix.
 
@@ -441,6 +657,7 @@ def set_start_command(
     if gateway_token:
         parts.append(f"export OPENCLAW_GATEWAY_TOKEN={gateway_token}")
     parts.append("export OPENCLAW_DISABLE_BONJOUR=1")
+    parts.append(f"export NODE_OPTIONS={node_options(profile)}")
 
     # Write config via base64 (updateServiceConfig makes volume read-only)
     parts.append("mkdir -p /home/node/.openclaw")
@@ -450,17 +667,8 @@ def set_start_command(
         parts.append("mkdir -p /home/node/.openclaw/credentials/telegram")
         parts.append(f"printf %s {token_b64} | base64 -d > /home/node/.openclaw/credentials/telegram/botToken")
     # Ensure auth profile exists for the default agent (required for model responses).
-    provider_id = resolve_provider_id(ai_provider, config["agents"]["defaults"]["model"]["primary"])
-    if provider_id and ai_key:
-        auth_payload = {
-            "profiles": {
-                f"{provider_id}:default": {
-                    "type": "api_key",
-                    "provider": provider_id,
-                    "key": ai_key,
-                }
-            }
-        }
+    auth_payload = auth_profiles(ai_provider, ai_key, config)
+    if auth_payload:
         auth_js = "\n".join([
             "const fs = require('fs');",
             "const dir = '/home/node/.openclaw/agents/main/agent';",
@@ -487,73 +695,230 @@ def set_start_command(
 
     command = 'sh -c "' + " && ".join(parts) + '"'
 
-    # Escape for GraphQL
-    cmd_escaped = command.replace("\\", "\\\\").replace('"', '\\"')
-    gql(
-        token,
-        f'mutation{{updateServiceCommand(serviceID:"{service_id}",command:"{cmd_escaped}")}}',
-    )
+    gql(token, "UpdateServiceCommand", {"serviceID": service_id, "command": command})
     print(f"  Model: {ai_provider or 'kimi-coding'}")
     print(f"  DM Policy: {dm_policy}")
+    print(f"  Profile: {profile} ({node_options(profile)})")
     if dm_policy == "allowlist" and telegram_user_id:
         print(f"  Allowed User: {telegram_user_id}")
     print(f"  Gateway: {GATEWAY_CMD}")
+    return config
 
 
-def restart_service(token: str, service_id: str, env_id: str):
-    """Restart service."""
-    gql(
-        token,
-        f'mutation{{restartService(serviceID:"{service_id}",environmentID:"{env_id}")}}',
-    )
+def restart_service(token: str, service_id: str, env_id: str, wait: int = 30):
+    """Restart service, then sleep `wait` seconds (0 to return immediately)."""
+    gql(token, "RestartService", {"serviceID": service_id, "environmentID": env_id})
     print("  Service restarting...")
-    print("  Waiting 30 seconds for startup...")
-    time.sleep(30)
+    if wait:
+        print(f"  Waiting {wait} seconds for startup...")
+        time.sleep(wait)
+
+
+def api_schema(token: str):
+    """Cached schema of the active endpoint (see zeabur_schema), or None."""
+    from zeabur_schema import introspection_disabled, load_schema
+
+    def fetch():
+        try:
+            return {"data": gql(token, "Introspect")}
+        except RuntimeError as e:
+            response = {"errors": [{"message": str(e)}]}
+            if not introspection_disabled(response):
+                raise
+            return response  # introspection disabled: cached as such
+
+    try:
+        return load_schema(fetch, ACTIVE_API_URL)
+    except Exception:
+        return None
+
+
+def wait_for_ready(token: str, service_id: str, domain: str = None, timeout: int = 300, interval: int = 3) -> float:
+    """Wait until the service is RUNNING and its Control UI answers.
+
+    Status changes arrive over a subscription where the API offers one
+    (polling otherwise). Returns seconds until ready; raises RuntimeError on
+    timeout.
+    """
+    from health_probe import probe_once
+    from zeabur_ws import status_stream, subscription_supported, ws_url
+
+    start = time.time()
+    status = None
+    stream = status_stream(
+        ws_url(ACTIVE_API_URL), token, service_id,
+        poll=lambda: gql(token, "ServiceStatus", {"id": service_id})["service"]["status"],
+        interval=interval,
+        supported=subscription_supported(api_schema(token), "ServiceStatusSubscription"),
+    )
+    try:
+        for status in stream:
+            if time.time() - start >= timeout:
+                break
+            if status == "RUNNING":
+                if not domain:
+                    return time.time() - start
+                if probe_once(f"https://{domain}/", timeout=interval + 2)["ok"]:
+                    return time.time() - start
+    finally:
+        stream.close()
+    raise RuntimeError(f"Service {service_id} not ready after {timeout}s (last status: {status})")
+
+
+def restart_and_wait(token: str, service_id: str, env_id: str, domain: str = None, timeout: int = 300):
+    """Restart, then poll until ready. Returns seconds to ready, or None on timeout."""
+    restart_service(token, service_id, env_id, wait=0)
+    try:
+        seconds = wait_for_ready(token, service_id, domain, timeout=timeout)
+    except RuntimeError as e:
+        print(f"  Warning: {e}")
+        return None
+    print(f"  Ready in {seconds:.1f}s")
+    return seconds
+
+
+def domain_candidates(subdomain: str, count: int = 6) -> list:
+    """Subdomains to try, in order of preference: as requested, then random suffixes."""
+    candidates = [subdomain]
+    while len(candidates) < count:
+        candidate = f"{subdomain}-{secrets.token_hex(3)}"
+        if candidate not in candidates:
+            candidates.append(candidate)
+    return candidates
+
+
+def check_domains(token: str, server_id: str, candidates: list) -> list:
+    """Check many subdomains in one aliased checkDomainAvailable document.
+
+    Returns (subdomain, check) pairs in the same order as candidates.
+    """
+    variables = {"region": f"server-{server_id}"}
+    variables.update({f"d{i}": sub for i, sub in enumerate(candidates)})
+    data = gql(token, f"CheckDomains{len(candidates)}", variables)
+    return [(sub, data[f"c{i}"]) for i, sub in enumerate(candidates)]
 
 
 def add_domain(token: str, service_id: str, env_id: str, server_id: str, subdomain: str) -> str:
     """Add domain."""
-    # Check availability
-    data = gql(
-        token,
-        f'mutation{{checkDomainAvailable(domain:"{subdomain}",isGenerated:true,region:"server-{server_id}"){{isAvailable reason}}}}',
-    )
-    check = data["checkDomainAvailable"]
-    if not check["isAvailable"]:
-        # Try with random suffix
-        subdomain = f"{subdomain}-{secrets.token_hex(3)}"
-        print(f"  Domain unavailable, trying: {subdomain}")
-        data = gql(
-            token,
-            f'mutation{{checkDomainAvailable(domain:"{subdomain}",isGenerated:true,region:"server-{server_id}"){{isAvailable reason}}}}',
-        )
-        check = data["checkDomainAvailable"]
-        if not check["isAvailable"]:
-            raise RuntimeError(f"Domain '{subdomain}' unavailable: {check['reason']}")
+    # Check the requested subdomain and fallbacks in a single round trip
+    results = check_domains(token, server_id, domain_candidates(subdomain))
+    available = [sub for sub, check in results if check["isAvailable"]]
+    if not available:
+        reason = results[0][1]["reason"]
+        raise RuntimeError(f"Domain '{subdomain}' and {len(results) - 1} fallbacks unavailable: {reason}")
+    if available[0] != subdomain:
+        print(f"  Domain '{subdomain}' unavailable ({results[0][1]['reason']}), using: {available[0]}")
+    subdomain = available[0]
 
     # Add domain
-    data = gql(
-        token,
-        f'mutation{{addDomain(serviceID:"{service_id}",environmentID:"{env_id}",isGenerated:true,domain:"{subdomain}"){{domain}}}}',
-    )
+    data = gql(token, "AddDomain", {"serviceID": service_id, "environmentID": env_id, "domain": subdomain})
     domain = data["addDomain"]["domain"]
     print(f"  Domain: https://{domain}")
     return domain
 
 
-def verify_deployment(token: str, project_id: str, service_id: str, env_id: str, domain: str):
-    """Verify deployment."""
+def exec_command(token: str, service_id: str, env_id: str, script: str) -> str:
+    """Run a shell script in the service container; returns its output, raises on failure."""
+    data = gql(token, "ExecuteCommand", {
+        "serviceID": service_id, "environmentID": env_id, "command": ["sh", "-c", script],
+    })
+    result = data["executeCommand"]
+    if result["exitCode"] != 0:
+        raise RuntimeError(f"command exited {result['exitCode']}: {(result.get('output') or '')[:200]}")
+    return (result.get("output") or "").strip()
+
+
+def copy_service_data(token: str, env_id: str, source_id: str, target_id: str,
+                      path: str = "/home/node/.openclaw", chunk: int = 64 * 1024, limit: int = 16 * 1024 * 1024) -> int:
+    """Copy the data volume of one running service into another.
+
+    A tarball is built in the source container and streamed across in
+    base64 chunks through executeCommand (64 KiB keeps each command below the
+    kernel's per-argument limit), then checked by md5 and unpacked. Returns
+    the archive size in bytes.
+    """
+    archive = "/tmp/openclaw-data.tgz"
+    size = int(exec_command(token, source_id, env_id,
+                            f"tar czf {archive} -C {path} . && wc -c < {archive}").split()[-1])
+    if size > limit:
+        exec_command(token, source_id, env_id, f"rm -f {archive}")
+        raise RuntimeError(f"data volume is {size // 1024} KiB compressed (limit {limit // 1024} KiB)")
+    try:
+        for i in range((size + chunk - 1) // chunk):
+            data = exec_command(token, source_id, env_id,
+                                f"dd if={archive} bs={chunk} skip={i} count=1 2>/dev/null | base64 -w0")
+            exec_command(token, target_id, env_id, f"printf %s {data} | base64 -d {'>>' if i else '>'} {archive}")
+        source_sum = exec_command(token, source_id, env_id, f"md5sum {archive}").split()[0]
+        target_sum = exec_command(token, target_id, env_id, f"md5sum {archive}").split()[0]
+        if source_sum != target_sum:
+            raise RuntimeError("data copy checksum mismatch")
+        exec_command(token, target_id, env_id, f"mkdir -p {path} && tar xzf {archive} -C {path} && rm -f {archive}")
+    finally:
+        exec_command(token, source_id, env_id, f"rm -f {archive}")
+    print(f"  Copied {size // 1024} KiB of bot data.")
+    return size
+
+
+def retire_service(token: str, service_id: str, env_id: str, domains: list = ()):
+    """Remove a service's domains, then the service."""
+    for domain in domains:
+        gql(token, "RemoveDomain", {"domain": domain})
+    gql(token, "DeleteService", {"serviceID": service_id, "environmentID": env_id})
+    print(f"  Service {service_id} removed.")
+
+
+def move_domain(token: str, domain: str, from_id: str, to_id: str, env_id: str):
+    """Re-attach a generated domain to another service (back to the old one on failure)."""
+    subdomain = domain.split(".")[0]
+    gql(token, "RemoveDomain", {"domain": domain})
+    try:
+        gql(token, "AddDomain", {"serviceID": to_id, "environmentID": env_id, "domain": subdomain})
+    except Exception:
+        gql(token, "AddDomain", {"serviceID": from_id, "environmentID": env_id, "domain": subdomain})
+        raise
+    print(f"  https://{domain} now served by {to_id}")
+
+
+def blue_green_cutover(token: str, env_id: str, blue_id: str, green_id: str, domain: str, server_id: str,
+                       timeout: int = 300) -> float:
+    """Bring the configured green service up beside blue, then move traffic over.
+
+    Green is started with its new start command, receives a copy of blue's
+    data volume (sessions, credentials, memory), and is restarted on it; it
+    must answer on a temporary domain before anything user-facing changes.
+    Only then does the bot's domain move from blue to green. Blue keeps
+    serving until the move, so anything it writes after the copy (roughly the
+    second restart plus health check) does not reach green. On failure the
+    temporary domain is removed and the error re-raised with blue still
+    serving; deleting green, and blue after a successful move, is left to the
+    caller. Returns seconds until green was ready.
+    """
+    temp_domain = add_domain(token, green_id, env_id, server_id, f"{domain.split('.')[0]}-green")
+    try:
+        restart_service(token, green_id, env_id, wait=0)
+        wait_for_ready(token, green_id, temp_domain, timeout=timeout)
+        copy_service_data(token, env_id, blue_id, green_id)
+        restart_service(token, green_id, env_id, wait=0)
+        seconds = wait_for_ready(token, green_id, temp_domain, timeout=timeout)
+        print(f"  Green ready in {seconds:.1f}s on https://{temp_domain}")
+    finally:
+        gql(token, "RemoveDomain", {"domain": temp_domain})
+    move_domain(token, domain, blue_id, green_id, env_id)
+    return seconds
+
+
+def verify_deployment(token: str, project_id: str, service_id: str, env_id: str, domain: str,
+                      webhook_path: str = None):
+    """Verify deployment: service status, gateway logs and endpoint latency."""
+    from health_probe import print_report, probe_bots
 
     # Check service status
-    data = gql(token, f'query{{service(_id:"{service_id}"){{name status}}}}')
+    data = gql(token, "ServiceStatus", {"id": service_id})
     status = data["service"]["status"]
     print(f"  Service status: {status}")
 
     # Check logs
-    data = gql(
-        token,
-        f'query{{runtimeLogs(projectID:"{project_id}",serviceID:"{service_id}",environmentID:"{env_id}"){{message timestamp}}}}',
-    )
+    data = gql(token, "RuntimeLogs", {"projectID": project_id, "serviceID": service_id, "environmentID": env_id})
     logs = data["runtimeLogs"]
     gateway_ok = any("listening on ws://" in l["message"] for l in logs)
     telegram_ok = any("telegram" in l["message"].lower() for l in logs)
@@ -561,14 +926,11 @@ def verify_deployment(token: str, project_id: str, service_id: str, env_id: str,
     print(f"  Gateway started: {'Yes' if gateway_ok else 'No (check logs)'}")
     print(f"  Telegram connected: {'Yes' if telegram_ok else 'Not detected yet'}")
 
-    # Test HTTP
-    try:
-        r = requests.get(f"https://{domain}/", timeout=10)
-        print(f"  Web UI: HTTP {r.status_code} {'OK' if r.status_code == 200 else 'ERROR'}")
-    except Exception as e:
-        print(f"  Web UI: Error - {e}")
+    # Probe Control UI / WebChat / webhook concurrently
+    report = probe_bots([{"name": domain, "domain": domain, "webhook_path": webhook_path}], samples=5, warmup=1)
+    endpoints_ok = print_report(report)
 
-    if status == "RUNNING" and gateway_ok:
+    if status == "RUNNING" and gateway_ok and endpoints_ok:
         print("\n  Deployment SUCCESSFUL!")
     else:
         print("\n  Deployment may need attention. Check logs:")
@@ -576,21 +938,35 @@ def verify_deployment(token: str, project_id: str, service_id: str, env_id: str,
             print(f"    {l['timestamp']} | {l['message'][:100]}")
 
 
-def set_telegram_webhook(bot_token: str, webhook_url: str, webhook_secret: str = None):
-    """Configure Telegram webhook for the bot."""
+def set_telegram_webhook(bot_token: str, webhook_url: str, webhook_secret: str = None, options: dict = None,
+                         drop_pending: bool = True):
+    """Configure Telegram webhook for the bot.
+
+    `options` (see webhook_options) adds max_connections, allowed_updates and
+    ip_address; without it Telegram uses 40 connections and all update types.
+    With drop_pending=False updates queued during a cutover are still delivered.
+    """
     if not bot_token or not webhook_url:
         return
     try:
-        # Clear any existing webhook and pending updates
-        requests.post(
-            f"https://api.telegram.org/bot{bot_token}/deleteWebhook",
-            data={"drop_pending_updates": "true"},
-            timeout=20,
-        )
         payload = {"url": webhook_url}
+        if drop_pending:
+            # Clear any existing webhook and pending updates
+            http().post(
+                f"https://api.telegram.org/bot{bot_token}/deleteWebhook",
+                data={"drop_pending_updates": "true"},
+                timeout=20,
+            )
         if webhook_secret:
             payload["secret_token"] = webhook_secret
-        r = requests.post(
+        options = options or {}
+        if options.get("max_connections"):
+            payload["max_connections"] = str(options["max_connections"])
+        if options.get("allowed_updates"):
+            payload["allowed_updates"] = json.dumps(options["allowed_updates"])
+        if options.get("ip_address"):
+            payload["ip_address"] = options["ip_address"]
+        r = http().post(
             f"https://api.telegram.org/bot{bot_token}/setWebhook",
             data=payload,
             timeout=20,
@@ -599,7 +975,11 @@ def set_telegram_webhook(bot_token: str, webhook_url: str, webhook_secret: str =
         data = r.json()
         if not data.get("ok"):
             raise RuntimeError(f"Telegram setWebhook failed: {data}")
-        print("  Telegram webhook set.")
+        if options:
+            print(f"  Telegram webhook set (max_connections={options.get('max_connections', 40)}, "
+                  f"updates: {', '.join(options.get('allowed_updates') or ['all'])}).")
+        else:
+            print("  Telegram webhook set.")
     except Exception as e:
         print(f"  Warning: Telegram setWebhook failed: {e}")
 
@@ -609,7 +989,7 @@ def clear_telegram_webhook(bot_token: str):
     if not bot_token:
         return
     try:
-        r = requests.post(
+        r = http().post(
             f"https://api.telegram.org/bot{bot_token}/deleteWebhook",
             data={"drop_pending_updates": "true"},
             timeout=20,
@@ -623,7 +1003,86 @@ def clear_telegram_webhook(bot_token: str):
         print(f"  Warning: Telegram deleteWebhook failed: {e}")
 
 
-def main():
+def preflight(args, is_update: bool, timeout: float) -> bool:
+    """Run independent sanity checks concurrently before changing anything."""
+    import threading
+
+    from preflight import CheckWarning, check_ai_key, check_webhook_url, print_report, run_checks, skipped
+
+    token = args.zeabur_token
+    server_lock = threading.Lock()
+    server_cache = []
+
+    def first_server():
+        with server_lock:
+            if not server_cache:
+                servers = gql(token, "Servers")["servers"]
+                if not servers:
+                    raise RuntimeError("no dedicated server found (add one in the Zeabur dashboard)")
+                server_cache.append(servers[0])
+            return server_cache[0]
+
+    def zeabur_token():
+        return f"valid ({gql(token, 'Me')['me']['username']}, {ACTIVE_API_URL})"
+
+    def server():
+        s = first_server()
+        return f"{s.get('name', 'N/A')} ({s.get('ip', 'N/A')})"
+
+    def domains():
+        results = check_domains(token, first_server()["_id"], domain_candidates(args.subdomain))
+        if results[0][1]["isAvailable"]:
+            return f"{args.subdomain} available"
+        available = [sub for sub, check in results if check["isAvailable"]]
+        if not available:
+            raise RuntimeError(f"'{args.subdomain}' and {len(results) - 1} fallbacks unavailable: {results[0][1]['reason']}")
+        raise CheckWarning(f"'{args.subdomain}' unavailable ({results[0][1]['reason']}), a suffixed fallback is free")
+
+    def existing_service():
+        service = gql(token, "ServiceStatus", {"id": args.service_id})["service"]
+        return f"{service['name']} ({service['status']})"
+
+    def telegram():
+        r = http().get(f"https://api.telegram.org/bot{args.telegram_token}/getMe", timeout=timeout)
+        data = r.json()
+        if not data.get("ok"):
+            raise RuntimeError(f"getMe failed: {data.get('description', r.status_code)}")
+        return f"@{data['result']['username']}"
+
+    provider = resolve_provider_id(args.ai_provider or "kimi-coding", None)
+    checks = {"Zeabur token": zeabur_token}
+    if args.telegram_token:
+        checks["Telegram bot"] = telegram
+    if args.ai_key:
+        checks["AI key"] = lambda: check_ai_key(provider, args.ai_key)
+    if args.telegram_webhook_url:
+        checks["Webhook URL"] = lambda: check_webhook_url(
+            args.telegram_webhook_url, args.telegram_webhook_path, args.telegram_webhook_secret,
+            args.domain if is_update else f"{args.subdomain}.zeabur.app",
+        )
+
+    zeabur_checks = {"Existing service": existing_service} if is_update else {
+        "Dedicated server": server,
+        "Domain": domains,
+    }
+
+    # The token check settles ACTIVE_API_URL (api.zeabur.com or the .cn
+    # fallback) before the other Zeabur checks start, so concurrent gql() calls
+    # never race on the endpoint switch; checks without Zeabur calls run
+    # alongside it. Both phases share one deadline.
+    start = time.time()
+    results = run_checks(checks, timeout)
+    if results[0]["status"] == "fail":
+        results += skipped(zeabur_checks, "Zeabur token check failed")
+    else:
+        results += run_checks(zeabur_checks, max(0.0, timeout - (time.time() - start)))
+    return print_report(results, time.time() - start)
+
+
+def main(argv: list = None, env: dict = None):
+    # Settings are read from (and --env-file loads into) env, default os.environ;
+    # the controller passes a fresh dict per job.
+    env = os.environ if env is None else env
     parser = argparse.ArgumentParser(
         description="Deploy OpenClaw AI assistant to Zeabur dedicated server"
     )
@@ -636,15 +1095,36 @@ def main():
     parser.add_argument("--telegram-webhook-url", help="Telegram webhook URL (enables webhook mode)")
     parser.add_argument("--telegram-webhook-secret", help="Telegram webhook secret (X-Telegram-Bot-Api-Secret-Token)")
     parser.add_argument("--telegram-webhook-path", help="Telegram webhook path (default: /telegram-webhook)")
+    parser.add_argument("--telegram-max-connections", type=int,
+                        help="Parallel webhook deliveries, 1-100 (default: by profile, 20/40/80)")
+    parser.add_argument("--telegram-allowed-updates",
+                        help="Comma-separated update types to receive (default: derived from the DM/group policy)")
+    parser.add_argument("--telegram-webhook-ip", help="Fixed IP Telegram should deliver to instead of resolving DNS")
     parser.add_argument("--discord-token", help="Discord Bot token")
     parser.add_argument("--subdomain", help="Subdomain for zeabur.app (auto-generated if omitted)")
     parser.add_argument("--dm-policy", default="allowlist", choices=["pairing", "open", "allowlist", "disabled"],
                         help="Telegram DM access policy (default: allowlist — only specified user can DM)")
     parser.add_argument("--telegram-user-id", help="Telegram user ID for allowlist DM policy (required when dm-policy=allowlist)")
     parser.add_argument("--env-file", help="Load settings from .env file")
-    parser.add_argument("--force-new", action="store_true", help="Force new deployment even if IDs exist")
-
-    args = parser.parse_args()
+    parser.add_argument("--force-new", action="store_true", help="Force new deployment even if IDs exist (replaces the bot's state record)")
+    parser.add_argument("--profile", choices=sorted(PERFORMANCE_PROFILES),
+                        help="Performance profile: resources and Node heap "
+                             f"(default: PROFILE, the bot's saved profile, or {DEFAULT_PROFILE})")
+    parser.add_argument("--bot-name", help="Bot name used as the state store key (default: BOT_NAME, else SUBDOMAIN "
+                                           "as given or generated; a legacy .env with IDs only: project name)")
+    parser.add_argument("--state-file", help=f"Deployment state store (default: OPENCLAW_STATE_FILE or {DEFAULT_STATE_FILE})")
+    parser.add_argument("--history-file", help="Deploy latency history (default: OPENCLAW_HISTORY_FILE or .openclaw-history.jsonl)")
+    parser.add_argument("--reload", action="store_true",
+                        help="Update mode: apply config/auth changes to the running gateway without a restart when possible")
+    parser.add_argument("--blue-green", action="store_true",
+                        help="Update mode: bring up a new service beside the old one, move the domain and webhook "
+                             "once it is healthy, then remove the old one (no downtime; Telegram needs webhook "
+                             "mode; data the old service writes during the last health check is not carried over)")
+    parser.add_argument("--skip-preflight", action="store_true", help="Skip the concurrent preflight checks")
+    parser.add_argument("--preflight-only", action="store_true", help="Run the preflight checks and exit")
+    parser.add_argument("--preflight-timeout", type=float, default=5.0, help="Preflight deadline in seconds (default: 5)")
+
+    args = parser.parse_args(argv)
 
     # Load from .env file if specified
     if args.env_file and os.path.exists(args.env_file):
@@ -654,34 +1134,53 @@ def main():
                 line = line.strip()
                 if line and not line.startswith("#") and "=" in line:
                     key, value = line.split("=", 1)
-                    os.environ[key.strip()] = value.strip()
-        args.zeabur_token = args.zeabur_token or os.environ.get("ZEABUR_TOKEN")
-        args.gateway_token = args.gateway_token or os.environ.get("GATEWAY_TOKEN")
-        args.ai_key = args.ai_key or os.environ.get("KIMI_API_KEY") or os.environ.get("MOONSHOT_API_KEY") or os.environ.get("ANTHROPIC_API_KEY") or os.environ.get("OPENAI_API_KEY")
-        args.telegram_token = args.telegram_token or os.environ.get("TELEGRAM_BOT_TOKEN")
-        args.telegram_user_id = args.telegram_user_id or os.environ.get("TELEGRAM_USER_ID")
-        args.telegram_webhook_url = args.telegram_webhook_url or os.environ.get("TELEGRAM_WEBHOOK_URL")
-        args.telegram_webhook_secret = args.telegram_webhook_secret or os.environ.get("TELEGRAM_WEBHOOK_SECRET")
-        args.telegram_webhook_path = args.telegram_webhook_path or os.environ.get("TELEGRAM_WEBHOOK_PATH")
-        args.subdomain = args.subdomain or os.environ.get("SUBDOMAIN")
-        args.brave_api_key = os.environ.get("BRAVE_API_KEY") or None
-        if os.environ.get("KIMI_API_KEY"):
-            args.ai_provider = args.ai_provider or "kimi-coding"
-        elif os.environ.get("MOONSHOT_API_KEY"):
-            args.ai_provider = args.ai_provider or "moonshot"
-        elif os.environ.get("ANTHROPIC_API_KEY"):
-            args.ai_provider = args.ai_provider or "anthropic"
-        elif os.environ.get("OPENAI_API_KEY"):
-            args.ai_provider = args.ai_provider or "openai"
-
-    # Read deployment IDs from env
-    args.project_id = os.environ.get("PROJECT_ID")
-    args.service_id = os.environ.get("SERVICE_ID")
-    args.environment_id = os.environ.get("ENVIRONMENT_ID")
-    args.domain = os.environ.get("DOMAIN")
+                    env[key.strip()] = value.strip()
+        args.zeabur_token = args.zeabur_token or env.get("ZEABUR_TOKEN")
+        args.gateway_token = args.gateway_token or env.get("GATEWAY_TOKEN")
+        env_provider, env_key = ai_settings(env)
+        args.ai_key = args.ai_key or env_key
+        args.telegram_token = args.telegram_token or env.get("TELEGRAM_BOT_TOKEN")
+        args.telegram_user_id = args.telegram_user_id or env.get("TELEGRAM_USER_ID")
+        args.telegram_webhook_url = args.telegram_webhook_url or env.get("TELEGRAM_WEBHOOK_URL")
+        args.telegram_webhook_secret = args.telegram_webhook_secret or env.get("TELEGRAM_WEBHOOK_SECRET")
+        args.telegram_webhook_path = args.telegram_webhook_path or env.get("TELEGRAM_WEBHOOK_PATH")
+        if args.telegram_max_connections is None:
+            # Parsed (and rejected if invalid) by webhook_options below
+            args.telegram_max_connections = env.get("TELEGRAM_WEBHOOK_MAX_CONNECTIONS") or None
+        args.telegram_allowed_updates = args.telegram_allowed_updates or env.get("TELEGRAM_ALLOWED_UPDATES")
+        args.telegram_webhook_ip = args.telegram_webhook_ip or env.get("TELEGRAM_WEBHOOK_IP")
+        args.subdomain = args.subdomain or env.get("SUBDOMAIN")
+        args.brave_api_key = env.get("BRAVE_API_KEY") or None
+        args.ai_provider = args.ai_provider or env_provider
+
+    # Auto-generate subdomain if not provided (before naming the bot, so a
+    # nameless new deploy gets its own key instead of a shared default)
+    generated_subdomain = not args.subdomain
+    if generated_subdomain:
+        args.subdomain = f"oc-{secrets.token_hex(4)}"
+
+    # Read deployment IDs from the state store, falling back to legacy .env IDs
+    # (a legacy .env without a name keeps the key it was migrated under)
+    args.bot_name = args.bot_name or default_bot_name(
+        env, None if generated_subdomain else args.subdomain, args.project_name)
+    generated_name = not args.bot_name
+    args.bot_name = args.bot_name or args.subdomain
+    args.state_file = args.state_file or env.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE
+    state = DeployState(args.state_file)
+    bot = state.get(args.bot_name) or {}
+    args.project_id = bot.get("project_id") or env.get("PROJECT_ID")
+    args.service_id = bot.get("service_id") or env.get("SERVICE_ID")
+    args.environment_id = bot.get("environment_id") or env.get("ENVIRONMENT_ID")
+    args.domain = bot.get("domain") or env.get("DOMAIN")
     if args.service_id and args.service_id.startswith("service-"):
         args.service_id = args.service_id.removeprefix("service-")
 
+    # An update keeps the bot's recorded profile unless one is given explicitly
+    args.profile = args.profile or env.get("PROFILE") or bot.get("profile") or DEFAULT_PROFILE
+    if args.profile not in PERFORMANCE_PROFILES:
+        print(f"Error: unknown profile '{args.profile}' (choose from {', '.join(sorted(PERFORMANCE_PROFILES))})")
+        sys.exit(1)
+
     if args.domain and args.telegram_webhook_path and not args.telegram_webhook_url:
         args.telegram_webhook_url = f"https://{args.domain}{args.telegram_webhook_path}"
 
@@ -703,10 +1202,6 @@ def main():
     if len(args.gateway_token) < 32:
         print(f"Warning: Gateway token is {len(args.gateway_token)} chars. Recommended: >=32 chars.")
 
-    # Auto-generate subdomain if not provided
-    if not args.subdomain:
-        args.subdomain = f"oc-{secrets.token_hex(4)}"
-
     # Webhook defaults
     if args.telegram_webhook_url and not args.telegram_webhook_secret:
         args.telegram_webhook_secret = secrets.token_hex(16)
@@ -714,10 +1209,26 @@ def main():
         print(f"Generated Telegram webhook secret: {masked}")
     if args.telegram_webhook_url and not args.telegram_webhook_path:
         args.telegram_webhook_path = "/telegram-webhook"
+    args.webhook_options = None
+    if args.telegram_webhook_url:
+        try:
+            args.webhook_options = webhook_options(args.profile, args.dm_policy, args.telegram_max_connections,
+                                                   args.telegram_allowed_updates, args.telegram_webhook_ip)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
 
     # Determine mode
     is_update = (args.project_id and args.service_id and args.environment_id
                  and not args.force_new)
+    existing = state.get(args.bot_name)
+    if not is_update and existing:
+        if not args.force_new:
+            print(f"Error: bot '{args.bot_name}' is already in {args.state_file}; a new deployment never replaces "
+                  f"an existing record. Pass another --bot-name (or BOT_NAME / SUBDOMAIN), or --force-new.")
+            sys.exit(1)
+        print(f"Warning: --force-new replaces the record of '{args.bot_name}' once the new deployment succeeds; "
+              f"its old service {existing.get('service_id')} keeps running until you remove it.")
 
     print("=" * 60)
     if is_update:
@@ -726,7 +1237,24 @@ def main():
         print("  EasyClaw OpenClaw Deployer (NEW DEPLOYMENT)")
     print("=" * 60)
 
+    from deploy_history import RunRecorder, history_path
+
+    global HISTORY
+    HISTORY = None  # --preflight-only changes nothing and is not recorded
+    if not args.preflight_only:
+        mode = ("blue-green" if args.blue_green else "update") if is_update else "new"
+        HISTORY = RunRecorder(history_path(args.history_file or env.get("OPENCLAW_HISTORY_FILE")),
+                              args.bot_name, mode)
+        HISTORY.set(image_tag=OPENCLAW_IMAGE.split(":")[-1], profile=args.profile)
+
     try:
+        if not args.skip_preflight:
+            step(0, "Preflight Checks")
+            if not preflight(args, is_update, args.preflight_timeout):
+                raise RuntimeError("Preflight failed; nothing was changed. Fix the above or pass --skip-preflight.")
+            if args.preflight_only:
+                return
+
         if is_update:
             # ===== UPDATE MODE =====
             project_id = args.project_id
@@ -742,47 +1270,109 @@ def main():
             step(2, "Verifying Existing Deployment")
             find_existing_deployment(args.zeabur_token, project_id, service_id, env_id)
 
-            # Step 3: Configure env vars
-            step(3, "Updating Environment Variables")
-            configure_service(
-                args.zeabur_token,
-                service_id,
-                env_id,
-                args.gateway_token,
-                args.ai_provider,
-                args.ai_key,
-                args.telegram_token,
-                args.discord_token,
-                args.brave_api_key,
-                args.telegram_webhook_url,
-                args.telegram_webhook_secret,
-                args.telegram_webhook_path,
-            )
+            # Blue/green: everything below configures a new (green) service;
+            # the old (blue) one keeps serving until the cutover.
+            blue_id, green_id, n = service_id, None, 0
+            if args.blue_green:
+                if args.reload:
+                    raise RuntimeError("--blue-green and --reload cannot be combined")
+                if not (domain or "").endswith(".zeabur.app"):
+                    raise RuntimeError("--blue-green needs the bot's generated *.zeabur.app domain in the state store")
+                if args.telegram_token and not args.telegram_webhook_url:
+                    # Both services would call getUpdates: 409 conflicts and updates split between them
+                    raise RuntimeError("--blue-green needs Telegram webhook mode (TELEGRAM_WEBHOOK_URL); "
+                                       "long polling cannot run on two services at once")
+                n = 1
+                step(3, "Deploying Green Service")
+                service_id = deploy_template(args.zeabur_token, project_id, args.profile, exclude={blue_id},
+                                             server_id=bot.get("server_id"))["service_id"]
+                green_id = service_id
 
-            # Step 4: Set start command with config
-            step(4, "Setting Config & Start Command")
-            set_start_command(
-                args.zeabur_token,
-                service_id,
-                args.gateway_token,
-                args.ai_provider,
-                args.ai_key,
-                args.dm_policy,
-                args.telegram_user_id,
-                args.telegram_token,
-                args.telegram_webhook_url,
-                args.telegram_webhook_secret,
-                args.telegram_webhook_path,
-            )
+            try:
+                # Step 3: Configure env vars
+                step(3 + n, "Updating Environment Variables")
+                configure_service(
+                    args.zeabur_token,
+                    service_id,
+                    env_id,
+                    args.gateway_token,
+                    args.ai_provider,
+                    args.ai_key,
+                    args.telegram_token,
+                    args.discord_token,
+                    args.brave_api_key,
+                    args.telegram_webhook_url,
+                    args.telegram_webhook_secret,
+                    args.telegram_webhook_path,
+                    args.profile,
+                )
 
-            # Step 5: Update image
-            image_tag = OPENCLAW_IMAGE.split(":")[-1]
-            step(5, f"Updating Image to {image_tag}")
-            update_service_image(args.zeabur_token, service_id, env_id, image_tag)
+                # Step 4: Set start command with config
+                step(4 + n, "Setting Config & Start Command")
+                config = set_start_command(
+                    args.zeabur_token,
+                    service_id,
+                    args.gateway_token,
+                    args.ai_provider,
+                    args.ai_key,
+                    args.dm_policy,
+                    args.telegram_user_id,
+                    args.telegram_token,
+                    args.telegram_webhook_url,
+                    args.telegram_webhook_secret,
+                    args.telegram_webhook_path,
+                    args.profile,
+                )
 
-            # Step 6: Restart
-            step(6, "Restarting Service")
-            restart_service(args.zeabur_token, service_id, env_id)
+                image_tag = OPENCLAW_IMAGE.split(":")[-1]
+                runtime = runtime_hash(image_tag, args.profile, args.gateway_token, args.telegram_token,
+                                       args.discord_token, args.brave_api_key)
+                reloaded = False
+                if args.reload:
+                    # Step 5: Hot reload when nothing read at container start changed
+                    step(5, "Reloading Config (no restart)")
+                    if bot.get("runtime_hash") != runtime:
+                        print("  Image, profile, gateway token or channel tokens changed — restart required.")
+                    else:
+                        start = time.time()
+                        reloaded = reload_config(args.zeabur_token, service_id, env_id, config,
+                                                 auth_profiles(args.ai_provider, args.ai_key, config))
+                        HISTORY.set(reload_seconds=round(time.time() - start, 3) if reloaded else None)
+                        if not reloaded:
+                            print("  Falling back to restart.")
+
+                if args.blue_green:
+                    # Step 6: Health-check green, then move the domain over
+                    step(6, "Blue/Green Cutover")
+                    server_id = bot.get("server_id") or get_server(args.zeabur_token)["_id"]
+                    HISTORY.set(time_to_ready=blue_green_cutover(args.zeabur_token, env_id, blue_id, service_id,
+                                                                 domain, server_id))
+                    # The domain now points at green: keep it and record it
+                    # before touching blue.
+                    green_id = None
+                    save_deployment_ids(state, args.bot_name, project_id, service_id, env_id, domain)
+            except Exception:
+                if green_id:
+                    print("  Green failed before cutover; removing it (blue keeps serving).")
+                    try:
+                        retire_service(args.zeabur_token, green_id, env_id)
+                    except Exception as e:
+                        print(f"  Warning: could not remove green service {green_id}: {e}")
+                raise
+            if args.blue_green:
+                try:
+                    retire_service(args.zeabur_token, blue_id, env_id)
+                except Exception as e:
+                    print(f"  Warning: could not remove old service {blue_id}: {e} (delete it in the dashboard)")
+
+            if not reloaded and not args.blue_green:
+                # Step 5: Update image
+                step(5, "Updating Image")
+                update_service_image(args.zeabur_token, service_id, env_id, image_tag)
+
+                # Step 6: Restart
+                step(6, "Restarting Service")
+                HISTORY.set(time_to_ready=restart_and_wait(args.zeabur_token, service_id, env_id, domain))
 
             # Step 7: Configure Telegram webhook (optional)
             if args.telegram_webhook_url:
@@ -791,6 +1381,8 @@ def main():
                     args.telegram_token,
                     args.telegram_webhook_url,
                     args.telegram_webhook_secret,
+                    args.webhook_options,
+                    drop_pending=not args.blue_green,
                 )
                 next_step = 8
             else:
@@ -798,20 +1390,31 @@ def main():
                 clear_telegram_webhook(args.telegram_token)
                 next_step = 8
 
+            # Record the applied state (also migrates legacy .env IDs)
+            save_deployment_ids(
+                state, args.bot_name, project_id, service_id, env_id, domain,
+                config_hash=config_hash(config), runtime_hash=runtime, image_tag=image_tag, profile=args.profile,
+                dm_policy=args.dm_policy,
+                webhook_path=args.telegram_webhook_path if args.telegram_webhook_url else None,
+            )
+
             # Verify
             step(next_step, "Verifying Deployment")
             if domain:
-                verify_deployment(args.zeabur_token, project_id, service_id, env_id, domain)
+                verify_deployment(args.zeabur_token, project_id, service_id, env_id, domain,
+                                  args.telegram_webhook_path if args.telegram_webhook_url else None)
             else:
                 print("  No domain stored — skipping HTTP check")
-                data = gql(args.zeabur_token, f'query{{service(_id:"{service_id}"){{name status}}}}')
+                data = gql(args.zeabur_token, "ServiceStatus", {"id": service_id})
                 print(f"  Service status: {data['service']['status']}")
 
             # Summary
             print("\n" + "=" * 60)
             print("  UPDATE SUMMARY")
             print("=" * 60)
-            print(f"  Mode:        Update (in-place)")
+            mode = "blue/green" if args.blue_green else "hot reload" if reloaded else "in-place restart"
+            print(f"  Mode:        Update ({mode})")
+            print(f"  Bot:         {args.bot_name}")
             if domain:
                 print(f"  Control UI:  https://{domain}")
                 print(f"  WebChat:     https://{domain}/__openclaw__/webchat/")
@@ -819,6 +1422,7 @@ def main():
             print(f"  Service ID:  {service_id}")
             print(f"  AI Provider: {args.ai_provider or 'kimi-coding'}")
             print(f"  DM Policy:   {args.dm_policy}")
+            print(f"  Profile:     {args.profile}")
             print("=" * 60)
 
         else:
@@ -838,7 +1442,7 @@ def main():
 
             # Step 4: Deploy template
             step(4, "Deploying OpenClaw")
-            ids = deploy_template(args.zeabur_token, project_id)
+            ids = deploy_template(args.zeabur_token, project_id, args.profile, server_id=server["_id"])
             service_id = ids["service_id"]
             env_id = ids["environment_id"]
 
@@ -857,6 +1461,7 @@ def main():
                 args.telegram_webhook_url,
                 args.telegram_webhook_secret,
                 args.telegram_webhook_path,
+                args.profile,
             )
 
             # Step 6: Add domain
@@ -882,7 +1487,7 @@ def main():
 
             # Step 8: Set start command with config (now includes webhook URL)
             step(8, "Setting Config & Start Command")
-            set_start_command(
+            config = set_start_command(
                 args.zeabur_token,
                 service_id,
                 args.gateway_token,
@@ -894,11 +1499,12 @@ def main():
                 args.telegram_webhook_url,
                 args.telegram_webhook_secret,
                 args.telegram_webhook_path,
+                args.profile,
             )
 
             # Step 9: Restart to pick up config changes
             step(9, "Restarting Service")
-            restart_service(args.zeabur_token, service_id, env_id)
+            HISTORY.set(time_to_ready=restart_and_wait(args.zeabur_token, service_id, env_id, domain))
 
             # Step 10: Configure Telegram webhook (optional)
             if args.telegram_webhook_url:
@@ -907,6 +1513,7 @@ def main():
                     args.telegram_token,
                     args.telegram_webhook_url,
                     args.telegram_webhook_secret,
+                    args.webhook_options,
                 )
                 next_step = 11
             else:
@@ -916,19 +1523,40 @@ def main():
 
             # Verify
             step(next_step, "Verifying Deployment")
-            verify_deployment(args.zeabur_token, project_id, service_id, env_id, domain)
-
-            # Save deployment IDs to .env for future updates
-            if args.env_file:
-                save_deployment_ids(args.env_file, project_id, service_id, env_id, domain)
-                print(f"\n  Deployment IDs saved to {args.env_file}")
+            verify_deployment(args.zeabur_token, project_id, service_id, env_id, domain,
+                              args.telegram_webhook_path if args.telegram_webhook_url else None)
+
+            # Save deployment IDs to the state store for future updates
+            if args.force_new:
+                state.remove(args.bot_name)  # no stale fields from the replaced deployment
+            save_deployment_ids(
+                state, args.bot_name, project_id, service_id, env_id, domain,
+                server_id=server["_id"],
+                config_hash=config_hash(config),
+                runtime_hash=runtime_hash(OPENCLAW_IMAGE.split(":")[-1], args.profile, args.gateway_token,
+                                          args.telegram_token, args.discord_token, args.brave_api_key),
+                image_tag=OPENCLAW_IMAGE.split(":")[-1],
+                profile=args.profile,
+                dm_policy=args.dm_policy,
+                webhook_path=args.telegram_webhook_path if args.telegram_webhook_url else None,
+            )
+            print(f"\n  Deployment IDs saved to {args.state_file} (bot: {args.bot_name})")
+            if not generated_name:
                 print(f"  Next run will use UPDATE mode automatically.")
+            elif args.env_file and os.path.exists(args.env_file):
+                # The name was generated: keep it, or the next run deploys another bot
+                with open(args.env_file, "a") as f:
+                    f.write(f"\nBOT_NAME={args.bot_name}\n")
+                print(f"  BOT_NAME={args.bot_name} added to {args.env_file}; next run will use UPDATE mode automatically.")
+            else:
+                print(f"  Generated bot name: pass --bot-name {args.bot_name} next time to update this bot.")
 
             # Summary
             print("\n" + "=" * 60)
             print("  DEPLOYMENT SUMMARY")
             print("=" * 60)
             print(f"  Mode:        New deployment")
+            print(f"  Bot:         {args.bot_name}")
             print(f"  Control UI:  https://{domain}")
             print(f"  WebChat:     https://{domain}/__openclaw__/webchat/")
             print(f"  Gateway Token: {args.gateway_token}")
@@ -941,8 +1569,15 @@ def main():
 
     except Exception as e:
         print(f"\nError: {e}")
+        if HISTORY:
+            HISTORY.set(endpoint=ACTIVE_API_URL, error=str(e))
+            HISTORY.finish(ok=False)
         sys.exit(1)
 
+    if HISTORY:
+        HISTORY.set(endpoint=ACTIVE_API_URL)
+        HISTORY.finish(ok=True)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Deploy latency history and regression detection.
+
+Every deploy.py run appends one JSON line to the history file: per-step
+durations, time from restart to ready, the image tag and the API endpoint
+used. `report` shows trends per image tag and flags runs whose
+time-to-ready exceeds the rolling median of the preceding runs of the same
+bot and mode (new / update / blue-green) by --factor.
+
+Usage:
+    python deploy_history.py report
+    python deploy_history.py report --bot my-bot --window 10 --factor 1.5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+DEFAULT_HISTORY_FILE = ".openclaw-history.jsonl"
+
+
+def history_path(path: str = None) -> str:
+    return path or os.environ.get("OPENCLAW_HISTORY_FILE") or DEFAULT_HISTORY_FILE
+
+
+class RunRecorder:
+    """Collects step timings for one deploy run and appends them to the history file."""
+
+    def __init__(self, path: str, bot: str, mode: str):
+        self.path = path
+        self.record = {
+            "bot": bot,
+            "mode": mode,
+            "started_at": time.time(),
+            "image_tag": None,
+            "endpoint": None,
+            "steps": {},
+            "time_to_ready": None,
+            "total": None,
+            "ok": False,
+        }
+        self._step = None
+        self._step_started = None
+
+    def begin_step(self, name: str):
+        self._close_step()
+        self._step = name
+        self._step_started = time.perf_counter()
+
+    def _close_step(self):
+        if self._step is not None:
+            elapsed = time.perf_counter() - self._step_started
+            self.record["steps"][self._step] = round(self.record["steps"].get(self._step, 0) + elapsed, 3)
+            self._step = None
+
+    def set(self, **fields):
+        self.record.update(fields)
+
+    def finish(self, ok: bool):
+        self._close_step()
+        self.record["ok"] = ok
+        self.record["total"] = round(time.time() - self.record["started_at"], 3)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.record, separators=(",", ":")) + "\n")
+
+
+def load_history(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    runs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    runs.append(json.loads(line))
+                except ValueError:
+                    continue
+    return sorted(runs, key=lambda r: r["started_at"])
+
+
+def flag_regressions(runs: list, window: int = 10, factor: float = 1.5, min_baseline: int = 3) -> list:
+    """Return [(run, baseline_seconds)] whose time_to_ready exceeds factor x rolling median.
+
+    Each run is compared only with earlier runs of the same bot and mode: a
+    fresh deploy or a blue/green cutover is not a regression of a restart.
+    """
+    flagged = []
+    previous = {}
+    for run in runs:
+        ttr = run.get("time_to_ready")
+        if ttr is None:
+            continue
+        history = previous.setdefault((run.get("bot"), run.get("mode")), [])
+        if len(history) >= min_baseline:
+            baseline = statistics.median(history[-window:])
+            if ttr > baseline * factor:
+                flagged.append((run, baseline))
+        history.append(ttr)
+    return flagged
+
+
+def _fmt(seconds) -> str:
+    return f"{seconds:6.1f}s" if seconds is not None else "      -"
+
+
+def report(runs: list, window: int, factor: float):
+    print(f"Runs: {len(runs)} ({sum(1 for r in runs if r.get('ok'))} successful)")
+
+    by_tag = {}
+    for run in runs:
+        by_tag.setdefault(run.get("image_tag") or "(unknown)", []).append(run)
+    print(f"\n{'image tag':<22} {'runs':>4} {'ready p50':>10} {'ready max':>10} {'total p50':>10}  slowest step (median)")
+    for tag, tag_runs in sorted(by_tag.items(), key=lambda kv: kv[1][0]["started_at"]):
+        ready = [r["time_to_ready"] for r in tag_runs if r.get("time_to_ready") is not None]
+        totals = [r["total"] for r in tag_runs if r.get("total") is not None]
+        step_times = {}
+        for r in tag_runs:
+            for name, seconds in (r.get("steps") or {}).items():
+                step_times.setdefault(name, []).append(seconds)
+        slowest = max(step_times.items(), key=lambda kv: statistics.median(kv[1]), default=None)
+        slowest_label = f"{slowest[0]} ({statistics.median(slowest[1]):.1f}s)" if slowest else "-"
+        print(
+            f"{tag:<22} {len(tag_runs):>4} "
+            f"{_fmt(statistics.median(ready) if ready else None):>10} {_fmt(max(ready) if ready else None):>10} "
+            f"{_fmt(statistics.median(totals) if totals else None):>10}  {slowest_label}"
+        )
+
+    flagged = flag_regressions(runs, window, factor)
+    print(f"\nRegressions (time-to-ready > {factor:g}x rolling median of the previous {window} runs "
+          f"of the same bot and mode): {len(flagged)}")
+    for run, baseline in flagged:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["started_at"]))
+        print(f"  {when} {run.get('bot')} {run.get('mode')} [{run.get('image_tag')}] ready in {run['time_to_ready']:.1f}s "
+              f"(baseline {baseline:.1f}s, endpoint {run.get('endpoint')})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show deploy latency trends and flag time-to-ready regressions.")
+    parser.add_argument("command", choices=["report"])
+    parser.add_argument("--history-file", help=f"History file (default: OPENCLAW_HISTORY_FILE or {DEFAULT_HISTORY_FILE})")
+    parser.add_argument("--bot", help="Only runs for this bot")
+    parser.add_argument("--window", type=int, default=10, help="Rolling baseline size (default: 10)")
+    parser.add_argument("--factor", type=float, default=1.5, help="Regression threshold vs baseline (default: 1.5)")
+    args = parser.parse_args()
+
+    path = history_path(args.history_file)
+    runs = load_history(path)
+    if args.bot:
+        runs = [r for r in runs if r.get("bot") == args.bot]
+    if not runs:
+        print(f"No deploy runs recorded in {path}")
+        sys.exit(1)
+    report(runs, args.window, args.factor)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Local deployment state store for OpenClaw bots.
+
+One JSON file holds every bot deployed from this machine, keyed by bot name.
+Writes are atomic (temp file + rename), and lookups by service id or domain
+go through in-memory indexes rebuilt on load.
+
+Usage:
+    from deploy_state import DeployState
+    state = DeployState(".openclaw-state.json")
+    state.put("my-bot", project_id="...", service_id="...", environment_id="...")
+    bot = state.get("my-bot")
+    bot = state.by_service_id("67ab...")
+"""
+
+import json
+import os
+import time
+
+DEFAULT_STATE_FILE = ".openclaw-state.json"
+STATE_VERSION = 1
+
+# Fields a bot record may hold. Unknown keys passed to put() are rejected so
+# typos don't silently create parallel fields.
+BOT_FIELDS = (
+    "project_id",
+    "service_id",
+    "environment_id",
+    "server_id",
+    "domain",
+    "webhook_path",
+    "config_hash",
+    "runtime_hash",
+    "image_tag",
+    "profile",
+    "dm_policy",
+    "created_at",
+    "updated_at",
+)
+
+
+def config_hash(config: dict) -> str:
+    """Stable hash of an OpenClaw config dict (key order independent)."""
+    import hashlib
+
+    canonical = json.dumps(config, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def normalize_service_id(value: str) -> str:
+    if not value:
+        return ""
+    return value.removeprefix("service-").strip()
+
+
+class DeployState:
+    def __init__(self, path: str = DEFAULT_STATE_FILE):
+        self.path = path
+        self.bots = {}
+        self._by_service = {}
+        self._by_domain = {}
+        self.load()
+
+    # === Persistence ===
+    def load(self):
+        if not os.path.exists(self.path):
+            self.bots = {}
+        else:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.bots = data.get("bots", {})
+        self._reindex()
+
+    def save(self):
+        """Write the whole store atomically so a crash never leaves a torn file."""
+        import tempfile
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".state-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": STATE_VERSION, "bots": self.bots}, f, indent=2, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _reindex(self):
+        self._by_service = {}
+        self._by_domain = {}
+        for name, bot in self.bots.items():
+            if bot.get("service_id"):
+                self._by_service[bot["service_id"]] = name
+            if bot.get("domain"):
+                self._by_domain[bot["domain"]] = name
+
+    # === Lookups ===
+    def get(self, name: str) -> dict:
+        """Return the bot record (with its name) or None."""
+        bot = self.bots.get(name)
+        return dict(bot, name=name) if bot else None
+
+    def by_service_id(self, service_id: str) -> dict:
+        name = self._by_service.get(normalize_service_id(service_id))
+        return self.get(name) if name else None
+
+    def by_domain(self, domain: str) -> dict:
+        name = self._by_domain.get(domain)
+        return self.get(name) if name else None
+
+    def names(self) -> list:
+        return sorted(self.bots)
+
+    def all(self) -> list:
+        return [self.get(name) for name in self.names()]
+
+    def project_regions(self) -> dict:
+        """{project id: "server-<id>"} for recorded bots (see Topology.build)."""
+        return {
+            bot["project_id"]: f"server-{bot['server_id']}"
+            for bot in self.bots.values()
+            if bot.get("project_id") and bot.get("server_id")
+        }
+
+    # === Mutations ===
+    def put(self, name: str, **fields) -> dict:
+        """Create or update a bot record and persist the store."""
+        unknown = set(fields) - set(BOT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown bot state field(s): {', '.join(sorted(unknown))}")
+        if "service_id" in fields:
+            fields["service_id"] = normalize_service_id(fields["service_id"])
+        now = int(time.time())
+        bot = self.bots.setdefault(name, {"created_at": now})
+        bot.update({k: v for k, v in fields.items() if v is not None})
+        bot["updated_at"] = now
+        self._reindex()
+        self.save()
+        return self.get(name)
+
+    def remove(self, name: str) -> bool:
+        if self.bots.pop(name, None) is None:
+            return False
+        self._reindex()
+        self.save()
+        return True
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Watch .env files and push only what changed to the running bot.
+
+Watches one env file or a directory of per-bot env files (inotify through
+ctypes on Linux, mtime polling elsewhere). Bursts of edits are debounced;
+then only the changed file is re-read and diffed against its last applied
+version, and the change goes out through the cheapest path that covers it:
+
+    none     local-only keys (ZEABUR_TOKEN, BOT_NAME, legacy IDs, ...)
+    env      other *_API_KEY and OPENCLAW_* keys: passed through as service
+             env vars (next restart); anything else is not sent to the bot
+    reload   AI key, TELEGRAM_USER_ID, DM_POLICY, webhook settings:
+             env vars + start command + hot config reload (no restart)
+    restart  GATEWAY_TOKEN, channel tokens, BRAVE_API_KEY, PROFILE:
+             env vars + start command + restart
+
+The bot for a file is resolved as deploy.py does (BOT_NAME, else SUBDOMAIN,
+else the project name for a legacy .env with only IDs); it must already be
+in the state store. Files that name no bot are skipped.
+
+Usage:
+    python env_watch.py .env
+    python env_watch.py bots/ --debounce 2
+    python env_watch.py .env --dry-run        # print plans only
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from check_server_status import read_env_file
+from deploy_state import DEFAULT_STATE_FILE, DeployState
+
+# .env key -> (path, service env vars it feeds)
+KEY_EFFECTS = {
+    "KIMI_API_KEY": ("reload", ["KIMI_API_KEY"]),
+    "MOONSHOT_API_KEY": ("reload", ["MOONSHOT_API_KEY"]),
+    "ANTHROPIC_API_KEY": ("reload", ["ANTHROPIC_API_KEY"]),
+    "OPENAI_API_KEY": ("reload", ["OPENAI_API_KEY"]),
+    "TELEGRAM_USER_ID": ("reload", []),
+    "DM_POLICY": ("reload", []),
+    "TELEGRAM_WEBHOOK_URL": ("reload", ["TELEGRAM_WEBHOOK_URL"]),
+    "TELEGRAM_WEBHOOK_SECRET": ("reload", ["TELEGRAM_WEBHOOK_SECRET"]),
+    "TELEGRAM_WEBHOOK_PATH": ("reload", ["TELEGRAM_WEBHOOK_PATH"]),
+    "TELEGRAM_WEBHOOK_MAX_CONNECTIONS": ("reload", []),
+    "TELEGRAM_ALLOWED_UPDATES": ("reload", []),
+    "TELEGRAM_WEBHOOK_IP": ("reload", []),
+    "GATEWAY_TOKEN": ("restart", ["OPENCLAW_GATEWAY_TOKEN"]),
+    "TELEGRAM_BOT_TOKEN": ("restart", ["TELEGRAM_BOT_TOKEN", "OPENCLAW_TELEGRAM_BOT_TOKEN"]),
+    "DISCORD_BOT_TOKEN": ("restart", ["DISCORD_BOT_TOKEN"]),
+    "BRAVE_API_KEY": ("restart", ["BRAVE_API_KEY"]),
+    "PROFILE": ("restart", ["NODE_OPTIONS"]),
+}
+LOCAL_KEYS = {
+    "ZEABUR_TOKEN", "BOT_NAME", "PROJECT_ID", "SERVICE_ID", "ENVIRONMENT_ID", "DOMAIN",
+    "OPENCLAW_STATE_FILE", "OPENCLAW_HISTORY_FILE", "OPENCLAW_SCHEMA_CACHE", "OPENCLAW_CONTROLLER_TOKEN",
+}
+# Other keys reach the bot only when they look like service settings; the
+# rest (operator secrets, tool settings) never leave this machine.
+PASSTHROUGH_PREFIXES = ("OPENCLAW_",)
+PASSTHROUGH_SUFFIXES = ("_API_KEY",)
+# Changing these needs a full deploy.py run; the watcher only warns.
+DEPLOY_KEYS = {"SUBDOMAIN"}
+# Keys that change what is registered with Telegram's setWebhook.
+WEBHOOK_KEYS = {
+    "TELEGRAM_WEBHOOK_URL", "TELEGRAM_WEBHOOK_SECRET", "TELEGRAM_WEBHOOK_PATH", "TELEGRAM_WEBHOOK_MAX_CONNECTIONS",
+    "TELEGRAM_ALLOWED_UPDATES", "TELEGRAM_WEBHOOK_IP", "DM_POLICY", "PROFILE",
+}
+TIERS = ("none", "env", "reload", "restart")
+
+
+def is_env_file(name: str) -> bool:
+    return name == ".env" or (name.endswith(".env") and not name.startswith(".env."))
+
+
+def diff_env(old: dict, new: dict) -> dict:
+    """{key: (old value, new value)} for keys added, removed or changed."""
+    return {k: (old.get(k), new.get(k)) for k in sorted(set(old) | set(new)) if old.get(k) != new.get(k)}
+
+
+def plan_changes(changes: dict) -> dict:
+    """Cheapest path covering every changed key, plus the env var keys to push."""
+    tier = "none"
+    env_keys, passthrough, warnings = [], [], []
+    for key in changes:
+        if key in LOCAL_KEYS:
+            continue
+        if key in DEPLOY_KEYS:
+            warnings.append(f"{key} changed: run deploy.py to apply it")
+            continue
+        if key in KEY_EFFECTS:
+            path, _ = KEY_EFFECTS[key]
+            env_keys.append(key)
+        elif key.startswith(PASSTHROUGH_PREFIXES) or key.endswith(PASSTHROUGH_SUFFIXES):
+            path = "env"
+            passthrough.append(key)
+        else:
+            warnings.append(f"{key} is not a bot setting; not sent to the service")
+            continue
+        tier = max(tier, path, key=TIERS.index)
+    return {"tier": tier, "keys": env_keys, "passthrough": passthrough, "warnings": warnings}
+
+
+def bot_name_for(env: dict) -> str:
+    """deploy.py's bot name for these settings, or None when it would generate one."""
+    from deploy import default_bot_name
+
+    return default_bot_name(env, env.get("SUBDOMAIN"))
+
+
+def apply_plan(plan: dict, env: dict, bot: dict, state: DeployState, changes: dict):
+    """Push the plan through deploy.py's building blocks."""
+    import deploy
+
+    token = env.get("ZEABUR_TOKEN")
+    if not token:
+        raise RuntimeError("ZEABUR_TOKEN missing")
+    service_id, env_id = bot["service_id"], bot["environment_id"]
+    profile = env.get("PROFILE") or bot.get("profile") or deploy.DEFAULT_PROFILE
+
+    # Env vars first, so a later restart boots with them.
+    for key in plan["keys"]:
+        for var in KEY_EFFECTS[key][1]:
+            value = env.get(key)
+            if var == "NODE_OPTIONS":
+                value = deploy.node_options(profile)
+            if value:
+                deploy.set_env_var(token, service_id, env_id, var, value)
+    for key in plan["passthrough"]:
+        if env.get(key):
+            deploy.set_env_var(token, service_id, env_id, key, env[key])
+    if plan["tier"] in ("none", "env"):
+        if plan["passthrough"]:
+            print("  Pass-through env vars take effect on the next restart.")
+        return
+
+    gateway_token = env.get("GATEWAY_TOKEN")
+    if not gateway_token:
+        raise RuntimeError("GATEWAY_TOKEN missing (needed to rebuild the start command)")
+    ai_provider, ai_key = deploy.ai_settings(env)
+    webhook_path = env.get("TELEGRAM_WEBHOOK_PATH")
+    webhook_url = env.get("TELEGRAM_WEBHOOK_URL")
+    if not webhook_url and webhook_path and bot.get("domain"):
+        webhook_url = f"https://{bot['domain']}{webhook_path}"
+    if webhook_url and not webhook_path:
+        webhook_path = "/telegram-webhook"
+    webhook_secret = env.get("TELEGRAM_WEBHOOK_SECRET")
+    dm_policy = env.get("DM_POLICY") or bot.get("dm_policy") or "allowlist"
+    options = None
+    if webhook_url:
+        options = deploy.webhook_options(profile, dm_policy, env.get("TELEGRAM_WEBHOOK_MAX_CONNECTIONS") or None,
+                                         env.get("TELEGRAM_ALLOWED_UPDATES"), env.get("TELEGRAM_WEBHOOK_IP"))
+
+    config = deploy.set_start_command(
+        token, service_id, gateway_token, ai_provider, ai_key, dm_policy,
+        env.get("TELEGRAM_USER_ID"), env.get("TELEGRAM_BOT_TOKEN"),
+        webhook_url, webhook_secret, webhook_path, profile,
+    )
+    runtime = deploy.runtime_hash(bot.get("image_tag") or deploy.OPENCLAW_IMAGE.split(":")[-1], profile,
+                                  gateway_token, env.get("TELEGRAM_BOT_TOKEN"), env.get("DISCORD_BOT_TOKEN"),
+                                  env.get("BRAVE_API_KEY") or None)
+    reloaded = plan["tier"] == "reload" and deploy.reload_config(
+        token, service_id, env_id, config, deploy.auth_profiles(ai_provider, ai_key, config))
+    if not reloaded:
+        deploy.restart_service(token, service_id, env_id, wait=0)
+
+    if webhook_url and WEBHOOK_KEYS & set(changes):
+        deploy.set_telegram_webhook(env.get("TELEGRAM_BOT_TOKEN"), webhook_url, webhook_secret, options)
+    elif not webhook_url and {"TELEGRAM_WEBHOOK_URL", "TELEGRAM_WEBHOOK_PATH"} & set(changes):
+        deploy.clear_telegram_webhook(env.get("TELEGRAM_BOT_TOKEN"))
+
+    state.put(bot["name"], config_hash=deploy.config_hash(config), runtime_hash=runtime,
+              profile=profile, dm_policy=dm_policy, webhook_path=webhook_path if webhook_url else None)
+    print(f"  Applied via {'hot reload' if reloaded else 'restart'}.")
+
+
+# === Watchers ===
+class InotifyWatcher:
+    """inotify(7) through ctypes; watches directories so editor renames are seen."""
+
+    IN_MODIFY = 0x2
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+
+    def __init__(self, paths: list):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        for directory in {p if os.path.isdir(p) else os.path.dirname(os.path.abspath(p)) for p in paths}:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), mask)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch {directory} failed")
+            self.dirs[wd] = directory
+
+    def read(self, timeout: float) -> set:
+        import select
+        import struct
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 65536)
+        changed, offset = set(), 0
+        while offset < len(data):
+            wd, _, _, length = struct.unpack_from("iIII", data, offset)
+            name = data[offset + 16:offset + 16 + length].rstrip(b"\0").decode()
+            offset += 16 + length
+            if name and wd in self.dirs:
+                changed.add(os.path.join(self.dirs[wd], name))
+        return changed
+
+
+class PollWatcher:
+    """Portable fallback: compare (mtime, size) of every candidate file."""
+
+    def __init__(self, paths: list, interval: float = 1.0):
+        self.paths = paths
+        self.interval = interval
+        self.seen = self._scan()
+
+    def _scan(self) -> dict:
+        stats = {}
+        for p in self.paths:
+            files = [os.path.join(p, n) for n in os.listdir(p)] if os.path.isdir(p) else [p]
+            for f in files:
+                try:
+                    st = os.stat(f)
+                except FileNotFoundError:
+                    continue
+                stats[os.path.abspath(f)] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def read(self, timeout: float) -> set:
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        changed = {f for f, sig in current.items() if self.seen.get(f) != sig}
+        self.seen = current
+        return changed
+
+
+def make_watcher(paths: list, force_poll: bool = False):
+    if not force_poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}); polling instead")
+    return PollWatcher(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch .env files and apply changes to running bots.")
+    parser.add_argument("path", nargs="?", default=".env", help="Env file or directory of *.env files (default: .env)")
+    parser.add_argument("--state-file", help=f"Deployment state store (default: OPENCLAW_STATE_FILE or {DEFAULT_STATE_FILE})")
+    parser.add_argument("--debounce", type=float, default=1.0, help="Quiet seconds before applying (default: 1)")
+    parser.add_argument("--poll", action="store_true", help="Use mtime polling instead of inotify")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan for each change without applying")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"Error: {args.path} does not exist")
+        sys.exit(1)
+    target = os.path.abspath(args.path)
+    if os.path.isdir(target):
+        files = [os.path.join(target, n) for n in sorted(os.listdir(target)) if is_env_file(n)]
+    else:
+        files = [target]
+    snapshots = {f: read_env_file(f) for f in files}
+    state = DeployState(args.state_file or os.environ.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE)
+
+    def wanted(path: str) -> bool:
+        if os.path.isdir(target):
+            return os.path.dirname(path) == target and is_env_file(os.path.basename(path))
+        return path == target
+
+    def handle(path: str):
+        new = read_env_file(path)
+        changes = diff_env(snapshots.get(path, {}), new)
+        if not changes:
+            return
+        plan = plan_changes(changes)
+        name = bot_name_for(new)
+        if not name:
+            print(f"\n{os.path.basename(path)}: no BOT_NAME or SUBDOMAIN, so no bot to update; skipped")
+            snapshots[path] = new
+            return
+        print(f"\n{time.strftime('%H:%M:%S')} {os.path.basename(path)} -> {name}: "
+              f"{', '.join(changes)} changed; path: {plan['tier']}")
+        for warning in plan["warnings"]:
+            print(f"  Warning: {warning}")
+        if args.dry_run or plan["tier"] == "none":
+            snapshots[path] = new
+            return
+        state.load()
+        bot = state.get(name)
+        if not bot or not (bot.get("service_id") and bot.get("environment_id")):
+            print(f"  Error: bot '{name}' not deployed yet (not in {state.path}); run deploy.py first")
+            return
+        start = time.time()
+        try:
+            apply_plan(plan, new, bot, state, changes)
+        except Exception as e:
+            # Keep the old snapshot so the next save retries the same diff.
+            print(f"  Error: {e}")
+            return
+        snapshots[path] = new
+        print(f"  Done in {time.time() - start:.1f}s")
+
+    watcher = make_watcher([target], args.poll)
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"Watching {args.path} ({len(files)} env file(s), {kind}, debounce {args.debounce:g}s). Ctrl+C to stop.")
+    pending = {}
+    try:
+        while True:
+            for path in watcher.read(args.debounce if pending else 1.0):
+                if wanted(path):
+                    pending[path] = time.time()
+            now = time.time()
+            for path in [p for p, t in pending.items() if now - t >= args.debounce]:
+                del pending[path]
+                if os.path.exists(path):
+                    handle(path)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Concurrent multi-endpoint health prober for deployed OpenClaw bots.
+
+Each bot endpoint (Control UI, WebChat, Telegram webhook path when configured)
+is probed concurrently: a short warm-up, then N samples on fresh connections so
+TLS handshake time is measured every time. Reports p50/p95/p99 latency, median
+TLS handshake and error rate per endpoint.
+
+Usage:
+    python health_probe.py --domain my-bot.zeabur.app
+    python health_probe.py --domain my-bot.zeabur.app --webhook-path /telegram-webhook --samples 20
+    python health_probe.py --all                      # every bot in the state store
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from deploy_state import DEFAULT_STATE_FILE, DeployState
+
+WEBCHAT_PATH = "/__openclaw__/webchat/"
+DEFAULT_P95_BUDGET_MS = 2000
+# A GET on the webhook path is refused by the gateway's webhook handler
+# (missing secret or wrong method); 404 or 5xx mean it isn't routed there.
+WEBHOOK_OK_STATUSES = (401, 403, 405)
+
+
+def bot_endpoints(domain: str, webhook_path: str = None) -> list:
+    """(label, url, ok_status) for each endpoint a bot should answer on.
+
+    ok_status is the highest healthy status, or a tuple of the accepted ones:
+    the webhook path only accepts signed POSTs, so a GET is healthy only when
+    the webhook handler itself refuses it (WEBHOOK_OK_STATUSES).
+    """
+    endpoints = [
+        ("control-ui", f"https://{domain}/", 399),
+        ("webchat", f"https://{domain}{WEBCHAT_PATH}", 399),
+    ]
+    if webhook_path:
+        endpoints.append(("telegram-webhook", f"https://{domain}{webhook_path}", WEBHOOK_OK_STATUSES))
+    return endpoints
+
+
+def percentile(values: list, pct: float) -> float:
+    """Linear-interpolated percentile of an unsorted list (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def status_ok(status: int, ok_status=399) -> bool:
+    """status <= ok_status, or status in ok_status when that is a collection."""
+    return status <= ok_status if isinstance(ok_status, int) else status in ok_status
+
+
+def probe_once(url: str, timeout: float = 10, ok_status=399) -> dict:
+    """One GET on a fresh connection, timing connect, TLS handshake and total."""
+    import http.client
+    import socket
+    import ssl
+    import urllib.parse
+
+    parts = urllib.parse.urlsplit(url)
+    https = parts.scheme == "https"
+    port = parts.port or (443 if https else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    result = {"ok": False, "status": None, "latency_ms": None, "connect_ms": None, "tls_ms": None, "error": None}
+    start = time.perf_counter()
+    sock = None
+    try:
+        sock = socket.create_connection((parts.hostname, port), timeout=timeout)
+        connected = time.perf_counter()
+        result["connect_ms"] = (connected - start) * 1000
+        if https:
+            ctx = ssl.create_default_context()
+            sock = ctx.wrap_socket(sock, server_hostname=parts.hostname)
+            result["tls_ms"] = (time.perf_counter() - connected) * 1000
+        conn = (http.client.HTTPSConnection if https else http.client.HTTPConnection)(
+            parts.hostname, port, timeout=timeout
+        )
+        conn.sock = sock
+        conn.request("GET", path, headers={"User-Agent": "openclaw-health-probe", "Connection": "close"})
+        resp = conn.getresponse()
+        resp.read()
+        result["latency_ms"] = (time.perf_counter() - start) * 1000
+        result["status"] = resp.status
+        result["ok"] = status_ok(resp.status, ok_status)
+        if not result["ok"]:
+            result["error"] = f"HTTP {resp.status}"
+        conn.close()
+    except Exception as e:
+        result["latency_ms"] = (time.perf_counter() - start) * 1000
+        result["error"] = f"{type(e).__name__}: {e}"
+        if sock is not None:
+            sock.close()
+    return result
+
+
+def probe_endpoint(label: str, url: str, ok_status=399, samples: int = 10,
+                   warmup: int = 2, timeout: float = 10) -> dict:
+    """Warm up, then sample one endpoint sequentially and summarize."""
+    for _ in range(warmup):
+        probe_once(url, timeout, ok_status)
+    results = [probe_once(url, timeout, ok_status) for _ in range(samples)]
+    ok = [r for r in results if r["ok"]]
+    latencies = [r["latency_ms"] for r in ok]
+    tls = [r["tls_ms"] for r in ok if r["tls_ms"] is not None]
+    errors = [r["error"] for r in results if not r["ok"]]
+    return {
+        "label": label,
+        "url": url,
+        "samples": len(results),
+        "error_rate": len(errors) / len(results) if results else 1.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "tls_ms": percentile(tls, 50),
+        "last_status": results[-1]["status"] if results else None,
+        "errors": sorted(set(errors))[:3],
+    }
+
+
+def probe_bots(bots: list, samples: int = 10, warmup: int = 2, timeout: float = 10, max_workers: int = 16) -> dict:
+    """Probe every endpoint of every bot concurrently.
+
+    bots: list of dicts with 'name', 'domain' and optional 'webhook_path'.
+    Returns {bot_name: [endpoint summary, ...]}.
+    """
+    jobs = []
+    for bot in bots:
+        for label, url, ok_status in bot_endpoints(bot["domain"], bot.get("webhook_path")):
+            jobs.append((bot["name"], label, url, ok_status))
+    report = {bot["name"]: [] for bot in bots}
+    if not jobs:
+        return report
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        futures = [
+            (name, pool.submit(probe_endpoint, label, url, ok_status, samples, warmup, timeout))
+            for name, label, url, ok_status in jobs
+        ]
+        for name, future in futures:
+            report[name].append(future.result())
+    return report
+
+
+def is_healthy(summary: dict, p95_budget_ms: float = DEFAULT_P95_BUDGET_MS, max_error_rate: float = 0.0) -> bool:
+    return (
+        summary["error_rate"] <= max_error_rate
+        and summary["p95_ms"] is not None
+        and summary["p95_ms"] <= p95_budget_ms
+    )
+
+
+def _fmt(ms) -> str:
+    return f"{ms:7.0f}" if ms is not None else "      -"
+
+
+def print_report(report: dict, p95_budget_ms: float = DEFAULT_P95_BUDGET_MS, indent: str = "  ") -> bool:
+    """Print a per-endpoint table. Returns True when every endpoint is healthy."""
+    all_ok = True
+    print(f"{indent}{'endpoint':<18} {'p50':>7} {'p95':>7} {'p99':>7} {'tls':>7}  err%  status")
+    for name, endpoints in report.items():
+        if len(report) > 1:
+            print(f"{indent}[{name}]")
+        for s in endpoints:
+            healthy = is_healthy(s, p95_budget_ms)
+            all_ok = all_ok and healthy
+            print(
+                f"{indent}{s['label']:<18} {_fmt(s['p50_ms'])} {_fmt(s['p95_ms'])} {_fmt(s['p99_ms'])} "
+                f"{_fmt(s['tls_ms'])}  {s['error_rate'] * 100:4.0f}  {'OK' if healthy else 'SLOW/ERROR'}"
+            )
+            for err in s["errors"]:
+                print(f"{indent}    {err}")
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe OpenClaw endpoints and report latency percentiles.")
+    parser.add_argument("--domain", help="Bot domain (e.g. my-bot.zeabur.app)")
+    parser.add_argument("--webhook-path", help="Telegram webhook path to probe as well")
+    parser.add_argument("--all", action="store_true", help="Probe every bot in the state store")
+    parser.add_argument("--state-file", help=f"Deployment state store (default: OPENCLAW_STATE_FILE or {DEFAULT_STATE_FILE})")
+    parser.add_argument("--samples", type=int, default=10, help="Samples per endpoint (default: 10)")
+    parser.add_argument("--warmup", type=int, default=2, help="Warm-up requests per endpoint (default: 2)")
+    parser.add_argument("--timeout", type=float, default=10, help="Per-request timeout in seconds (default: 10)")
+    parser.add_argument("--p95-budget-ms", type=float, default=DEFAULT_P95_BUDGET_MS,
+                        help=f"p95 latency considered healthy (default: {DEFAULT_P95_BUDGET_MS})")
+    args = parser.parse_args()
+
+    if args.all:
+        state = DeployState(args.state_file or os.environ.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE)
+        bots = [b for b in state.all() if b.get("domain")]
+        if not bots:
+            print(f"No bots with a domain in {state.path}")
+            sys.exit(1)
+    elif args.domain:
+        bots = [{"name": args.domain, "domain": args.domain, "webhook_path": args.webhook_path}]
+    else:
+        print("Error: pass --domain or --all")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    report = probe_bots(bots, args.samples, args.warmup, args.timeout)
+    all_ok = print_report(report, args.p95_budget_ms, indent="")
+    print(f"\n{len(bots)} bot(s) probed in {time.perf_counter() - start:.1f}s")
+    sys.exit(0 if all_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Incremental JSON splitting for large GraphQL responses.
+
+JSONStreamSplitter is fed raw response chunks as they arrive and yields each
+element of the arrays at the requested paths as soon as that element's bytes
+are complete (e.g. every project edge of a `projects` listing, or every
+`runtimeLogs` entry). Only the element currently being received is buffered,
+so memory stays bounded by the largest single record, not the response.
+
+Paths are tuples of object keys from the root, with a None step for each
+array level crossed: ("data", "projects", "edges") names the edges array and
+("data", "projects", "edges", None, "node") the node of each edge. Only values
+at exactly that depth match, so arrays nested inside a streamed element stay
+part of the element. Small values such as top-level "errors" can be captured
+whole with capture_paths.
+
+Usage:
+    splitter = JSONStreamSplitter(stream_paths=[("data", "runtimeLogs")])
+    for chunk in decoded_chunks(resp, resp.headers.get("Content-Encoding")):
+        for path, entry in splitter.feed(chunk):
+            handle(entry)
+    splitter.close()
+    errors = splitter.captured.get(("errors",))
+"""
+
+import codecs
+import json
+import re
+import zlib
+
+_STRUCTURAL = re.compile(r'["{}\[\],:]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+def accept_encoding() -> str:
+    """Accept-Encoding header value: gzip always, br when a brotli module is installed."""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return "gzip, deflate"
+    return "br, gzip, deflate"
+
+
+def decoded_chunks(raw, content_encoding: str = None, chunk_size: int = 65536):
+    """Yield decompressed chunks from a file-like HTTP response body."""
+    encoding = (content_encoding or "").strip().lower()
+    if encoding == "br":
+        import brotli
+
+        decompressor = brotli.Decompressor()
+        decompress, flush = decompressor.process, lambda: b""
+    elif encoding in ("gzip", "x-gzip", "deflate"):
+        # 16+MAX_WBITS: gzip wrapper, 32+MAX_WBITS: auto-detect zlib/gzip.
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS if "gzip" in encoding else 32 + zlib.MAX_WBITS)
+        decompress, flush = decompressor.decompress, decompressor.flush
+    else:
+        decompress, flush = (lambda b: b), (lambda: b"")
+    while True:
+        chunk = raw.read(chunk_size)
+        if not chunk:
+            break
+        out = decompress(chunk)
+        if out:
+            yield out
+    tail = flush()
+    if tail:
+        yield tail
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "key", "expect_key", "item_start")
+
+    def __init__(self, kind: str, path: tuple):
+        self.kind = kind
+        self.path = path
+        self.key = None
+        self.expect_key = kind == "obj"
+        self.item_start = None
+
+
+class JSONStreamSplitter:
+    def __init__(self, stream_paths=(), capture_paths=(("errors",),)):
+        self.stream_paths = {tuple(p) for p in stream_paths}
+        self.capture_paths = {tuple(p) for p in capture_paths}
+        self.captured = {}
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._buf = ""
+        self._pos = 0
+        self._stack = []
+        self._expect_value = True
+        self._in_string = False
+        self._string_start = None
+        self._string_is_key = False
+
+    def _value_path(self) -> tuple:
+        if not self._stack:
+            return ()
+        top = self._stack[-1]
+        return top.path + ((top.key,) if top.kind == "obj" else (None,))
+
+    def _start_value(self, index: int):
+        self._expect_value = False
+        if not self._stack:
+            return
+        top = self._stack[-1]
+        if top.kind == "arr" and top.path in self.stream_paths:
+            top.item_start = index
+        elif top.kind == "obj" and top.path + (top.key,) in self.capture_paths:
+            top.item_start = index
+
+    def _end_item(self, frame: _Frame, end: int, out: list):
+        if frame.item_start is None:
+            return
+        value = json.loads(self._buf[frame.item_start:end])
+        frame.item_start = None
+        if frame.kind == "arr":
+            out.append((frame.path, value))
+        else:
+            self.captured[frame.path + (frame.key,)] = value
+
+    def feed(self, data) -> list:
+        """Consume a chunk (bytes or str). Returns completed (path, element) pairs."""
+        if isinstance(data, bytes):
+            data = self._decoder.decode(data)
+        self._buf += data
+        buf = self._buf
+        pos = self._pos
+        n = len(buf)
+        out = []
+        while pos < n:
+            if self._in_string:
+                m = _STRING_SPECIAL.search(buf, pos)
+                if not m:
+                    pos = n
+                    break
+                if m.group() == "\\":
+                    if m.end() >= n:
+                        pos = m.start()
+                        break
+                    pos = m.end() + 1
+                    continue
+                pos = m.end()
+                self._in_string = False
+                if self._string_is_key:
+                    self._stack[-1].key = json.loads(buf[self._string_start:pos])
+                    self._stack[-1].expect_key = False
+                self._string_start = None
+                continue
+
+            m = _STRUCTURAL.search(buf, pos)
+            end = m.start() if m else n
+            if self._expect_value:
+                segment = buf[pos:end]
+                stripped = segment.lstrip()
+                if stripped:
+                    # Scalar (number/true/false/null) starts here.
+                    self._start_value(pos + len(segment) - len(stripped))
+            if not m:
+                pos = n
+                break
+
+            char = m.group()
+            if char in '{["' and self._expect_value:
+                path = self._value_path()
+                self._start_value(end)
+                if char == "{":
+                    self._stack.append(_Frame("obj", path))
+                elif char == "[":
+                    self._stack.append(_Frame("arr", path))
+                    self._expect_value = True
+                else:
+                    self._in_string = True
+                    self._string_start = end
+                    self._string_is_key = False
+            elif char == '"':
+                self._in_string = True
+                self._string_start = end
+                self._string_is_key = bool(self._stack) and self._stack[-1].expect_key
+            elif char == ":":
+                self._expect_value = True
+            elif char == ",":
+                top = self._stack[-1]
+                self._end_item(top, end, out)
+                if top.kind == "obj":
+                    top.expect_key = True
+                else:
+                    self._expect_value = True
+            else:  # } or ]
+                top = self._stack.pop()
+                self._end_item(top, end, out)
+                self._expect_value = False
+            pos = end + 1
+
+        # Drop everything no pending element or string still needs.
+        starts = [f.item_start for f in self._stack if f.item_start is not None]
+        if self._in_string:
+            starts.append(self._string_start)
+        keep = min(starts + [pos])
+        if keep:
+            self._buf = buf[keep:]
+            pos -= keep
+            for frame in self._stack:
+                if frame.item_start is not None:
+                    frame.item_start -= keep
+            if self._string_start is not None:
+                self._string_start -= keep
+        else:
+            self._buf = buf
+        self._pos = pos
+        return out
+
+    def close(self):
+        """Flush the decoder and check the document was complete."""
+        tail = self._decoder.decode(b"", final=True)
+        if tail:
+            self.feed(tail)
+        if self._stack or self._in_string:
+            raise ValueError("Truncated JSON response")
+
+
+def iter_records(chunks, stream_path: tuple, capture_paths=(("errors",),)):
+    """Yield elements of the array at stream_path from an iterable of chunks.
+
+    Returns the splitter's captured values (e.g. GraphQL errors) via StopIteration.value.
+    """
+    splitter = JSONStreamSplitter([stream_path], capture_paths)
+    for chunk in chunks:
+        for _, item in splitter.feed(chunk):
+            yield item
+    splitter.close()
+    return splitter.captured
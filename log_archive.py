@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Rotating compressed local archive of OpenClaw runtime logs.
+
+`collect` polls ZeaburClient.runtime_logs for every bot in the state store and
+appends only lines it has not seen before. Each bot gets its own directory of
+size-rotated segment files. A segment is a chain of independent gzip members
+(blocks of ~--block-kb uncompressed JSON lines), and its sidecar .idx file
+holds one line per block: first/last timestamp, byte offset and length.
+`query` bisects that sparse index and decompresses only the blocks that
+overlap the requested window.
+
+Layout:
+    <archive>/<bot>/seg-000001.log.gz   gzip members, one per block
+    <archive>/<bot>/seg-000001.idx      "<first_ts> <last_ts> <offset> <length> <lines>"
+    <archive>/<bot>/cursor.json         last archived timestamp + lines seen at it
+
+<bot> is the bot name with anything outside [A-Za-z0-9._-] replaced and a
+short hash appended, so a name can never point outside the archive.
+
+Usage:
+    python log_archive.py collect --env-file .env --interval 30
+    python log_archive.py query --bot my-bot --since 2026-10-19T02:00 --until 2026-10-19T02:15
+    python log_archive.py query --bot my-bot --since 02:00 --until 02:15     # today, local time
+"""
+
+import argparse
+import bisect
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+
+from deploy_state import DEFAULT_STATE_FILE, DeployState
+
+DEFAULT_ARCHIVE_DIR = "log-archive"
+DEFAULT_BLOCK_BYTES = 64 * 1024
+DEFAULT_SEGMENT_BYTES = 8 * 1024 * 1024
+DEFAULT_MAX_SEGMENTS = 50
+
+
+def parse_timestamp(value) -> float:
+    """Epoch seconds from an API timestamp (ISO 8601 string or epoch number)."""
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e12 else float(value)
+    text = str(value).strip()
+    if text.replace(".", "", 1).isdigit():
+        return parse_timestamp(float(text))
+    dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def parse_query_time(value: str) -> float:
+    """Query bound: ISO datetime, or HH:MM[:SS] meaning today in local time."""
+    if len(value) <= 8 and ":" in value and "T" not in value:
+        today = datetime.now().strftime("%Y-%m-%d")
+        return datetime.fromisoformat(f"{today}T{value}").timestamp()
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt.timestamp()
+
+
+def _gzip_member(data: bytes) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _line_key(entry: dict) -> str:
+    return hashlib.sha1(f"{entry['timestamp']}\x00{entry['message']}".encode()).hexdigest()[:16]
+
+
+def archive_dirname(name: str) -> str:
+    """Directory name for a bot: the name itself when it is a safe path component."""
+    safe = re.sub(r"[^A-Za-z0-9._-]", "_", name).strip(".")
+    if safe == name:
+        return safe
+    return f"{safe or 'bot'}-{hashlib.sha1(name.encode()).hexdigest()[:8]}"
+
+
+class ServiceArchive:
+    """Append-only, size-rotated log archive for one bot/service."""
+
+    def __init__(self, root: str, name: str, block_bytes: int = DEFAULT_BLOCK_BYTES,
+                 segment_bytes: int = DEFAULT_SEGMENT_BYTES, max_segments: int = DEFAULT_MAX_SEGMENTS):
+        self.dir = os.path.join(root, archive_dirname(name))
+        self.block_bytes = block_bytes
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self._pending = []
+        self._pending_size = 0
+        self._pending_since = None
+        self._cursor_path = os.path.join(self.dir, "cursor.json")
+        self.cursor = {"ts": None, "seen": []}
+        if os.path.exists(self._cursor_path):
+            with open(self._cursor_path, "r", encoding="utf-8") as f:
+                self.cursor = json.load(f)
+        # What cursor.json may claim: only lines already in a written block.
+        self._durable = {"ts": self.cursor["ts"], "seen": set(self.cursor["seen"])}
+
+    # === Writing ===
+    def append(self, entries: list) -> int:
+        """Queue entries newer than the cursor. Returns how many were new."""
+        last_ts = self.cursor["ts"]
+        seen = set(self.cursor["seen"])
+        fresh = []
+        for entry in sorted(entries, key=lambda e: parse_timestamp(e["timestamp"])):
+            ts = parse_timestamp(entry["timestamp"])
+            if last_ts is not None and ts < last_ts:
+                continue
+            key = _line_key(entry)
+            if ts == last_ts and key in seen:
+                continue
+            if ts != last_ts:
+                last_ts, seen = ts, set()
+            seen.add(key)
+            fresh.append((ts, key, entry))
+        for ts, key, entry in fresh:
+            line = json.dumps({"t": ts, "ts": entry["timestamp"], "m": entry["message"]}, ensure_ascii=False)
+            self._pending.append((ts, key, line))
+            self._pending_size += len(line) + 1
+            if self._pending_size >= self.block_bytes:
+                self._write_block()
+        if fresh:
+            self._pending_since = self._pending_since or time.time()
+            self.cursor = {"ts": last_ts, "seen": sorted(seen)}
+        return len(fresh)
+
+    def flush_if_stale(self, max_age: float):
+        if self._pending and time.time() - (self._pending_since or 0) >= max_age:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._write_block()
+
+    def _segments(self) -> list:
+        return sorted(glob.glob(os.path.join(self.dir, "seg-*.log.gz")))
+
+    def _current_segment(self) -> str:
+        segments = self._segments()
+        if segments and os.path.getsize(segments[-1]) < self.segment_bytes:
+            return segments[-1]
+        seq = int(os.path.basename(segments[-1])[4:10]) + 1 if segments else 1
+        self._enforce_retention(segments)
+        return os.path.join(self.dir, f"seg-{seq:06d}.log.gz")
+
+    def _enforce_retention(self, segments: list):
+        for old in segments[:max(0, len(segments) + 1 - self.max_segments)]:
+            os.unlink(old)
+            idx = old[:-len(".log.gz")] + ".idx"
+            if os.path.exists(idx):
+                os.unlink(idx)
+
+    def _write_block(self):
+        lines = self._pending
+        self._pending, self._pending_size, self._pending_since = [], 0, None
+        member = _gzip_member(("\n".join(line for _, _, line in lines) + "\n").encode())
+        os.makedirs(self.dir, exist_ok=True)
+        segment = self._current_segment()
+        with open(segment, "ab") as f:
+            offset = f.tell()
+            f.write(member)
+        with open(segment[:-len(".log.gz")] + ".idx", "a", encoding="utf-8") as f:
+            f.write(f"{lines[0][0]:.3f} {lines[-1][0]:.3f} {offset} {len(member)} {len(lines)}\n")
+        # The persisted cursor covers exactly the lines now on disk; lines still
+        # pending are re-fetched after a crash.
+        durable = self._durable
+        for ts, key, _ in lines:
+            if ts != durable["ts"]:
+                durable["ts"], durable["seen"] = ts, set()
+            durable["seen"].add(key)
+        tmp = self._cursor_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"ts": durable["ts"], "seen": sorted(durable["seen"])}, f)
+        os.replace(tmp, self._cursor_path)
+
+    # === Reading ===
+    def query(self, start: float, end: float):
+        """Yield archived entries with start <= t <= end, in time order."""
+        for segment in self._segments():
+            idx_path = segment[:-len(".log.gz")] + ".idx"
+            if not os.path.exists(idx_path):
+                continue
+            with open(idx_path, "r", encoding="utf-8") as f:
+                blocks = [tuple(float(x) for x in line.split()) for line in f if line.strip()]
+            if not blocks or blocks[0][0] > end or max(b[1] for b in blocks) < start:
+                continue
+            # Blocks are appended in time order: bisect on last_ts for the first candidate.
+            first = bisect.bisect_left([b[1] for b in blocks], start)
+            with open(segment, "rb") as f:
+                for first_ts, last_ts, offset, length, _ in blocks[first:]:
+                    if first_ts > end:
+                        break
+                    f.seek(int(offset))
+                    data = zlib.decompress(f.read(int(length)), 16 + zlib.MAX_WBITS)
+                    for line in data.decode("utf-8").splitlines():
+                        record = json.loads(line)
+                        if start <= record["t"] <= end:
+                            yield {"timestamp": record["ts"], "message": record["m"], "t": record["t"]}
+
+
+def collect(client, bots: list, root: str, interval: float, flush_after: float, once: bool = False, **archive_opts):
+    """Poll every bot's runtime logs and archive new lines until interrupted."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    archives = {b["name"]: ServiceArchive(root, b["name"], **archive_opts) for b in bots}
+
+    def poll(bot):
+        try:
+            entries = client.runtime_logs(bot["project_id"], bot["service_id"], bot["environment_id"])
+            return bot["name"], archives[bot["name"]].append(entries), None
+        except Exception as e:
+            return bot["name"], 0, str(e)
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(8, len(bots))) as pool:
+            while True:
+                started = time.time()
+                for name, count, error in pool.map(poll, bots):
+                    if error:
+                        print(f"  {name}: error: {error}")
+                    elif count:
+                        print(f"  {name}: +{count} line(s)")
+                for archive in archives.values():
+                    archive.flush_if_stale(flush_after)
+                if once:
+                    break
+                time.sleep(max(0.0, interval - (time.time() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for archive in archives.values():
+            archive.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive OpenClaw runtime logs locally and query them by time.")
+    parser.add_argument("command", choices=["collect", "query"])
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR, help=f"Archive root (default: {DEFAULT_ARCHIVE_DIR})")
+    parser.add_argument("--state-file", help=f"Deployment state store (default: OPENCLAW_STATE_FILE or {DEFAULT_STATE_FILE})")
+    parser.add_argument("--bot", action="append", help="Bot name (repeatable; collect defaults to every bot)")
+    # collect
+    parser.add_argument("--zeabur-token", help="Zeabur API token (sk-xxx)")
+    parser.add_argument("--env-file", default=".env", help="Path to .env file (default: .env)")
+    parser.add_argument("--interval", type=float, default=30, help="Seconds between polls (default: 30)")
+    parser.add_argument("--flush-after", type=float, default=300, help="Max seconds a partial block stays in memory (default: 300)")
+    parser.add_argument("--block-kb", type=int, default=DEFAULT_BLOCK_BYTES // 1024, help="Uncompressed block size (default: 64)")
+    parser.add_argument("--segment-mb", type=int, default=DEFAULT_SEGMENT_BYTES // (1024 * 1024), help="Segment rotation size (default: 8)")
+    parser.add_argument("--max-segments", type=int, default=DEFAULT_MAX_SEGMENTS, help="Segments kept per bot (default: 50)")
+    parser.add_argument("--once", action="store_true", help="Poll once, flush and exit")
+    # query
+    parser.add_argument("--since", help="Start: ISO datetime or HH:MM (today, local time)")
+    parser.add_argument("--until", help="End: ISO datetime or HH:MM (default: now)")
+    args = parser.parse_args()
+
+    if args.command == "query":
+        if not args.bot or not args.since:
+            print("Error: query needs --bot and --since")
+            sys.exit(1)
+        start = parse_query_time(args.since)
+        end = parse_query_time(args.until) if args.until else time.time()
+        for name in args.bot:
+            archive = ServiceArchive(args.archive_dir, name)
+            for entry in archive.query(start, end):
+                prefix = f"[{name}] " if len(args.bot) > 1 else ""
+                print(f"{prefix}{entry['timestamp']} | {entry['message']}")
+        return
+
+    from check_server_status import load_env_file
+
+    load_env_file(args.env_file)
+    token = args.zeabur_token or os.environ.get("ZEABUR_TOKEN")
+    if not token:
+        print("Error: missing ZEABUR_TOKEN (set in .env or --zeabur-token).")
+        sys.exit(1)
+    state = DeployState(args.state_file or os.environ.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE)
+    bots = [state.get(n) for n in args.bot] if args.bot else state.all()
+    bots = [b for b in bots if b and b.get("project_id") and b.get("service_id") and b.get("environment_id")]
+    if not bots:
+        print(f"No bots with deployment IDs in {state.path}")
+        sys.exit(1)
+
+    from zeabur_api import ZeaburClient
+
+    print(f"Archiving logs for {len(bots)} bot(s) into {args.archive_dir}/ every {args.interval:g}s (Ctrl+C to stop)")
+    collect(
+        ZeaburClient(token), bots, args.archive_dir, args.interval, args.flush_after, args.once,
+        block_bytes=args.block_kb * 1024,
+        segment_bytes=args.segment_mb * 1024 * 1024,
+        max_segments=args.max_segments,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Fetch runtime logs for many bots concurrently and print one merged timeline.
+
+Every bot's runtimeLogs response is streamed and filtered by --grep while it
+downloads, sorted per bot, then heap-merged (heapq.merge) into a single
+timestamp-ordered stream labelled by bot. Wall time is roughly that of the
+slowest single bot.
+
+Usage:
+    python log_merge.py --env-file .env                           # every bot in the state store
+    python log_merge.py --env-file .env --grep "429|timeout" -i --last 15
+    python log_merge.py --env-file .env --bots bot-a,bot-b --concurrency 32
+"""
+
+import argparse
+import heapq
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from deploy_state import DEFAULT_STATE_FILE, DeployState
+from log_archive import parse_timestamp
+
+
+def fetch_bot_logs(client, bot: dict, pattern=None, since: float = None) -> tuple:
+    """Return (bot name, sorted [(t, timestamp, message)], error)."""
+    entries = []
+    try:
+        for entry in client.iter_runtime_logs(bot["project_id"], bot["service_id"], bot["environment_id"]):
+            message = entry.get("message") or ""
+            if pattern and not pattern.search(message):
+                continue
+            t = parse_timestamp(entry["timestamp"])
+            if since is not None and t < since:
+                continue
+            entries.append((t, entry["timestamp"], message))
+    except Exception as e:
+        return bot["name"], sorted(entries), str(e)
+    entries.sort()
+    return bot["name"], entries, None
+
+
+def merged_timeline(per_bot: dict):
+    """Heap-merge per-bot sorted lists into (t, timestamp, bot, message) tuples."""
+    def labelled(name, entries):
+        for t, ts, msg in entries:
+            yield t, ts, name, msg
+
+    return heapq.merge(*(labelled(name, entries) for name, entries in per_bot.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge runtime logs from many OpenClaw bots into one timeline.")
+    parser.add_argument("--zeabur-token", help="Zeabur API token (sk-xxx)")
+    parser.add_argument("--env-file", default=".env", help="Path to .env file (default: .env)")
+    parser.add_argument("--state-file", help=f"Deployment state store (default: OPENCLAW_STATE_FILE or {DEFAULT_STATE_FILE})")
+    parser.add_argument("--bots", help="Comma-separated bot names (default: every bot in the state store)")
+    parser.add_argument("--grep", help="Only keep lines matching this regular expression")
+    parser.add_argument("-i", "--ignore-case", action="store_true", help="Case-insensitive --grep")
+    parser.add_argument("--last", type=float, help="Only keep lines from the last N minutes")
+    parser.add_argument("--concurrency", type=int, default=16, help="Bots fetched in parallel (default: 16)")
+    args = parser.parse_args()
+
+    from check_server_status import load_env_file
+
+    load_env_file(args.env_file)
+    token = args.zeabur_token or os.environ.get("ZEABUR_TOKEN")
+    if not token:
+        print("Error: missing ZEABUR_TOKEN (set in .env or --zeabur-token).")
+        sys.exit(1)
+
+    state = DeployState(args.state_file or os.environ.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE)
+    if args.bots:
+        bots = [state.get(n.strip()) or {"name": n.strip()} for n in args.bots.split(",") if n.strip()]
+    else:
+        bots = state.all()
+    missing = [b["name"] for b in bots if not (b.get("project_id") and b.get("service_id") and b.get("environment_id"))]
+    if missing:
+        print(f"Warning: skipping bot(s) without deployment IDs: {', '.join(missing)}", file=sys.stderr)
+    bots = [b for b in bots if b["name"] not in missing]
+    if not bots:
+        print(f"No bots with deployment IDs in {state.path}")
+        sys.exit(1)
+
+    pattern = re.compile(args.grep, re.IGNORECASE if args.ignore_case else 0) if args.grep else None
+    since = time.time() - args.last * 60 if args.last else None
+
+    from zeabur_api import ZeaburClient
+
+    client = ZeaburClient(token)
+    start = time.time()
+    per_bot = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(args.concurrency, len(bots)))) as pool:
+        for name, entries, error in pool.map(lambda b: fetch_bot_logs(client, b, pattern, since), bots):
+            if error:
+                print(f"Warning: {name}: {error}", file=sys.stderr)
+            per_bot[name] = entries
+    fetched = time.time() - start
+
+    width = max(len(name) for name in per_bot)
+    count = 0
+    for _, timestamp, name, message in merged_timeline(per_bot):
+        print(f"{timestamp} [{name:<{width}}] {message}")
+        count += 1
+    print(f"\n{count} line(s) from {len(bots)} bot(s), fetched in {fetched:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
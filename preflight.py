@@ -0,0 +1,114 @@
+"""
+Preflight checks for deploy.py.
+
+Every check is independent, so they run concurrently and the whole stage
+takes about as long as the slowest single API round trip. deploy.py builds
+the network checks (Zeabur token, server, domains, Telegram getMe); the
+format checks that need no network live here.
+
+A check is a callable returning a short detail string. Raising CheckWarning
+reports a warning; any other exception is a failure. Checks with no answer by
+the deadline fail too: an unreachable API must stop the deploy, not slip
+through as a warning.
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+DEFAULT_TIMEOUT = 5.0
+
+# Telegram only delivers webhooks to these ports.
+TELEGRAM_WEBHOOK_PORTS = (443, 80, 88, 8443)
+SECRET_TOKEN_RE = re.compile(r"^[A-Za-z0-9_-]{1,256}$")
+
+# Key prefixes by provider id (see deploy.resolve_provider_id).
+AI_KEY_PREFIXES = {
+    "anthropic": ("sk-ant-",),
+    "openai": ("sk-",),
+    "openrouter": ("sk-or-",),
+    "moonshot": ("sk-",),
+    "kimi-coding": ("sk-",),
+    "google": ("AIza",),
+    "groq": ("gsk_",),
+}
+
+
+class CheckWarning(Exception):
+    """Check passed with a caveat worth printing."""
+
+
+def check_ai_key(provider: str, key: str) -> str:
+    if not key:
+        raise RuntimeError(f"no API key for provider '{provider}'")
+    if key != key.strip() or any(c.isspace() for c in key) or key[0] in "\"'":
+        raise RuntimeError("key contains whitespace or quotes (copy/paste error?)")
+    if len(key) < 20:
+        raise RuntimeError(f"key is only {len(key)} chars")
+    prefixes = AI_KEY_PREFIXES.get(provider)
+    if prefixes and not key.startswith(prefixes):
+        raise RuntimeError(f"{provider} keys start with {' or '.join(prefixes)}, got '{key[:4]}...'")
+    return f"{provider} key format OK ({key[:6]}...)"
+
+
+def check_webhook_url(url: str, path: str = None, secret: str = None, domain: str = None) -> str:
+    parts = urlsplit(url)
+    if parts.scheme != "https":
+        raise RuntimeError(f"Telegram requires https, got '{parts.scheme or '(none)'}'")
+    if not parts.hostname:
+        raise RuntimeError(f"no host in '{url}'")
+    port = parts.port or 443
+    if port not in TELEGRAM_WEBHOOK_PORTS:
+        raise RuntimeError(f"port {port} not allowed by Telegram (use {', '.join(map(str, TELEGRAM_WEBHOOK_PORTS))})")
+    if secret and not SECRET_TOKEN_RE.match(secret):
+        raise RuntimeError("webhook secret must be 1-256 chars of A-Z, a-z, 0-9, _ or -")
+    if path and parts.path != path:
+        raise CheckWarning(f"URL path '{parts.path}' differs from TELEGRAM_WEBHOOK_PATH '{path}'")
+    if domain and parts.hostname != domain:
+        raise CheckWarning(f"URL host '{parts.hostname}' is not the bot domain '{domain}'")
+    return url
+
+
+def run_checks(checks: dict, timeout: float = DEFAULT_TIMEOUT) -> list:
+    """Run {name: callable} concurrently. Returns result dicts in input order."""
+    start = time.time()
+    pool = ThreadPoolExecutor(max_workers=max(1, len(checks)))
+
+    def timed(fn):
+        t0 = time.time()
+        try:
+            return "ok", fn(), time.time() - t0
+        except CheckWarning as e:
+            return "warn", str(e), time.time() - t0
+        except Exception as e:
+            return "fail", str(e), time.time() - t0
+
+    futures = {name: pool.submit(timed, fn) for name, fn in checks.items()}
+    wait(futures.values(), timeout=timeout)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    for name, future in futures.items():
+        if future.done() and not future.cancelled():
+            status, detail, seconds = future.result()
+        else:
+            status, detail, seconds = "fail", f"no answer within {timeout:g}s", time.time() - start
+        results.append({"name": name, "status": status, "detail": detail, "seconds": seconds})
+    return results
+
+
+def skipped(names, reason: str) -> list:
+    """Failed result dicts for checks that were not run."""
+    return [{"name": name, "status": "fail", "detail": f"not run: {reason}", "seconds": 0.0} for name in names]
+
+
+def print_report(results: list, elapsed: float) -> bool:
+    """Print a combined report. Returns True when nothing failed."""
+    width = max(len(r["name"]) for r in results)
+    for r in results:
+        mark = {"ok": "OK  ", "warn": "WARN", "fail": "FAIL"}[r["status"]]
+        print(f"  {mark} {r['name']:<{width}}  {r['detail']}  ({r['seconds'] * 1000:.0f}ms)")
+    failed = [r for r in results if r["status"] == "fail"]
+    print(f"  Preflight: {len(results) - len(failed)}/{len(results)} passed in {elapsed:.2f}s")
+    return not failed
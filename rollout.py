@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Wave-based rolling image upgrade across the bots in the state store.
+
+A canary is upgraded first; the remaining bots follow in waves of
+--wave-size, upgraded --concurrency at a time. Each wave is gated on
+readiness (service RUNNING + Control UI answering) and the endpoint health
+probe. If the share of unhealthy bots in a wave exceeds --max-error-rate, the
+rollout stops and that wave is rolled back to each bot's previous tag.
+
+Usage:
+    python rollout.py --env-file .env --tag 2026.3.1
+    python rollout.py --env-file .env --tag 2026.3.1 --canary my-bot --wave-size 5 --concurrency 5
+    python rollout.py --env-file .env --tag 2026.3.1 --bots bot-a,bot-b --dry-run
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from check_server_status import load_env_file
+from deploy_state import DEFAULT_STATE_FILE, DeployState
+
+
+def plan_waves(bots: list, canary: str = None, wave_size: int = 5) -> list:
+    """Split bots into [[canary], wave, wave, ...] preserving order."""
+    if not bots:
+        return []
+    names = [b["name"] for b in bots]
+    first = canary if canary in names else names[0]
+    canary_bot = next(b for b in bots if b["name"] == first)
+    rest = [b for b in bots if b["name"] != first]
+    return [[canary_bot]] + [rest[i:i + wave_size] for i in range(0, len(rest), wave_size)]
+
+
+def set_image(token: str, bot: dict, tag: str, ready_timeout: int) -> dict:
+    """Move one bot to `tag`, restart it and wait until it is ready."""
+    from deploy import restart_service, update_service_image, wait_for_ready
+
+    start = time.time()
+    try:
+        update_service_image(token, bot["service_id"], bot["environment_id"], tag)
+        restart_service(token, bot["service_id"], bot["environment_id"], wait=0)
+        ready_s = wait_for_ready(token, bot["service_id"], bot.get("domain"), timeout=ready_timeout)
+        return {"name": bot["name"], "ok": True, "ready_s": ready_s, "error": None}
+    except Exception as e:
+        return {"name": bot["name"], "ok": False, "ready_s": time.time() - start, "error": str(e)}
+
+
+def run_wave(token: str, wave: list, tag: str, concurrency: int, ready_timeout: int,
+             samples: int, p95_budget_ms: float) -> list:
+    """Upgrade a wave concurrently, then health-gate every bot that became ready."""
+    from health_probe import is_healthy, probe_bots
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(wave)))) as pool:
+        results = list(pool.map(lambda b: set_image(token, b, tag, ready_timeout), wave))
+
+    by_name = {b["name"]: b for b in wave}
+    ready = [by_name[r["name"]] for r in results if r["ok"] and by_name[r["name"]].get("domain")]
+    report = probe_bots(ready, samples=samples, warmup=1)
+    for r in results:
+        endpoints = report.get(r["name"])
+        if r["ok"] and endpoints and not all(is_healthy(s, p95_budget_ms) for s in endpoints):
+            worst = max(endpoints, key=lambda s: (s["error_rate"], s["p95_ms"] or 0))
+            r["ok"] = False
+            r["error"] = (f"{worst['label']} unhealthy: error rate {worst['error_rate'] * 100:.0f}%, "
+                          f"p95 {worst['p95_ms'] or 0:.0f}ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll an OpenClaw image tag across the fleet in health-gated waves.")
+    parser.add_argument("--zeabur-token", help="Zeabur API token (sk-xxx)")
+    parser.add_argument("--env-file", default=".env", help="Path to .env file (default: .env)")
+    parser.add_argument("--state-file", help=f"Deployment state store (default: OPENCLAW_STATE_FILE or {DEFAULT_STATE_FILE})")
+    parser.add_argument("--tag", required=True, help="Target image tag (e.g. 2026.3.1)")
+    parser.add_argument("--bots", help="Comma-separated bot names (default: every bot in the state store)")
+    parser.add_argument("--canary", help="Bot to upgrade first (default: first bot)")
+    parser.add_argument("--wave-size", type=int, default=5, help="Bots per wave after the canary (default: 5)")
+    parser.add_argument("--concurrency", type=int, default=5, help="Bots upgraded in parallel within a wave (default: 5)")
+    parser.add_argument("--max-error-rate", type=float, default=0.0,
+                        help="Share of unhealthy bots a wave may have before stopping (default: 0.0)")
+    parser.add_argument("--ready-timeout", type=int, default=300, help="Seconds to wait for each bot (default: 300)")
+    parser.add_argument("--samples", type=int, default=5, help="Health probe samples per endpoint (default: 5)")
+    parser.add_argument("--p95-budget-ms", type=float, default=2000, help="p95 latency gate (default: 2000)")
+    parser.add_argument("--no-rollback", action="store_true", help="Stop on a failed wave without rolling it back")
+    parser.add_argument("--dry-run", action="store_true", help="Print the wave plan and exit")
+    args = parser.parse_args()
+
+    load_env_file(args.env_file)
+    token = args.zeabur_token or os.environ.get("ZEABUR_TOKEN")
+    if not token and not args.dry_run:
+        print("Error: missing ZEABUR_TOKEN (set in .env or --zeabur-token).")
+        sys.exit(1)
+
+    state = DeployState(args.state_file or os.environ.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE)
+    if args.bots:
+        names = [n.strip() for n in args.bots.split(",") if n.strip()]
+        missing = [n for n in names if not state.get(n)]
+        if missing:
+            print(f"Error: not in {state.path}: {', '.join(missing)}")
+            sys.exit(1)
+        bots = [state.get(n) for n in names]
+    else:
+        bots = state.all()
+    bots = [b for b in bots if b.get("service_id") and b.get("environment_id")]
+    pending = [b for b in bots if b.get("image_tag") != args.tag]
+    if not pending:
+        print(f"All {len(bots)} bot(s) already on {args.tag}.")
+        return
+
+    waves = plan_waves(pending, args.canary, max(1, args.wave_size))
+    print(f"Rolling {len(pending)} bot(s) to {args.tag} in {len(waves)} wave(s) (canary: {waves[0][0]['name']})")
+    for i, wave in enumerate(waves):
+        label = "canary" if i == 0 else f"wave {i}"
+        print(f"  {label}: {', '.join(b['name'] for b in wave)}")
+    if args.dry_run:
+        return
+
+    start = time.time()
+    upgraded = 0
+    for i, wave in enumerate(waves):
+        label = "Canary" if i == 0 else f"Wave {i}/{len(waves) - 1}"
+        print(f"\n{'=' * 60}\n  {label}: {len(wave)} bot(s)\n{'=' * 60}")
+        wave_start = time.time()
+        results = run_wave(token, wave, args.tag, args.concurrency, args.ready_timeout,
+                           args.samples, args.p95_budget_ms)
+        failed = [r for r in results if not r["ok"]]
+        for r in results:
+            detail = f"ready in {r['ready_s']:.0f}s" if r["ok"] else r["error"]
+            print(f"  {'OK  ' if r['ok'] else 'FAIL'} {r['name']}: {detail}")
+            if r["ok"]:
+                state.put(r["name"], image_tag=args.tag)
+        upgraded += len(results) - len(failed)
+        print(f"  {label} done in {time.time() - wave_start:.0f}s")
+
+        if len(failed) / len(results) > args.max_error_rate:
+            print(f"\n  Stopping: {len(failed)}/{len(results)} bot(s) unhealthy after upgrade.")
+            if not args.no_rollback:
+                by_name = {b["name"]: b for b in wave}
+                failed_names = {r["name"] for r in failed}
+                rollback = [by_name[r["name"]] for r in results if by_name[r["name"]].get("image_tag")]
+                print(f"  Rolling back {len(rollback)} bot(s) to their previous tag...")
+                with ThreadPoolExecutor(max_workers=max(1, min(args.concurrency, len(rollback) or 1))) as pool:
+                    reverted = list(pool.map(
+                        lambda b: set_image(token, b, b["image_tag"], args.ready_timeout), rollback
+                    ))
+                for bot, r in zip(rollback, reverted):
+                    print(f"  {'OK  ' if r['ok'] else 'FAIL'} {r['name']} -> {bot['image_tag']}"
+                          f"{'' if r['ok'] else ': ' + r['error']}")
+                    if r["ok"]:
+                        state.put(r["name"], image_tag=bot["image_tag"])
+                        if r["name"] not in failed_names:
+                            upgraded -= 1
+            print(f"\nRollout aborted after {time.time() - start:.0f}s ({upgraded} bot(s) on {args.tag}).")
+            sys.exit(1)
+
+    print(f"\nRollout complete: {upgraded} bot(s) on {args.tag} in {time.time() - start:.0f}s.")
+
+
+if __name__ == "__main__":
+    main()
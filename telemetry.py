@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Resource telemetry for OpenClaw services and dedicated servers.
+
+Which metrics the Zeabur API exposes is not fixed, so nothing here is
+hard-coded: the cached schema (see zeabur_schema) is searched for CPU, memory
+and network fields on Service and Server. Plain numeric gauges (`cpuUsage`,
+`usage{cpu memory}`) are selected as they are; parameterized series such as
+`metric(environmentID:, metricType: CPU, startTime:, endTime:)` get one alias
+per matching enum value and the latest point is kept. Every target is
+sampled in one aliased query per batch, each poll.
+
+Samples are stored as a compact local time series, one line per target per
+poll in daily files (values rounded to 4 significant digits):
+
+    <dir>/2026-10-19.jsonl   {"t":1792385682,"k":"svc:<id>","v":{"cpu":0.42,"memory":5.12e+08}}
+    <dir>/targets.json       {"svc:<id>": {"name": ..., "bot": ..., "server": "<id>", "profile": ...}}
+
+`report` prints avg / p95 / max / last per target and metric, the top
+consumers of each metric, and per-server totals of the services on it (to
+spot noisy neighbors).
+
+Usage:
+    python telemetry.py fields --env-file .env              # what the API exposes
+    python telemetry.py collect --env-file .env --interval 60
+    python telemetry.py report --since 6h --top 5
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+from deploy_state import DEFAULT_STATE_FILE, DeployState
+
+DEFAULT_METRICS_DIR = "metrics"
+DEFAULT_RETENTION_DAYS = 14
+BATCH_SIZE = 20  # targets per query document
+
+METRIC_WORDS = re.compile(r"cpu|mem|network|net|bandwidth|traffic|ingress|egress|rx|tx|disk|load|usage|util", re.I)
+SERIES_WORDS = re.compile(r"metric|usage|stat", re.I)
+TIME_KEYS = re.compile(r"^(timestamp|time|date|ts)$|At$", re.I)
+START_ARGS = re.compile(r"start|from|since|begin", re.I)
+END_ARGS = re.compile(r"end|until|^to$", re.I)
+NUMERIC_SCALARS = ("Int", "Float", "BigInt", "Long")
+
+
+# === Discovery ===
+def _series_plan(schema, type_name: str, field: str):
+    """How to call a parameterized metric field, or None if its args can't be filled."""
+    args, values = [], [None]
+    for arg, (kind, arg_type, required) in schema.args(type_name, field).items():
+        if not required:
+            continue
+        if kind == "ENUM" and values == [None]:
+            values = [v for v in schema.enum_values(arg_type) if METRIC_WORDS.search(v)]
+            if not values:
+                return None
+            args.append((arg, "enum", arg_type))
+        elif "environment" in arg.lower():
+            args.append((arg, "env", arg_type))
+        elif START_ARGS.search(arg):
+            args.append((arg, "start", arg_type))
+        elif END_ARGS.search(arg):
+            args.append((arg, "end", arg_type))
+        else:
+            return None
+    target = schema.field_type(type_name, field)
+    selection = schema.selection(target, schema.fields(target))
+    if not selection:
+        return None
+    return {"field": field, "args": args, "values": values, "selection": selection}
+
+
+def discover(schema, type_name: str) -> dict:
+    """Metric gauges (plain selections) and series (parameterized fields) of a type."""
+    gauges, series = [], []
+    for name, entry in schema.fields(type_name).items():
+        kind, target, required = entry[:3]
+        if not required:
+            if kind == "SCALAR" and target in NUMERIC_SCALARS and METRIC_WORDS.search(name):
+                gauges.append(name)
+            elif kind == "OBJECT" and METRIC_WORDS.search(name):
+                gauges += schema.selection(type_name, [name])
+            elif kind == "OBJECT":
+                leaves = [f for f, (k, t, req, *_) in schema.fields(target).items()
+                          if k == "SCALAR" and t in NUMERIC_SCALARS and not req and METRIC_WORDS.search(f)]
+                if leaves:
+                    gauges.append(f"{name}{{{' '.join(leaves)}}}")
+        elif kind == "OBJECT" and (SERIES_WORDS.search(name) or METRIC_WORDS.search(name)):
+            plan = _series_plan(schema, type_name, name)
+            if plan:
+                series.append(plan)
+    return {"gauges": gauges, "series": series}
+
+
+def root_field(schema, type_name: str):
+    """(query field, id arg, id type) that fetches one object of type_name, or None."""
+    field = type_name[0].lower() + type_name[1:]
+    if schema.field_type("Query", field) != type_name:
+        return None
+    required = [(a, t) for a, (_, t, req) in schema.args("Query", field).items() if req]
+    return (field, *required[0]) if len(required) == 1 else None
+
+
+# === Sampling ===
+def _time_value(arg_type: str, t: float):
+    return int(t) if arg_type in NUMERIC_SCALARS else datetime.fromtimestamp(t, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def build_query(name: str, schema, plans: dict, targets: list, start: float, end: float):
+    """One aliased document for a batch of targets. Returns (operation, variables, aliases)."""
+    from zeabur_ops import define
+
+    params, body, variables, aliases = [], [], {}, {}
+
+    def declare(var: str, var_type: str, value):
+        if var not in variables:
+            params.append(f"${var}:{var_type}!")
+            variables[var] = value
+
+    for n, target in enumerate(targets):
+        plan = plans[target["type"]]
+        parts = list(plan["gauges"])
+        series_aliases = {}
+        for s in plan["series"]:
+            arg_kinds = {kind for _, kind, _ in s["args"]}
+            if "env" in arg_kinds and not target.get("env"):
+                continue
+            for value in s["values"]:
+                call = []
+                for arg, kind, arg_type in s["args"]:
+                    if kind == "enum":
+                        call.append(f"{arg}:{value}")
+                    elif kind == "env":
+                        declare(f"e{n}", arg_type, target["env"])
+                        call.append(f"{arg}:$e{n}")
+                    else:
+                        var = f"{kind}{arg_type}"
+                        declare(var, arg_type, _time_value(arg_type, start if kind == "start" else end))
+                        call.append(f"{arg}:${var}")
+                alias = f"{s['field']}_{value}" if value else s["field"]
+                series_aliases[alias] = value.lower() if value else s["field"]
+                parts.append(f"{alias}:{s['field']}({','.join(call)}){{{' '.join(s['selection'])}}}")
+        if not parts:
+            continue
+        field, id_arg, id_type = root_field(schema, target["type"])
+        declare(f"i{n}", id_type, target["id"])
+        aliases[f"t{n}"] = (target["key"], series_aliases)
+        body.append(f"t{n}:{field}({id_arg}:$i{n}){{{' '.join(parts)}}}")
+    if not body:
+        return None, None, {}
+    document = f"query {name}({','.join(params)}){{{' '.join(body)}}}"
+    return define(name, document), variables, aliases
+
+
+def flatten(value, prefix: str = "") -> dict:
+    """Numeric leaves of a response value as {dotted.path: float}; lists keep their latest item."""
+    out = {}
+    if isinstance(value, bool) or value is None:
+        return out
+    if isinstance(value, (int, float)):
+        out[prefix] = float(value)
+    elif isinstance(value, str):
+        if prefix and re.fullmatch(r"-?\d+(\.\d+)?([eE][-+]?\d+)?", value):
+            out[prefix] = float(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if not TIME_KEYS.search(key):
+                out.update(flatten(item, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(value, list):
+        items = [v for v in value if v is not None]
+        if items:
+            out.update(flatten(items[-1], prefix))
+    return out
+
+
+def parse_sample(data: dict, series_aliases: dict) -> dict:
+    """{metric: value} for one target's response object."""
+    values = {}
+    for key, item in data.items():
+        if key in series_aliases:
+            name = series_aliases[key]
+            points = flatten(item)
+            if len(points) == 1:
+                values[name] = next(iter(points.values()))
+            else:
+                values.update({f"{name}.{path.split('.')[-1]}": v for path, v in points.items()})
+        else:
+            values.update(flatten(item, key))
+    return values
+
+
+def collect_targets(topo, state: DeployState, plans: dict, schema) -> dict:
+    """{key: target} for every running service and every server that has metrics."""
+    bots = {b.get("service_id"): b for b in state.all() if b.get("service_id")}
+    targets = {}
+    if (plans["Service"]["gauges"] or plans["Service"]["series"]) and root_field(schema, "Service"):
+        for svc in topo.services.values():
+            if svc.status and svc.status != "RUNNING":
+                continue
+            bot = bots.get(svc.id) or {}
+            targets[f"svc:{svc.id}"] = {
+                "key": f"svc:{svc.id}", "type": "Service", "id": svc.id,
+                "env": svc.environment.id if svc.environment else None,
+                "name": svc.name, "bot": bot.get("name"), "profile": bot.get("profile"),
+                "server": svc.server.id if svc.server else None,
+            }
+    if (plans["Server"]["gauges"] or plans["Server"]["series"]) and root_field(schema, "Server"):
+        for server in topo.servers.values():
+            targets[f"srv:{server.id}"] = {
+                "key": f"srv:{server.id}", "type": "Server", "id": server.id, "name": server.name or server.ip,
+            }
+    return targets
+
+
+def sample(client, schema, plans: dict, targets: list, window: float) -> dict:
+    """{key: {metric: value}} for all targets, BATCH_SIZE targets per request."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    end = time.time()
+    batches = [targets[i:i + BATCH_SIZE] for i in range(0, len(targets), BATCH_SIZE)]
+
+    def run(indexed):
+        n, batch = indexed
+        operation, variables, aliases = build_query(f"Telemetry{n}", schema, plans, batch, end - window, end)
+        if not operation:
+            return {}
+        data = client.run(operation, variables)
+        return {key: parse_sample(data.get(alias) or {}, series) for alias, (key, series) in aliases.items()}
+
+    samples = {}
+    with ThreadPoolExecutor(max_workers=min(4, len(batches) or 1)) as pool:
+        for result in pool.map(run, enumerate(batches)):
+            samples.update(result)
+    return samples
+
+
+# === Storage ===
+def _compact(value: float):
+    value = float(f"{value:.4g}")
+    return int(value) if value.is_integer() and abs(value) < 1e15 else value
+
+
+class MetricStore:
+    def __init__(self, root: str = DEFAULT_METRICS_DIR, retention_days: int = DEFAULT_RETENTION_DAYS):
+        self.root = root
+        self.retention_days = retention_days
+
+    @property
+    def targets_path(self) -> str:
+        return os.path.join(self.root, "targets.json")
+
+    def targets(self) -> dict:
+        if not os.path.exists(self.targets_path):
+            return {}
+        with open(self.targets_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def update_targets(self, targets: dict):
+        """Merge target labels (names survive targets that went away)."""
+        import tempfile
+
+        os.makedirs(self.root, exist_ok=True)
+        merged = self.targets()
+        for key, t in targets.items():
+            merged[key] = {k: v for k, v in t.items() if k in ("name", "bot", "profile", "server") and v}
+        fd, tmp_path = tempfile.mkstemp(prefix=".targets-", suffix=".tmp", dir=self.root)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(merged, f, separators=(",", ":"))
+            os.replace(tmp_path, self.targets_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def append(self, t: float, samples: dict) -> int:
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, f"{time.strftime('%Y-%m-%d', time.localtime(t))}.jsonl")
+        lines = [
+            json.dumps({"t": int(t), "k": key, "v": {m: _compact(v) for m, v in sorted(values.items())}},
+                       separators=(",", ":"))
+            for key, values in samples.items() if values
+        ]
+        if lines:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        return len(lines)
+
+    def enforce_retention(self):
+        cutoff = time.strftime("%Y-%m-%d", time.localtime(time.time() - self.retention_days * 86400))
+        for path in glob.glob(os.path.join(self.root, "????-??-??.jsonl")):
+            if os.path.basename(path)[:10] < cutoff:
+                os.remove(path)
+
+    def read(self, start: float, end: float):
+        """Yield (t, key, values) within [start, end], reading only the daily files involved."""
+        first = time.strftime("%Y-%m-%d", time.localtime(start))
+        last = time.strftime("%Y-%m-%d", time.localtime(end))
+        for path in sorted(glob.glob(os.path.join(self.root, "????-??-??.jsonl"))):
+            day = os.path.basename(path)[:10]
+            if not first <= day <= last:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted write
+                    if start <= row["t"] <= end:
+                        yield row["t"], row["k"], row["v"]
+
+
+# === Reporting ===
+def summarize(rows) -> dict:
+    """{key: {metric: {"avg", "p95", "max", "last", "n"}}}."""
+    series = {}
+    for _, key, values in rows:
+        for metric, value in values.items():
+            series.setdefault(key, {}).setdefault(metric, []).append(value)
+    out = {}
+    for key, metrics in series.items():
+        out[key] = {}
+        for metric, values in metrics.items():
+            ordered = sorted(values)
+            out[key][metric] = {
+                "avg": sum(values) / len(values),
+                "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+                "max": ordered[-1],
+                "last": values[-1],
+                "n": len(values),
+            }
+    return out
+
+
+def fmt(value: float) -> str:
+    if abs(value) >= 1 << 30:
+        return f"{value / (1 << 30):.2f}G"
+    if abs(value) >= 1 << 20:
+        return f"{value / (1 << 20):.1f}M"
+    if abs(value) >= 1 << 10:
+        return f"{value / (1 << 10):.1f}K"
+    return f"{value:.3g}"
+
+
+def memory_share(metric: str, value: float, profile: str):
+    """Fraction of the profile's memory limit, when the value is clearly in bytes."""
+    from deploy import PERFORMANCE_PROFILES
+
+    if "mem" not in metric.lower() or profile not in PERFORMANCE_PROFILES or value < 1 << 20:
+        return None
+    return value / (PERFORMANCE_PROFILES[profile]["memory_mb"] << 20)
+
+
+def label(key: str, targets: dict) -> str:
+    t = targets.get(key, {})
+    return t.get("bot") or t.get("name") or key
+
+
+def report(store: MetricStore, start: float, end: float, top: int = 5):
+    targets = store.targets()
+    stats = summarize(store.read(start, end))
+    if not stats:
+        print(f"No samples in {store.root}/ for that window.")
+        return
+    span = f"{time.strftime('%m-%d %H:%M', time.localtime(start))} - {time.strftime('%m-%d %H:%M', time.localtime(end))}"
+    print(f"Resource usage {span} ({len(stats)} target(s))")
+    for key in sorted(stats, key=lambda k: (k.split(":")[0], label(k, targets))):
+        t = targets.get(key, {})
+        extra = [f"profile {t['profile']}"] if t.get("profile") else []
+        if t.get("server"):
+            extra.append(f"server {label('srv:' + t['server'], targets)}")
+        print(f"\n{label(key, targets)} [{key}]" + (f" ({', '.join(extra)})" if extra else ""))
+        for metric, s in sorted(stats[key].items()):
+            share = memory_share(metric, s["p95"], t.get("profile"))
+            note = f"  p95 = {share:.0%} of profile memory" if share is not None else ""
+            print(f"    {metric:<28} avg {fmt(s['avg']):>8}  p95 {fmt(s['p95']):>8}  max {fmt(s['max']):>8}  "
+                  f"last {fmt(s['last']):>8}  n={s['n']}{note}")
+
+    metrics = sorted({m for key in stats for m in stats[key] if key.startswith("svc:")})
+    if metrics:
+        print(f"\nTop {top} services by average")
+        for metric in metrics:
+            ranked = sorted(((s[metric]["avg"], key) for key, s in stats.items()
+                             if key.startswith("svc:") and metric in s), reverse=True)[:top]
+            print(f"  {metric:<28} " + ", ".join(f"{label(k, targets)} {fmt(v)}" for v, k in ranked))
+
+    per_server = {}
+    for key, s in stats.items():
+        server = targets.get(key, {}).get("server")
+        if key.startswith("svc:") and server:
+            bucket = per_server.setdefault(server, {"services": 0})
+            bucket["services"] += 1
+            for metric, m in s.items():
+                bucket[metric] = bucket.get(metric, 0.0) + m["avg"]
+    if per_server:
+        print("\nPer server (sum of service averages)")
+        for server, bucket in sorted(per_server.items()):
+            services = bucket.pop("services")
+            totals = ", ".join(f"{m} {fmt(v)}" for m, v in sorted(bucket.items()))
+            print(f"  {label('srv:' + server, targets)}: {services} service(s); {totals}")
+
+
+def parse_since(value: str) -> float:
+    """Window start: 90m / 6h / 2d ago, or an ISO datetime / HH:MM (see log_archive)."""
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)([mhd])", value)
+    if m:
+        return time.time() - float(m.group(1)) * {"m": 60, "h": 3600, "d": 86400}[m.group(2)]
+    from log_archive import parse_query_time
+
+    return parse_query_time(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect and summarize CPU / memory / network usage of services and servers.")
+    parser.add_argument("command", choices=["fields", "collect", "report"])
+    parser.add_argument("--metrics-dir", default=DEFAULT_METRICS_DIR, help=f"Time series directory (default: {DEFAULT_METRICS_DIR})")
+    parser.add_argument("--state-file", help=f"Deployment state store (default: OPENCLAW_STATE_FILE or {DEFAULT_STATE_FILE})")
+    # fields / collect
+    parser.add_argument("--zeabur-token", help="Zeabur API token (sk-xxx)")
+    parser.add_argument("--env-file", default=".env", help="Path to .env file (default: .env)")
+    parser.add_argument("--interval", type=float, default=60, help="Seconds between samples (default: 60)")
+    parser.add_argument("--retention-days", type=int, default=DEFAULT_RETENTION_DAYS,
+                        help=f"Days of samples kept (default: {DEFAULT_RETENTION_DAYS})")
+    parser.add_argument("--once", action="store_true", help="Sample once and exit")
+    # report
+    parser.add_argument("--since", default="1h", help="Window start: 90m, 6h, 2d, ISO datetime or HH:MM (default: 1h)")
+    parser.add_argument("--until", help="Window end: ISO datetime or HH:MM (default: now)")
+    parser.add_argument("--top", type=int, default=5, help="Top consumers listed per metric (default: 5)")
+    args = parser.parse_args()
+
+    store = MetricStore(args.metrics_dir, args.retention_days)
+    if args.command == "report":
+        end = parse_since(args.until) if args.until else time.time()
+        report(store, parse_since(args.since), end, args.top)
+        return
+
+    from check_server_status import load_env_file
+
+    load_env_file(args.env_file)
+    token = args.zeabur_token or os.environ.get("ZEABUR_TOKEN")
+    if not token:
+        print("Error: missing ZEABUR_TOKEN (set in .env or --zeabur-token).")
+        sys.exit(1)
+
+    from zeabur_api import ZeaburClient
+
+    client = ZeaburClient(token)
+    schema = client.schema
+    if not schema:
+        print("Error: the API schema is unavailable (introspection disabled), so metric fields can't be discovered.")
+        sys.exit(1)
+    plans = {t: discover(schema, t) for t in ("Service", "Server")}
+    if args.command == "fields" or not any(p["gauges"] or p["series"] for p in plans.values()):
+        for type_name, plan in plans.items():
+            reachable = "" if root_field(schema, type_name) else "  (no single-object query field; not sampled)"
+            print(f"{type_name}:{reachable}")
+            for gauge in plan["gauges"]:
+                print(f"    gauge   {gauge}")
+            for s in plan["series"]:
+                values = ", ".join(v for v in s["values"] if v) or "-"
+                print(f"    series  {s['field']}({', '.join(a for a, _, _ in s['args'])})  values: {values}")
+            if not plan["gauges"] and not plan["series"]:
+                print("    (no metric fields)")
+        if args.command == "collect":
+            print("Error: the API exposes no CPU / memory / network fields to collect.")
+            sys.exit(1)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    from topology import Topology
+
+    state = DeployState(args.state_file or os.environ.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE)
+    window = max(2 * args.interval, 300)
+    print(f"Sampling into {args.metrics_dir}/ every {args.interval:g}s (Ctrl+C to stop)")
+    targets, refreshed = {}, 0.0
+    try:
+        while True:
+            started = time.time()
+            if started - refreshed > 10 * args.interval or not targets:
+                # Services come and go; re-read the topology every 10 samples.
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    servers = pool.submit(client.list_servers)
+                    projects = pool.submit(client.list_projects)
+                    state.load()
+                    topo = Topology.build(servers.result(), projects.result(), state.project_regions())
+                targets = collect_targets(topo, state, plans, schema)
+                store.update_targets(targets)
+                refreshed = started
+            try:
+                samples = sample(client, schema, plans, list(targets.values()), window)
+                written = store.append(started, samples)
+                print(f"{time.strftime('%H:%M:%S')} {written}/{len(targets)} target(s) sampled "
+                      f"in {time.time() - started:.2f}s")
+            except Exception as e:
+                print(f"{time.strftime('%H:%M:%S')} sample failed: {e}")
+            store.enforce_retention()
+            if args.once:
+                break
+            time.sleep(max(0.0, args.interval - (time.time() - started)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
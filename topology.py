@@ -0,0 +1,226 @@
+"""
+Compact, indexed snapshot of a Zeabur account's topology.
+
+Built once from the API (servers + projects listing), the snapshot holds
+__slots__ records for servers, projects, environments, services and domains,
+with hash indexes by id, name and domain. Cross-references (service -> project
+-> environment -> server) are O(1) attribute hops. Snapshots serialize to JSON
+so other tools can reuse one without re-querying.
+
+Usage:
+    from topology import Topology
+    topo = Topology.build(servers, project_nodes)
+    svc = topo.service("67ab...")
+    svc.project.server, svc.environment, topo.by_domain("my-bot.zeabur.app")
+    topo.save("topology.json"); topo = Topology.load("topology.json")
+"""
+
+import json
+import os
+import time
+
+SNAPSHOT_VERSION = 1
+
+
+class Server:
+    __slots__ = ("id", "name", "ip", "projects")
+
+    def __init__(self, id: str, name: str = None, ip: str = None):
+        self.id = id
+        self.name = name
+        self.ip = ip
+        self.projects = []
+
+    @property
+    def region(self) -> str:
+        return f"server-{self.id}"
+
+
+class Project:
+    __slots__ = ("id", "name", "server", "environments", "services")
+
+    def __init__(self, id: str, name: str = None, server: Server = None):
+        self.id = id
+        self.name = name
+        self.server = server
+        self.environments = []
+        self.services = []
+
+    @property
+    def environment(self):
+        """Default (first) environment, as the deployer uses."""
+        return self.environments[0] if self.environments else None
+
+
+class Environment:
+    __slots__ = ("id", "name", "project")
+
+    def __init__(self, id: str, name: str = None, project: Project = None):
+        self.id = id
+        self.name = name
+        self.project = project
+
+
+class Service:
+    __slots__ = ("id", "name", "status", "project", "domains")
+
+    def __init__(self, id: str, name: str = None, status: str = None, project: Project = None):
+        self.id = id
+        self.name = name
+        self.status = status
+        self.project = project
+        self.domains = []
+
+    @property
+    def environment(self):
+        return self.project.environment if self.project else None
+
+    @property
+    def server(self):
+        return self.project.server if self.project else None
+
+
+class Domain:
+    __slots__ = ("domain", "service")
+
+    def __init__(self, domain: str, service: Service = None):
+        self.domain = domain
+        self.service = service
+
+
+class Topology:
+    def __init__(self):
+        self.created_at = int(time.time())
+        self.servers = {}
+        self.projects = {}
+        self.environments = {}
+        self.services = {}
+        self.domains = {}
+        self._projects_by_name = {}
+        self._services_by_name = {}
+
+    # === Building ===
+    @classmethod
+    def build(cls, servers: list, projects: list, project_regions: dict = None) -> "Topology":
+        """Build from `servers{_id name ip}` and `projects` listing nodes.
+
+        project_regions optionally maps project id -> region ("server-<id>")
+        when the listing doesn't carry it (the static Projects document has no
+        region; DeployState.project_regions() fills in the deployed bots).
+        """
+        topo = cls()
+        for s in servers or []:
+            topo.servers[s["_id"]] = Server(s["_id"], s.get("name"), s.get("ip"))
+        for p in projects or []:
+            region = (p.get("region") or {}).get("id") if isinstance(p.get("region"), dict) else p.get("region")
+            region = region or (project_regions or {}).get(p["_id"])
+            server = topo.servers.get(region.removeprefix("server-")) if region else None
+            project = Project(p["_id"], p.get("name"), server)
+            if server:
+                server.projects.append(project)
+            topo.projects[project.id] = project
+            topo._projects_by_name.setdefault(project.name, []).append(project)
+            for e in p.get("environments") or []:
+                env = Environment(e["_id"], e.get("name"), project)
+                project.environments.append(env)
+                topo.environments[env.id] = env
+            for s in p.get("services") or []:
+                svc = Service(s["_id"], s.get("name"), s.get("status"), project)
+                project.services.append(svc)
+                topo.services[svc.id] = svc
+                topo._services_by_name.setdefault(svc.name, []).append(svc)
+                for d in s.get("domains") or []:
+                    if d.get("domain"):
+                        domain = Domain(d["domain"], svc)
+                        svc.domains.append(domain)
+                        topo.domains[domain.domain] = domain
+        return topo
+
+    # === Lookups ===
+    def server(self, server_id: str):
+        return self.servers.get(server_id)
+
+    def project(self, project_id: str):
+        return self.projects.get(project_id)
+
+    def service(self, service_id: str):
+        return self.services.get((service_id or "").removeprefix("service-"))
+
+    def environment(self, env_id: str):
+        return self.environments.get(env_id)
+
+    def by_domain(self, domain: str):
+        """Service serving `domain`, or None."""
+        d = self.domains.get(domain)
+        return d.service if d else None
+
+    def projects_named(self, name: str) -> list:
+        return list(self._projects_by_name.get(name, []))
+
+    def services_named(self, name: str) -> list:
+        return list(self._services_by_name.get(name, []))
+
+    # === Serialization ===
+    def to_dict(self) -> dict:
+        """Flat, reference-by-id form (no nesting, no cycles)."""
+        return {
+            "version": SNAPSHOT_VERSION,
+            "created_at": self.created_at,
+            "servers": [[s.id, s.name, s.ip] for s in self.servers.values()],
+            "projects": [
+                [p.id, p.name, p.server.id if p.server else None] for p in self.projects.values()
+            ],
+            "environments": [[e.id, e.name, e.project.id] for e in self.environments.values()],
+            "services": [
+                [s.id, s.name, s.status, s.project.id, [d.domain for d in s.domains]]
+                for s in self.services.values()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Topology":
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported topology snapshot version: {data.get('version')}")
+        topo = cls()
+        topo.created_at = data.get("created_at", topo.created_at)
+        for sid, name, ip in data["servers"]:
+            topo.servers[sid] = Server(sid, name, ip)
+        for pid, name, server_id in data["projects"]:
+            server = topo.servers.get(server_id)
+            project = Project(pid, name, server)
+            if server:
+                server.projects.append(project)
+            topo.projects[pid] = project
+            topo._projects_by_name.setdefault(name, []).append(project)
+        for eid, name, pid in data["environments"]:
+            env = Environment(eid, name, topo.projects[pid])
+            env.project.environments.append(env)
+            topo.environments[eid] = env
+        for sid, name, status, pid, domains in data["services"]:
+            svc = Service(sid, name, status, topo.projects[pid])
+            svc.project.services.append(svc)
+            topo.services[sid] = svc
+            topo._services_by_name.setdefault(name, []).append(svc)
+            for d in domains:
+                domain = Domain(d, svc)
+                svc.domains.append(domain)
+                topo.domains[d] = domain
+        return topo
+
+    def save(self, path: str):
+        """Write the snapshot atomically."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, max_age: float = None):
+        """Load a snapshot; None if missing or older than max_age seconds."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            topo = cls.from_dict(json.load(f))
+        if max_age is not None and time.time() - topo.created_at > max_age:
+            return None
+        return topo
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Synthetic Telegram webhook load generator for deployed OpenClaw gateways.
+
+Sends realistic Telegram Update payloads with the X-Telegram-Bot-Api-Secret-Token
+header at a fixed rate and concurrency, then reports throughput, latency
+distribution and errors. Latency is measured from each update's scheduled send
+time, so a gateway that falls behind shows up as growing latency rather than a
+silently lower send rate.
+
+Synthetic senders use ids that are not on any allowlist, so allowlist bots drop
+the updates before calling the AI provider. Pass --user-id to drive the full
+message path (this costs AI tokens and Telegram replies will fail).
+
+Usage:
+    python webhook_load.py --bot my-bot --env-file .env --rate 50 --duration 30
+    python webhook_load.py --url https://my-bot.zeabur.app/telegram-webhook --secret xxx
+    python webhook_load.py --local --rate 200 --concurrency 16    # offline stand-in receiver
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from deploy_state import DEFAULT_STATE_FILE, DeployState
+from health_probe import percentile
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+SAMPLE_TEXTS = [
+    "hi",
+    "/start",
+    "what's the weather like in Taipei tomorrow?",
+    "summarize this for me: the quick brown fox jumps over the lazy dog",
+    "幫我整理今天的會議重點",
+    "can you write a short python function that reverses a list?",
+]
+
+
+def make_update(update_id: int, user_id: int = None, rng: random.Random = None) -> dict:
+    """Build a Telegram Update carrying a private text message."""
+    rng = rng or random
+    sender = user_id or rng.randint(7_000_000_000, 7_999_999_999)
+    text = rng.choice(SAMPLE_TEXTS)
+    message = {
+        "message_id": update_id,
+        "from": {
+            "id": sender,
+            "is_bot": False,
+            "first_name": "Load",
+            "last_name": "Test",
+            "username": f"loadtest_{sender % 10000}",
+            "language_code": "en",
+        },
+        "chat": {"id": sender, "first_name": "Load", "last_name": "Test", "type": "private"},
+        "date": int(time.time()),
+        "text": text,
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"offset": 0, "length": len(text), "type": "bot_command"}]
+    return {"update_id": update_id, "message": message}
+
+
+class _Connection:
+    """Keep-alive HTTP(S) connection to the webhook URL, reopened after errors."""
+
+    def __init__(self, url: str, timeout: float):
+        import urllib.parse
+
+        parts = urllib.parse.urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.https else 80)
+        self.path = parts.path or "/"
+        self.timeout = timeout
+        self.conn = None
+
+    def post(self, body: bytes, headers: dict) -> int:
+        import http.client
+
+        if self.conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self.conn = cls(self.host, self.port, timeout=self.timeout)
+        try:
+            self.conn.request("POST", self.path, body=body, headers=headers)
+            resp = self.conn.getresponse()
+            resp.read()
+            return resp.status
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def run_load(url: str, secret: str = None, rate: float = 20, duration: float = 10, concurrency: int = 4,
+             timeout: float = 10, user_id: int = None, seed: int = None) -> dict:
+    """Drive the webhook for `duration` seconds at `rate` updates/s. Returns a summary."""
+    total = max(1, int(rate * duration))
+    interval = 1.0 / rate
+    update_ids = itertools.count(random.Random(seed).randint(100_000_000, 900_000_000))
+    id_lock = threading.Lock()
+    results = []
+    results_lock = threading.Lock()
+    start = time.perf_counter() + 0.1
+
+    def worker(index: int):
+        rng = random.Random(None if seed is None else seed + index)
+        conn = _Connection(url, timeout)
+        headers = {"Content-Type": "application/json"}
+        if secret:
+            headers[SECRET_HEADER] = secret
+        local = []
+        # Worker i owns slots i, i+concurrency, ... of the global schedule.
+        for slot in range(index, total, concurrency):
+            scheduled = start + slot * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with id_lock:
+                update_id = next(update_ids)
+            body = json.dumps(make_update(update_id, user_id, rng), separators=(",", ":")).encode()
+            try:
+                status = conn.post(body, headers)
+                error = None if 200 <= status < 300 else f"HTTP {status}"
+            except Exception as e:
+                status, error = None, f"{type(e).__name__}: {e}"
+            local.append((scheduled, time.perf_counter(), status, error))
+        conn.close()
+        with results_lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(results, start)
+
+
+def summarize(results: list, start: float) -> dict:
+    latencies = [(done - scheduled) * 1000 for scheduled, done, _, error in results if error is None]
+    errors = {}
+    statuses = {}
+    for _, _, status, error in results:
+        statuses[status] = statuses.get(status, 0) + 1
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+    elapsed = max((done for _, done, _, _ in results), default=start) - start
+    return {
+        "sent": len(results),
+        "ok": len(latencies),
+        "elapsed_s": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "error_rate": (len(results) - len(latencies)) / len(results) if results else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies) if latencies else None,
+        "statuses": statuses,
+        "errors": errors,
+    }
+
+
+def start_local_receiver(secret: str = None, delay_ms: float = 0, port: int = 0):
+    """Start a stand-in webhook receiver on 127.0.0.1. Returns (server, url).
+
+    It mimics the gateway's contract: rejects a wrong secret with 401, malformed
+    bodies with 400, and acknowledges valid updates with 200 after delay_ms.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if secret and self.headers.get(SECRET_HEADER) != secret:
+                return self._reply(401)
+            try:
+                update = json.loads(body)
+                int(update["update_id"])
+            except (ValueError, KeyError, TypeError):
+                return self._reply(400)
+            if delay_ms:
+                time.sleep(delay_ms / 1000)
+            self.server.received += 1
+            self._reply(200)
+
+        def _reply(self, code: int):
+            self.send_response(code)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.received = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/telegram-webhook"
+
+
+def _fmt(ms) -> str:
+    return f"{ms:.1f}ms" if ms is not None else "-"
+
+
+def print_summary(summary: dict, rate: float):
+    print(f"  Sent:        {summary['sent']} updates in {summary['elapsed_s']:.1f}s (target {rate:g}/s)")
+    print(f"  Throughput:  {summary['throughput']:.1f} updates/s acknowledged")
+    print(f"  Latency:     p50 {_fmt(summary['p50_ms'])}  p90 {_fmt(summary['p90_ms'])}  "
+          f"p99 {_fmt(summary['p99_ms'])}  max {_fmt(summary['max_ms'])}")
+    print(f"  Error rate:  {summary['error_rate'] * 100:.1f}%")
+    for error, count in sorted(summary["errors"].items(), key=lambda kv: -kv[1])[:5]:
+        print(f"    {count:6d}  {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test an OpenClaw Telegram webhook with synthetic updates.")
+    parser.add_argument("--url", help="Webhook URL (https://<domain><path>)")
+    parser.add_argument("--bot", help="Bot name from the state store (uses its domain and webhook path)")
+    parser.add_argument("--state-file", help=f"Deployment state store (default: OPENCLAW_STATE_FILE or {DEFAULT_STATE_FILE})")
+    parser.add_argument("--env-file", help="Load TELEGRAM_WEBHOOK_SECRET from .env file")
+    parser.add_argument("--secret", help="Webhook secret (default: TELEGRAM_WEBHOOK_SECRET)")
+    parser.add_argument("--local", action="store_true", help="Target a local stand-in receiver (offline)")
+    parser.add_argument("--local-delay-ms", type=float, default=0, help="Simulated handler time for --local")
+    parser.add_argument("--rate", type=float, default=20, help="Updates per second (default: 20)")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run (default: 10)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel connections (default: 4)")
+    parser.add_argument("--timeout", type=float, default=10, help="Per-request timeout in seconds (default: 10)")
+    parser.add_argument("--user-id", type=int, help="Sender id for every update (default: synthetic ids)")
+    args = parser.parse_args()
+
+    if args.env_file and os.path.exists(args.env_file):
+        from check_server_status import load_env_file
+
+        load_env_file(args.env_file)
+    secret = args.secret or os.environ.get("TELEGRAM_WEBHOOK_SECRET")
+
+    server = None
+    if args.local:
+        server, url = start_local_receiver(secret, args.local_delay_ms)
+    elif args.url:
+        url = args.url
+    elif args.bot:
+        state = DeployState(args.state_file or os.environ.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE)
+        bot = state.get(args.bot)
+        if not bot or not bot.get("domain") or not bot.get("webhook_path"):
+            print(f"Error: bot '{args.bot}' has no domain/webhook path in {state.path}")
+            sys.exit(1)
+        url = f"https://{bot['domain']}{bot['webhook_path']}"
+    else:
+        print("Error: pass --url, --bot or --local")
+        sys.exit(1)
+    if args.rate <= 0 or args.concurrency < 1:
+        print("Error: --rate must be > 0 and --concurrency >= 1")
+        sys.exit(1)
+
+    print(f"Target: {url}")
+    print(f"Load:   {args.rate:g} updates/s for {args.duration:g}s over {args.concurrency} connection(s)")
+    summary = run_load(url, secret, args.rate, args.duration, args.concurrency, args.timeout, args.user_id)
+    print_summary(summary, args.rate)
+    if server is not None:
+        print(f"  Receiver:    {server.received} updates accepted")
+        server.shutdown()
+    sys.exit(0 if summary["error_rate"] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,13 @@ Usage:
     client = ZeaburClient("sk-your-token")
     client.verify()
     servers = client.list_servers()
+    for entry in client.iter_runtime_logs(project_id, service_id, env_id):
+        print(entry["message"])
+    for entry in client.watch_runtime_logs(project_id, service_id, env_id):  # live, until interrupted
+        print(entry["message"])
 """
 
 import json
-import requests
 
 
 class ZeaburClient:
@@ -22,113 +25,216 @@ class ZeaburClient:
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
-
-    def _gql(self, query: str) -> dict:
-        r = requests.post(
-            self.API_URL,
-            headers=self.headers,
-            json={"query": query},
-            timeout=30,
-        )
-        r.raise_for_status()
-        data = r.json()
+        self._session = None
+        self._schema = None
+        self._schema_loaded = False
+
+    @property
+    def session(self):
+        """Pooled requests.Session, created on first use and kept warm."""
+        if self._session is None:
+            import requests  # deferred: keeps importing this module cheap
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+            self._session = session
+        return self._session
+
+    @property
+    def schema(self):
+        """Introspected schema of API_URL (disk-cached, see zeabur_schema), or None."""
+        if not self._schema_loaded:
+            from zeabur_schema import load_schema
+
+            try:
+                self._schema = load_schema(lambda: self._execute("Introspect"), self.API_URL)
+            except Exception:
+                self._schema = None
+            self._schema_loaded = True
+        return self._schema
+
+    def _gql(self, operation: str, variables: dict = None) -> dict:
+        """Run a named operation from zeabur_ops.OPERATIONS with variables."""
+        data = self._execute(operation, variables)
         if "errors" in data:
             raise RuntimeError(f"GraphQL error: {json.dumps(data['errors'], indent=2)}")
         return data["data"]
 
+    def _execute(self, operation: str, variables: dict = None) -> dict:
+        """Run an operation and return the raw response (data and/or errors)."""
+        from zeabur_ops import execute
+
+        def post(body):
+            r = self.session.post(self.API_URL, headers=self.headers, json=body, timeout=30)
+            try:
+                data = r.json()
+            except ValueError:
+                r.raise_for_status()
+                raise
+            if not r.ok and not (isinstance(data, dict) and "errors" in data):
+                r.raise_for_status()
+            return data
+
+        return execute(post, self.API_URL, operation, variables)
+
+    def _stream(self, operation: str, stream_path: tuple, variables: dict = None):
+        """Yield elements of the array at stream_path as the (compressed) response arrives."""
+        from json_stream import JSONStreamSplitter, accept_encoding
+        from zeabur_ops import request_body
+
+        body = request_body(self.API_URL, operation, variables, force_query=True)
+        headers = dict(self.headers, **{"Accept-Encoding": accept_encoding()})
+        splitter = JSONStreamSplitter([stream_path])
+        with self.session.post(self.API_URL, headers=headers, json=body, timeout=30, stream=True) as r:
+            r.raise_for_status()
+            # iter_content undoes Content-Encoding (gzip/br) chunk by chunk.
+            for chunk in r.iter_content(chunk_size=65536):
+                for _, item in splitter.feed(chunk):
+                    yield item
+        splitter.close()
+        errors = splitter.captured.get(("errors",))
+        if errors:
+            raise RuntimeError(f"GraphQL error: {json.dumps(errors, indent=2)}")
+
     # === User ===
     def verify(self) -> dict:
-        """Verify token and return user info."""
-        return self._gql("query{user{name username}}")["user"]
+        """Verify token and return user info (me or user, per the schema)."""
+        from zeabur_schema import viewer_operation
+
+        op = viewer_operation(self.schema)
+        return self._gql(op)[op.lower()]
 
     # === Servers ===
     def list_servers(self) -> list:
-        """List all dedicated servers."""
-        return self._gql("query{servers{_id hostname status ip}}")["servers"]
+        """List all dedicated servers, with every optional field the schema offers."""
+        from zeabur_schema import servers_operation
+
+        return self._gql(servers_operation(self.schema) if self.schema else "ServersDetailed")["servers"]
 
     # === Projects ===
     def create_project(self, region: str, name: str = "openclaw") -> str:
         """Create project and return project ID."""
-        data = self._gql(f'mutation{{createProject(region:"{region}",name:"{name}"){{_id}}}}')
+        data = self._gql("CreateProject", {"region": region, "name": name})
         return data["createProject"]["_id"]
 
     def list_projects(self) -> list:
         """List all projects with services and domains."""
-        data = self._gql(
-            "query{projects{edges{node{_id name services{_id name status domains{domain}} environments{_id name}}}}}"
-        )
-        return [edge["node"] for edge in data["projects"]["edges"]]
+        return list(self.iter_projects())
+
+    def iter_projects(self):
+        """Yield projects (with services and domains) while the listing downloads."""
+        from zeabur_schema import projects_operation
+
+        for edge in self._stream(projects_operation(self.schema), ("data", "projects", "edges")):
+            yield edge["node"]
 
     # === Services ===
     def get_service(self, service_id: str) -> dict:
         """Get service details."""
-        return self._gql(f'query{{service(_id:"{service_id}"){{name status}}}}')["service"]
+        return self._gql("ServiceStatus", {"id": service_id})["service"]
 
     def update_command(self, service_id: str, command: str) -> bool:
         """Update service start command."""
-        return self._gql(f'mutation{{updateServiceCommand(serviceID:"{service_id}",command:"{command}")}}')["updateServiceCommand"]
+        return self._gql("UpdateServiceCommand", {"serviceID": service_id, "command": command})["updateServiceCommand"]
 
     def restart(self, service_id: str, env_id: str) -> bool:
         """Restart a service."""
-        return self._gql(f'mutation{{restartService(serviceID:"{service_id}",environmentID:"{env_id}")}}')["restartService"]
+        return self._gql("RestartService", {"serviceID": service_id, "environmentID": env_id})["restartService"]
 
     # === Environment Variables ===
     def set_env(self, service_id: str, env_id: str, key: str, value: str) -> dict:
         """Create an environment variable."""
-        # Escape value for GraphQL
-        value_escaped = value.replace("\\", "\\\\").replace('"', '\\"')
         return self._gql(
-            f'mutation{{createEnvironmentVariable(serviceID:"{service_id}",environmentID:"{env_id}",key:"{key}",value:"{value_escaped}"){{key value}}}}'
+            "CreateEnvVar", {"serviceID": service_id, "environmentID": env_id, "key": key, "value": value}
         )["createEnvironmentVariable"]
 
     def update_env(self, service_id: str, env_id: str, key: str, value: str):
         """Update an existing environment variable."""
-        value_escaped = value.replace("\\", "\\\\").replace('"', '\\"')
         return self._gql(
-            f'mutation{{updateEnvironmentVariable(serviceID:"{service_id}",environmentID:"{env_id}",data:{{{key}:"{value_escaped}"}})}}'
+            "UpdateEnvVars", {"serviceID": service_id, "environmentID": env_id, "data": {key: value}}
         )["updateEnvironmentVariable"]
 
     # === Domains ===
     def check_domain(self, subdomain: str, region: str) -> dict:
         """Check if a subdomain is available."""
-        return self._gql(
-            f'mutation{{checkDomainAvailable(domain:"{subdomain}",isGenerated:true,region:"{region}"){{isAvailable reason}}}}'
-        )["checkDomainAvailable"]
+        return self._gql("CheckDomain", {"domain": subdomain, "region": region})["checkDomainAvailable"]
+
+    def check_domains(self, subdomains: list, region: str) -> dict:
+        """Check many subdomains in one aliased request. Returns {subdomain: check}."""
+        variables = {"region": region}
+        variables.update({f"d{i}": sub for i, sub in enumerate(subdomains)})
+        data = self._gql(f"CheckDomains{len(subdomains)}", variables)
+        return {sub: data[f"c{i}"] for i, sub in enumerate(subdomains)}
 
     def add_domain(self, service_id: str, env_id: str, subdomain: str) -> str:
         """Add a generated zeabur.app subdomain. Returns full domain."""
-        data = self._gql(
-            f'mutation{{addDomain(serviceID:"{service_id}",environmentID:"{env_id}",isGenerated:true,domain:"{subdomain}"){{domain}}}}'
-        )
+        data = self._gql("AddDomain", {"serviceID": service_id, "environmentID": env_id, "domain": subdomain})
         return data["addDomain"]["domain"]
 
     def remove_domain(self, domain: str) -> bool:
         """Remove a domain."""
-        return self._gql(f'mutation{{removeDomain(domain:"{domain}")}}')["removeDomain"]
+        return self._gql("RemoveDomain", {"domain": domain})["removeDomain"]
 
     # === Deploy ===
     def deploy_template(self, project_id: str, yaml_content: str) -> dict:
         """Deploy a YAML template."""
-        yaml_escaped = yaml_content.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
-        return self._gql(
-            f'mutation{{deployTemplate(projectID:"{project_id}",rawSpecYaml:"{yaml_escaped}"){{_id}}}}'
-        )["deployTemplate"]
+        return self._gql("DeployTemplate", {"projectID": project_id, "yaml": yaml_content})["deployTemplate"]
 
     # === Logs ===
     def runtime_logs(self, project_id: str, service_id: str, env_id: str) -> list:
         """Get runtime logs."""
-        data = self._gql(
-            f'query{{runtimeLogs(projectID:"{project_id}",serviceID:"{service_id}",environmentID:"{env_id}"){{message timestamp}}}}'
+        return list(self.iter_runtime_logs(project_id, service_id, env_id))
+
+    def iter_runtime_logs(self, project_id: str, service_id: str, env_id: str):
+        """Yield runtime log entries ({message, timestamp}) as they arrive."""
+        yield from self._stream(
+            "RuntimeLogs",
+            ("data", "runtimeLogs"),
+            {"projectID": project_id, "serviceID": service_id, "environmentID": env_id},
+        )
+
+    # === Live streams (WebSocket subscriptions, polling fallback) ===
+    @property
+    def ws_url(self) -> str:
+        from zeabur_ws import ws_url
+
+        return ws_url(self.API_URL)
+
+    def watch_runtime_logs(self, project_id: str, service_id: str, env_id: str, since: float = None,
+                           interval: float = 3):
+        """Yield new runtime log entries as they are written; resumes across reconnects."""
+        from zeabur_ws import log_stream, subscription_supported
+
+        yield from log_stream(
+            self.ws_url, self.token,
+            {"projectID": project_id, "serviceID": service_id, "environmentID": env_id},
+            poll=lambda: self.runtime_logs(project_id, service_id, env_id),
+            since=since, interval=interval,
+            supported=subscription_supported(self.schema, "RuntimeLogsSubscription"),
+        )
+
+    def watch_service_status(self, service_id: str, interval: float = 3):
+        """Yield the service status now, on change, and at least every `interval` seconds."""
+        from zeabur_ws import status_stream, subscription_supported
+
+        yield from status_stream(
+            self.ws_url, self.token, service_id,
+            poll=lambda: self.get_service(service_id)["status"],
+            interval=interval,
+            supported=subscription_supported(self.schema, "ServiceStatusSubscription"),
         )
-        return data["runtimeLogs"]
 
     # === Cleanup ===
     def delete_service(self, service_id: str, env_id: str) -> bool:
         """Delete a service."""
-        return self._gql(
-            f'mutation{{deleteService(serviceID:"{service_id}",environmentID:"{env_id}")}}'
-        )["deleteService"]
+        return self._gql("DeleteService", {"serviceID": service_id, "environmentID": env_id})["deleteService"]
 
     def delete_project(self, project_id: str) -> bool:
         """Delete a project."""
-        return self._gql(f'mutation{{deleteProject(projectID:"{project_id}")}}')["deleteProject"]
+        return self._gql("DeleteProject", {"projectID": project_id})["deleteProject"]
+
+    # === Generated operations ===
+    def run(self, operation: str, variables: dict = None) -> dict:
+        """Run an operation registered with zeabur_ops.define() and return its data."""
+        return self._gql(operation, variables)
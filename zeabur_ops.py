@@ -0,0 +1,221 @@
+"""
+Named Zeabur GraphQL operations, sent with variables and automatic persisted queries.
+
+Every document the tools send lives in OPERATIONS and takes its values through
+`variables`, so nothing is string-interpolated or hand-escaped. Documents are
+compacted and hashed once per process.
+
+Automatic persisted queries (APQ): the first request for an operation carries
+the document plus its sha256 (registering it on servers that support APQ);
+later requests send only the hash. If an endpoint answers a hash-only request
+with a request-level error (nothing was executed), the document is re-sent and,
+unless the error was PersistedQueryNotFound, APQ is switched off for that
+endpoint.
+
+Usage:
+    from zeabur_ops import request_body, handle_apq_response
+    body = request_body(endpoint, "ServiceStatus", {"id": service_id})
+"""
+
+import json
+import re
+import threading
+
+OPERATIONS = {
+    # === Schema (see zeabur_schema) ===
+    "Introspect": """
+        query Introspect{__schema{types{kind name enumValues{name} fields{
+            name args{name type{kind name ofType{kind name ofType{kind name}}}}
+            type{kind name ofType{kind name ofType{kind name ofType{kind name}}}}
+        }}}}""",
+    # === User ===
+    "Me": "query Me{me{username}}",
+    "User": "query User{user{name username}}",
+    # === Servers ===
+    "Servers": "query Servers{servers{_id name ip}}",
+    "ServersDetailed": "query ServersDetailed{servers{_id hostname status ip}}",
+    # === Projects ===
+    "ProjectNames": "query ProjectNames{projects{edges{node{_id name}}}}",
+    "Projects": """
+        query Projects{projects{edges{node{
+            _id name
+            services{_id name status domains{domain}}
+            environments{_id name}
+        }}}}""",
+    "ProjectServices": """
+        query ProjectServices($id:ObjectID!){project(_id:$id){
+            services{_id name} environments{_id name}
+        }}""",
+    "CreateProject": """
+        mutation CreateProject($region:String!,$name:String!){
+            createProject(region:$region,name:$name){_id}
+        }""",
+    "DeleteProject": "mutation DeleteProject($projectID:ObjectID!){deleteProject(projectID:$projectID)}",
+    # === Services ===
+    "ServiceStatus": "query ServiceStatus($id:ObjectID!){service(_id:$id){name status}}",
+    "UpdateServiceCommand": """
+        mutation UpdateServiceCommand($serviceID:ObjectID!,$command:String!){
+            updateServiceCommand(serviceID:$serviceID,command:$command)
+        }""",
+    "UpdateServiceImage": """
+        mutation UpdateServiceImage($serviceID:ObjectID!,$environmentID:ObjectID!,$tag:String!){
+            updateServiceImage(serviceID:$serviceID,environmentID:$environmentID,tag:$tag)
+        }""",
+    "ExecuteCommand": """
+        mutation ExecuteCommand($serviceID:ObjectID!,$environmentID:ObjectID!,$command:[String!]!){
+            executeCommand(serviceID:$serviceID,environmentID:$environmentID,command:$command){exitCode output}
+        }""",
+    "RestartService": """
+        mutation RestartService($serviceID:ObjectID!,$environmentID:ObjectID!){
+            restartService(serviceID:$serviceID,environmentID:$environmentID)
+        }""",
+    "DeleteService": """
+        mutation DeleteService($serviceID:ObjectID!,$environmentID:ObjectID!){
+            deleteService(serviceID:$serviceID,environmentID:$environmentID)
+        }""",
+    # === Environment Variables ===
+    "CreateEnvVar": """
+        mutation CreateEnvVar($serviceID:ObjectID!,$environmentID:ObjectID!,$key:String!,$value:String!){
+            createEnvironmentVariable(serviceID:$serviceID,environmentID:$environmentID,key:$key,value:$value){key value}
+        }""",
+    "UpdateEnvVars": """
+        mutation UpdateEnvVars($serviceID:ObjectID!,$environmentID:ObjectID!,$data:Map!){
+            updateEnvironmentVariable(serviceID:$serviceID,environmentID:$environmentID,data:$data)
+        }""",
+    # === Domains ===
+    "CheckDomain": """
+        mutation CheckDomain($domain:String!,$region:String!){
+            checkDomainAvailable(domain:$domain,isGenerated:true,region:$region){isAvailable reason}
+        }""",
+    "AddDomain": """
+        mutation AddDomain($serviceID:ObjectID!,$environmentID:ObjectID!,$domain:String!){
+            addDomain(serviceID:$serviceID,environmentID:$environmentID,isGenerated:true,domain:$domain){domain}
+        }""",
+    "RemoveDomain": "mutation RemoveDomain($domain:String!){removeDomain(domain:$domain)}",
+    # === Deploy ===
+    "DeployTemplate": """
+        mutation DeployTemplate($projectID:ObjectID!,$yaml:String!){
+            deployTemplate(projectID:$projectID,rawSpecYaml:$yaml){_id}
+        }""",
+    # === Logs ===
+    "RuntimeLogs": """
+        query RuntimeLogs($projectID:ObjectID!,$serviceID:ObjectID!,$environmentID:ObjectID!){
+            runtimeLogs(projectID:$projectID,serviceID:$serviceID,environmentID:$environmentID){message timestamp}
+        }""",
+    # === Subscriptions (see zeabur_ws; only used where the schema has them) ===
+    "RuntimeLogsSubscription": """
+        subscription RuntimeLogsSubscription($projectID:ObjectID!,$serviceID:ObjectID!,$environmentID:ObjectID!){
+            runtimeLogReceived(projectID:$projectID,serviceID:$serviceID,environmentID:$environmentID){message timestamp}
+        }""",
+    "ServiceStatusSubscription": """
+        subscription ServiceStatusSubscription($serviceID:ObjectID!){
+            serviceStatusChanged(serviceID:$serviceID){status}
+        }""",
+}
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+# endpoint -> False once APQ is known to be unsupported there
+_apq_enabled = {}
+# (endpoint, sha256) pairs whose document the endpoint has already seen
+_apq_registered = set()
+
+
+def _compact(document: str) -> str:
+    return re.sub(r"\s+", " ", document).strip().replace("{ ", "{").replace(" }", "}")
+
+
+def check_domains_document(count: int) -> str:
+    """Aliased batch of `count` checkDomainAvailable fields ($d0..$dN, shared $region)."""
+    params = ",".join(f"$d{i}:String!" for i in range(count))
+    fields = " ".join(
+        f"c{i}:checkDomainAvailable(domain:$d{i},isGenerated:true,region:$region){{isAvailable reason}}"
+        for i in range(count)
+    )
+    return f"mutation CheckDomains{count}($region:String!,{params}){{{fields}}}"
+
+
+def define(name: str, document: str) -> str:
+    """Register (or replace) a generated document under `name`. Returns the name."""
+    with _compiled_lock:
+        if OPERATIONS.get(name) != document:
+            OPERATIONS[name] = document
+            _compiled.pop(name, None)
+    return name
+
+
+def operation(name: str) -> tuple:
+    """Return (operationName, compact document, sha256) for a registered name.
+
+    `CheckDomainsN` is generated on demand for any batch size N.
+    """
+    with _compiled_lock:
+        if name not in _compiled:
+            import hashlib
+
+            if name in OPERATIONS:
+                document = OPERATIONS[name]
+            elif name.startswith("CheckDomains") and name[len("CheckDomains"):].isdigit():
+                document = check_domains_document(int(name[len("CheckDomains"):]))
+            else:
+                raise KeyError(f"Unknown GraphQL operation: {name}")
+            document = _compact(document)
+            _compiled[name] = (name, document, hashlib.sha256(document.encode()).hexdigest())
+        return _compiled[name]
+
+
+def request_body(endpoint: str, name: str, variables: dict = None, force_query: bool = False) -> dict:
+    """Build the JSON body for one operation against `endpoint`.
+
+    Sends the hash alone when the endpoint has already seen this document.
+    """
+    op_name, document, sha = operation(name)
+    body = {"operationName": op_name, "variables": variables or {}}
+    if _apq_enabled.get(endpoint, True):
+        body["extensions"] = {"persistedQuery": {"version": 1, "sha256Hash": sha}}
+        if force_query or (endpoint, sha) not in _apq_registered:
+            body["query"] = document
+    else:
+        body["query"] = document
+    return body
+
+
+def handle_apq_response(endpoint: str, body: dict, data) -> bool:
+    """Record APQ state from a response. Returns True if the request must be re-sent with the document.
+
+    Only request-level errors (no data, no error paths) trigger a retry: they
+    guarantee nothing was executed, so mutations are never run twice.
+    """
+    persisted = (body.get("extensions") or {}).get("persistedQuery")
+    if not persisted or not isinstance(data, dict):
+        return False
+    sha = persisted["sha256Hash"]
+    if "query" in body:
+        if data.get("data") is not None:
+            _apq_registered.add((endpoint, sha))
+        return False
+    errors = data.get("errors")
+    request_level = not data.get("data") and not any(
+        e.get("path") for e in (errors or []) if isinstance(e, dict)
+    )
+    if not request_level:
+        return False
+    text = json.dumps(errors or data)
+    if "PersistedQueryNotFound" not in text:
+        _apq_enabled[endpoint] = False
+    _apq_registered.discard((endpoint, sha))
+    return True
+
+
+def execute(post, endpoint: str, name: str, variables: dict = None):
+    """Run one operation through a transport callable `post(body) -> parsed JSON`.
+
+    Handles the APQ retry; the transport keeps its own HTTP error handling.
+    """
+    body = request_body(endpoint, name, variables)
+    data = post(body)
+    if handle_apq_response(endpoint, body, data):
+        body = request_body(endpoint, name, variables, force_query=True)
+        data = post(body)
+        handle_apq_response(endpoint, body, data)
+    return data
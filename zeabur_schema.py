@@ -0,0 +1,230 @@
+"""
+Per-endpoint Zeabur schema introspection, cached on disk.
+
+The API's shape drifts between versions (`me` vs `user`, server fields such as
+`status`). Instead of finding out through a failed request, the tools
+introspect each endpoint once, keep a compact field map on disk for a TTL,
+and build their selections from it up front: optional fields are only asked
+for where they exist.
+
+If an endpoint reports introspection as disabled, that is cached too and
+callers fall back to the static documents in zeabur_ops.OPERATIONS. Any other
+failure returns None for this run only, so the next run introspects again.
+Documents built from a schema are registered under per-endpoint names, since
+two endpoints can differ.
+
+Cache file (default .openclaw-schema.json, or OPENCLAW_SCHEMA_CACHE):
+    {"<endpoint>": {"version": 2, "fetched_at": ...,
+                    "types": {"Server": {"status": ["ENUM", "ServerStatus", false]},
+                              "Service": {"metric": ["OBJECT", "Metric", true, {"metricType": ["ENUM", "MetricType", true]}]}},
+                    "enums": {"MetricType": ["CPU", "MEMORY", "NETWORK"]}}}
+
+Usage:
+    from zeabur_schema import load_schema, servers_operation
+    schema = load_schema(lambda: post(introspection_body), endpoint)
+    data = gql(token, servers_operation(schema))
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+
+DEFAULT_SCHEMA_CACHE = ".openclaw-schema.json"
+DEFAULT_TTL = 24 * 3600
+SCHEMA_VERSION = 2  # bump when the compact format changes; older entries are re-fetched
+LEAF_KINDS = ("SCALAR", "ENUM")
+
+# Server fields worth showing when the schema has them (besides _id name ip).
+SERVER_OPTIONAL_FIELDS = ("hostname", "status", "provider", "country", "city")
+
+# Error messages of servers that turn introspection off (Apollo, graphql-js rules).
+INTROSPECTION_DISABLED_RE = re.compile(r"introspection|__schema", re.I)
+
+
+def cache_path(path: str = None) -> str:
+    return path or os.environ.get("OPENCLAW_SCHEMA_CACHE") or DEFAULT_SCHEMA_CACHE
+
+
+def _named_type(ref: dict) -> tuple:
+    while ref.get("ofType") and ref["kind"] in ("NON_NULL", "LIST"):
+        ref = ref["ofType"]
+    return ref["kind"], ref.get("name")
+
+
+def _compact_field(f: dict) -> list:
+    args = f.get("args") or []
+    entry = [*_named_type(f["type"]), any(a["type"]["kind"] == "NON_NULL" for a in args)]
+    if args:
+        entry.append({a["name"]: [*_named_type(a["type"]), a["type"]["kind"] == "NON_NULL"] for a in args})
+    return entry
+
+
+def compact_types(introspection: dict) -> dict:
+    """{type: {field: [kind, named type, has required args, {arg: [kind, type, required]}?]}} for object types."""
+    types = {}
+    for t in introspection["__schema"]["types"]:
+        if t["kind"] != "OBJECT" or t["name"].startswith("__") or not t.get("fields"):
+            continue
+        types[t["name"]] = {f["name"]: _compact_field(f) for f in t["fields"]}
+    return types
+
+
+def compact_enums(introspection: dict) -> dict:
+    """{enum type: [values]}."""
+    return {
+        t["name"]: [v["name"] for v in t.get("enumValues") or []]
+        for t in introspection["__schema"]["types"]
+        if t["kind"] == "ENUM" and not t["name"].startswith("__")
+    }
+
+
+def introspection_disabled(data) -> bool:
+    """True when a response's errors say the endpoint refuses introspection."""
+    errors = data.get("errors") if isinstance(data, dict) else None
+    return bool(errors) and any(
+        INTROSPECTION_DISABLED_RE.search(str(e.get("message", "") if isinstance(e, dict) else e)) for e in errors
+    )
+
+
+class Schema:
+    def __init__(self, types: dict, enums: dict = None, endpoint: str = None):
+        self.types = types
+        self.enums = enums or {}
+        self.endpoint = endpoint
+
+    def operation_name(self, base: str) -> str:
+        """`base` suffixed with a short endpoint hash, for documents built from this schema."""
+        if not self.endpoint:
+            return base
+        return f"{base}_{hashlib.sha256(self.endpoint.encode()).hexdigest()[:8]}"
+
+    def fields(self, type_name: str) -> dict:
+        return self.types.get(type_name, {})
+
+    def has(self, type_name: str, field: str) -> bool:
+        return field in self.fields(type_name)
+
+    def field_type(self, type_name: str, field: str) -> str:
+        return self.fields(type_name).get(field, [None, None])[1]
+
+    def args(self, type_name: str, field: str) -> dict:
+        """{arg: [kind, named type, required]} of a field."""
+        entry = self.fields(type_name).get(field) or []
+        return entry[3] if len(entry) > 3 else {}
+
+    def enum_values(self, enum_name: str) -> list:
+        return self.enums.get(enum_name, [])
+
+    def selection(self, type_name: str, names) -> list:
+        """Selections for the `names` that exist on type_name (objects expand to their leaf fields)."""
+        out = []
+        fields = self.fields(type_name)
+        for name in names:
+            if name not in fields or fields[name][2]:
+                continue
+            kind, target = fields[name][:2]
+            if kind in LEAF_KINDS:
+                out.append(name)
+            elif kind == "OBJECT":
+                leaves = [f for f, (k, _, req, *_) in self.fields(target).items() if k in LEAF_KINDS and not req]
+                if leaves:
+                    out.append(f"{name}{{{' '.join(leaves)}}}")
+        return out
+
+
+def _read_cache(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+
+def _write_cache(path: str, endpoint: str, entry: dict):
+    import tempfile
+
+    cache = _read_cache(path)
+    cache[endpoint] = entry
+    # A unique temp file per writer: several threads may refresh at once.
+    fd, tmp_path = tempfile.mkstemp(prefix=".schema-", suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+_loaded = {}
+
+
+def load_schema(fetch, endpoint: str, ttl: float = DEFAULT_TTL, path: str = None):
+    """Schema for `endpoint`, or None when introspection is unavailable.
+
+    `fetch()` runs the Introspect operation and returns the parsed response; it
+    is only called when the disk cache is missing or older than ttl. Only an
+    introspection-disabled answer is cached as such; transport errors propagate
+    and other failed responses return None, neither of them cached.
+    """
+    path = cache_path(path)
+    entry = _loaded.get(endpoint) or _read_cache(path).get(endpoint)
+    if not entry or entry.get("version") != SCHEMA_VERSION or time.time() - entry.get("fetched_at", 0) > ttl:
+        data = fetch()
+        entry = {"version": SCHEMA_VERSION, "fetched_at": time.time()}
+        if isinstance(data, dict) and (data.get("data") or {}).get("__schema"):
+            entry.update(types=compact_types(data["data"]), enums=compact_enums(data["data"]))
+        elif introspection_disabled(data):
+            entry["disabled"] = True
+        else:
+            return None
+        _write_cache(path, endpoint, entry)
+    _loaded[endpoint] = entry
+    return None if entry.get("disabled") else Schema(entry["types"], entry.get("enums"), endpoint)
+
+
+# === Selections ===
+def viewer_operation(schema) -> str:
+    """'Me' or 'User', whichever root field the endpoint has."""
+    if schema and not schema.has("Query", "me") and schema.has("Query", "user"):
+        return "User"
+    return "Me"
+
+
+def servers_operation(schema) -> str:
+    """Servers query including whichever optional server fields exist."""
+    from zeabur_ops import define
+
+    if not schema or not schema.has("Query", "servers"):
+        return "Servers"
+    server_type = schema.field_type("Query", "servers")
+    fields = ["_id", "name", "ip"] + schema.selection(server_type, SERVER_OPTIONAL_FIELDS)
+    name = schema.operation_name("ServersAuto")
+    return define(name, f"query {name}{{servers{{{' '.join(fields)}}}}}")
+
+
+def projects_operation(schema) -> str:
+    """Projects listing, adding the project region when the schema has it."""
+    from zeabur_ops import define
+
+    if not schema or not schema.has("Project", "region"):
+        return "Projects"
+    kind, target = schema.fields("Project")["region"][:2]
+    if kind in LEAF_KINDS:
+        region = "region"
+    elif schema.has(target, "id"):
+        region = "region{id}"
+    else:
+        return "Projects"
+    name = schema.operation_name("ProjectsAuto")
+    return define(name, f"""
+        query {name}{{projects{{edges{{node{{
+            _id name {region}
+            services{{_id name status domains{{domain}}}}
+            environments{{_id name}}
+        }}}}}}}}""")
@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+GraphQL-over-WebSocket subscriptions for Zeabur log and status streams.
+
+A small stdlib RFC 6455 client speaking the graphql-transport-ws protocol.
+`log_stream` and `status_stream` prefer a subscription and fall back to
+polling when the endpoint has no such subscription (per the cached schema, a
+refused upgrade, or a GraphQL error). Dropped connections are re-established
+with backoff; each reconnect first backfills with one poll so nothing between
+the drop and the resubscribe is lost, and entries at or before the last
+delivered timestamp are skipped.
+
+`start_stand_in()` runs a local subscription server for offline testing.
+
+Usage:
+    python zeabur_ws.py logs --env-file .env --bot my-bot      # tail -f a bot's runtime logs
+    python zeabur_ws.py status --env-file .env --bot my-bot
+    python zeabur_ws.py --local                                # demo against the local stand-in
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+import time
+
+from log_archive import parse_timestamp
+
+SUBPROTOCOL = "graphql-transport-ws"
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Subscription operation -> root field it needs (see zeabur_ops.OPERATIONS).
+SUBSCRIPTION_FIELDS = {
+    "RuntimeLogsSubscription": "runtimeLogReceived",
+    "ServiceStatusSubscription": "serviceStatusChanged",
+}
+
+OP_TEXT, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x8, 0x9, 0xA
+
+
+class WebSocketClosed(Exception):
+    """Connection dropped or closed by the peer."""
+
+
+class SubscriptionUnavailable(Exception):
+    """The endpoint can't serve this subscription; poll instead."""
+
+
+def ws_url(api_url: str) -> str:
+    return "wss://" + api_url[len("https://"):] if api_url.startswith("https://") else \
+        "ws://" + api_url.removeprefix("http://")
+
+
+def subscription_supported(schema, operation: str):
+    """True/False from the schema, None when unknown (no schema)."""
+    if schema is None:
+        return None
+    return schema.has("Subscription", SUBSCRIPTION_FIELDS[operation])
+
+
+# === Framing (RFC 6455) ===
+def _mask(data: bytes, key: bytes) -> bytes:
+    n = len(data)
+    if not n:
+        return data
+    k = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(k, "big")).to_bytes(n, "big")
+
+
+def encode_frame(opcode: int, payload: bytes, masked: bool) -> bytes:
+    n = len(payload)
+    head = bytes([0x80 | opcode])
+    mask_bit = 0x80 if masked else 0
+    if n < 126:
+        head += bytes([mask_bit | n])
+    elif n < 65536:
+        head += bytes([mask_bit | 126]) + n.to_bytes(2, "big")
+    else:
+        head += bytes([mask_bit | 127]) + n.to_bytes(8, "big")
+    if masked:
+        key = os.urandom(4)
+        return head + key + _mask(payload, key)
+    return head + payload
+
+
+def read_frame(recv_exact) -> tuple:
+    """Read one frame via recv_exact(n). Returns (fin, opcode, payload)."""
+    b0, b1 = recv_exact(2)
+    n = b1 & 0x7F
+    if n == 126:
+        n = int.from_bytes(recv_exact(2), "big")
+    elif n == 127:
+        n = int.from_bytes(recv_exact(8), "big")
+    key = recv_exact(4) if b1 & 0x80 else None
+    payload = recv_exact(n) if n else b""
+    return bool(b0 & 0x80), b0 & 0x0F, _mask(payload, key) if key else payload
+
+
+def _accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+
+
+class WebSocket:
+    """Minimal client: text messages, ping/pong, close. Not thread-safe."""
+
+    def __init__(self, url: str, headers: dict = None, subprotocol: str = SUBPROTOCOL, timeout: float = 10):
+        import socket
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(url)
+        secure = parts.scheme == "wss"
+        host = parts.hostname
+        port = parts.port or (443 if secure else 80)
+        sock = socket.create_connection((host, port), timeout=timeout)
+        if secure:
+            import ssl
+
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=host)
+        self.sock = sock
+        self._buf = b""
+
+        key = base64.b64encode(os.urandom(16)).decode()
+        lines = [
+            f"GET {parts.path or '/'}{'?' + parts.query if parts.query else ''} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            "Upgrade: websocket",
+            "Connection: Upgrade",
+            f"Sec-WebSocket-Key: {key}",
+            "Sec-WebSocket-Version: 13",
+            f"Sec-WebSocket-Protocol: {subprotocol}",
+        ]
+        lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        sock.sendall(("\r\n".join(lines) + "\r\n\r\n").encode())
+
+        while b"\r\n\r\n" not in self._buf:
+            chunk = sock.recv(4096)
+            if not chunk:
+                raise SubscriptionUnavailable("connection closed during WebSocket handshake")
+            self._buf += chunk
+        head, self._buf = self._buf.split(b"\r\n\r\n", 1)
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        if " 101 " not in f"{status_line} ":
+            sock.close()
+            raise SubscriptionUnavailable(f"WebSocket upgrade refused: {status_line}")
+        response_headers = {k.strip().lower(): v.strip() for k, v in (l.split(":", 1) for l in header_lines if ":" in l)}
+        if response_headers.get("sec-websocket-accept") != _accept_key(key):
+            sock.close()
+            raise SubscriptionUnavailable("bad Sec-WebSocket-Accept")
+
+    def _recv_exact(self, n: int) -> bytes:
+        while len(self._buf) < n:
+            chunk = self.sock.recv(max(65536, n - len(self._buf)))
+            if not chunk:
+                raise WebSocketClosed("connection closed")
+            self._buf += chunk
+        data, self._buf = self._buf[:n], self._buf[n:]
+        return data
+
+    def settimeout(self, timeout: float):
+        self.sock.settimeout(timeout)
+
+    def send(self, text: str):
+        self.sock.sendall(encode_frame(OP_TEXT, text.encode(), masked=True))
+
+    def recv(self) -> str:
+        """Next text message. Raises WebSocketClosed, or socket.timeout when idle."""
+        parts = []
+        while True:
+            fin, opcode, payload = read_frame(self._recv_exact)
+            if opcode == OP_PING:
+                self.sock.sendall(encode_frame(OP_PONG, payload, masked=True))
+            elif opcode == OP_CLOSE:
+                try:
+                    self.sock.sendall(encode_frame(OP_CLOSE, payload[:2], masked=True))
+                finally:
+                    raise WebSocketClosed(f"closed by peer ({int.from_bytes(payload[:2], 'big') if payload else 1005})")
+            elif opcode != OP_PONG:
+                parts.append(payload)
+                if fin:
+                    return b"".join(parts).decode("utf-8")
+
+    def close(self):
+        try:
+            self.sock.sendall(encode_frame(OP_CLOSE, (1000).to_bytes(2, "big"), masked=True))
+        except OSError:
+            pass
+        self.sock.close()
+
+
+# === graphql-transport-ws ===
+class Subscription:
+    """One subscription on its own connection. Iterate with next_data()."""
+
+    def __init__(self, url: str, token: str, operation: str, variables: dict, timeout: float = 10):
+        from zeabur_ops import operation as compiled
+
+        self.ws = WebSocket(url, {"Authorization": f"Bearer {token}"}, timeout=timeout)
+        self.ws.send(json.dumps({"type": "connection_init", "payload": {"Authorization": f"Bearer {token}"}}))
+        while True:
+            msg = json.loads(self.ws.recv())
+            if msg["type"] == "connection_ack":
+                break
+            if msg["type"] == "ping":
+                self.ws.send(json.dumps({"type": "pong"}))
+        name, document, _ = compiled(operation)
+        self.ws.send(json.dumps({
+            "id": "1", "type": "subscribe",
+            "payload": {"operationName": name, "query": document, "variables": variables},
+        }))
+
+    def next_data(self, idle_timeout: float):
+        """Next `data` payload; None after idle_timeout seconds without one."""
+        import socket
+
+        self.ws.settimeout(idle_timeout)
+        while True:
+            try:
+                msg = json.loads(self.ws.recv())
+            except socket.timeout:
+                return None
+            kind = msg.get("type")
+            if kind == "next":
+                payload = msg.get("payload") or {}
+                if payload.get("errors") and not payload.get("data"):
+                    raise SubscriptionUnavailable(payload["errors"][0].get("message"))
+                return payload.get("data")
+            if kind == "error":
+                raise SubscriptionUnavailable((msg.get("payload") or [{}])[0].get("message", "subscription error"))
+            if kind == "complete":
+                raise WebSocketClosed("subscription completed by server")
+            if kind == "ping":
+                self.ws.send(json.dumps({"type": "pong"}))
+
+    def close(self):
+        self.ws.close()
+
+
+def _backoff(attempt: int) -> float:
+    return min(30.0, 0.5 * 2 ** attempt)
+
+
+def log_stream(url: str, token: str, variables: dict, poll, since: float = None,
+               interval: float = 3, supported=None, max_reconnects: int = None):
+    """Yield new runtime log entries ({message, timestamp}) forever.
+
+    poll() returns the current runtimeLogs list; it backfills on (re)connect and
+    is the transport when subscriptions are unavailable (supported=False skips
+    the WebSocket attempt).
+    """
+    last_ts, seen = since, set()
+
+    def fresh(entries):
+        nonlocal last_ts, seen
+        for entry in sorted(entries, key=lambda e: parse_timestamp(e["timestamp"])):
+            ts = parse_timestamp(entry["timestamp"])
+            key = (entry["timestamp"], entry["message"])
+            if last_ts is not None and (ts < last_ts or (ts == last_ts and key in seen)):
+                continue
+            if ts != last_ts:
+                last_ts, seen = ts, set()
+            seen.add(key)
+            yield entry
+
+    use_ws = supported is not False
+    attempt = 0
+    while True:
+        yield from fresh(poll())
+        if not use_ws:
+            time.sleep(interval)
+            continue
+        try:
+            sub = Subscription(url, token, "RuntimeLogsSubscription", variables)
+        except SubscriptionUnavailable:
+            use_ws = False
+            continue
+        except (OSError, WebSocketClosed):
+            attempt += 1
+            if max_reconnects is not None and attempt > max_reconnects:
+                use_ws = False
+            else:
+                time.sleep(_backoff(attempt))
+            continue
+        try:
+            attempt = 0
+            while True:
+                data = sub.next_data(idle_timeout=max(interval, 30))
+                if data:
+                    yield from fresh([data[SUBSCRIPTION_FIELDS["RuntimeLogsSubscription"]]])
+        except SubscriptionUnavailable:
+            use_ws = False
+        except (OSError, WebSocketClosed):
+            attempt += 1
+            time.sleep(_backoff(attempt))
+        finally:
+            sub.close()
+
+
+def status_stream(url: str, token: str, service_id: str, poll, interval: float = 3, supported=None,
+                  max_reconnects: int = 3):
+    """Yield the service status now, on every change, and at least every `interval` seconds.
+
+    The periodic repeat lets callers enforce their own deadlines, including while
+    the WebSocket cannot connect; after max_reconnects failed connects in a row
+    the stream falls back to polling (None retries forever).
+    """
+    status = poll()
+    yield status
+    use_ws = supported is not False
+    attempt = 0
+    while True:
+        if use_ws:
+            try:
+                sub = Subscription(url, token, "ServiceStatusSubscription", {"serviceID": service_id})
+            except SubscriptionUnavailable:
+                use_ws = False
+            except (OSError, WebSocketClosed):
+                attempt += 1
+                if max_reconnects is not None and attempt > max_reconnects:
+                    use_ws = False
+                else:
+                    time.sleep(min(interval, _backoff(attempt)))
+                    status = poll()
+                    yield status
+            else:
+                try:
+                    attempt = 0
+                    status = poll()  # catch changes made while (re)connecting
+                    yield status
+                    while True:
+                        data = sub.next_data(idle_timeout=interval)
+                        if data:
+                            status = data[SUBSCRIPTION_FIELDS["ServiceStatusSubscription"]]["status"]
+                        yield status
+                except SubscriptionUnavailable:
+                    use_ws = False
+                except (OSError, WebSocketClosed):
+                    pass
+                finally:
+                    sub.close()
+            continue
+        time.sleep(interval)
+        status = poll()
+        yield status
+
+
+# === Local stand-in ===
+def start_stand_in(events, drop_after: int = None, port: int = 0):
+    """Serve graphql-transport-ws on 127.0.0.1 for offline testing.
+
+    events(operation_name, variables) returns the `data` payloads to send. When
+    drop_after is set, the first connection is cut after that many payloads so
+    clients can exercise reconnect + resume. Returns (server, ws_url).
+    """
+    import socketserver
+    import threading
+
+    state = {"connections": 0}
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            sock = self.request
+            buf = b""
+            while b"\r\n\r\n" not in buf:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    return
+                buf += chunk
+            head, buf = buf.split(b"\r\n\r\n", 1)
+            headers = {k.strip().lower(): v.strip() for k, v in
+                       (l.split(":", 1) for l in head.decode("latin-1").split("\r\n")[1:] if ":" in l)}
+            sock.sendall((
+                "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {_accept_key(headers['sec-websocket-key'])}\r\n"
+                f"Sec-WebSocket-Protocol: {SUBPROTOCOL}\r\n\r\n"
+            ).encode())
+            pending = [buf]
+
+            def recv_exact(n):
+                data = pending[0]
+                while len(data) < n:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        raise WebSocketClosed("client gone")
+                    data += chunk
+                pending[0] = data[n:]
+                return data[:n]
+
+            def send(msg):
+                sock.sendall(encode_frame(OP_TEXT, json.dumps(msg).encode(), masked=False))
+
+            state["connections"] += 1
+            first = state["connections"] == 1
+            try:
+                while True:
+                    _, opcode, payload = read_frame(recv_exact)
+                    if opcode == OP_CLOSE:
+                        return
+                    msg = json.loads(payload)
+                    if msg["type"] == "connection_init":
+                        send({"type": "connection_ack"})
+                    elif msg["type"] == "subscribe":
+                        op = msg["payload"]["operationName"]
+                        for i, data in enumerate(events(op, msg["payload"].get("variables") or {})):
+                            if first and drop_after is not None and i >= drop_after:
+                                return
+                            send({"id": msg["id"], "type": "next", "payload": {"data": data}})
+            except (WebSocketClosed, OSError):
+                return
+
+    class Server(socketserver.ThreadingTCPServer):
+        daemon_threads = True
+        allow_reuse_address = True
+
+    server = Server(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"ws://127.0.0.1:{server.server_address[1]}/graphql"
+
+
+def _local_demo():
+    """Stream logs from the stand-in, which drops the first connection mid-stream,
+    then follow status against an unreachable endpoint."""
+    from datetime import datetime, timezone
+
+    base = time.time() - 60
+    lines = [{"message": f"line {i}", "timestamp": datetime.fromtimestamp(base + i, timezone.utc).isoformat()}
+             for i in range(10)]
+    delivered = {"count": 0}
+
+    def events(op, variables):
+        for entry in lines:
+            yield {"runtimeLogReceived": entry}
+            delivered["count"] += 1
+            time.sleep(0.05)
+
+    def poll():
+        # Backfill: everything "written" so far.
+        return lines[:delivered["count"] + 1]
+
+    _, url = start_stand_in(events, drop_after=4)
+    print(f"Stand-in at {url} (drops the first connection after 4 lines)")
+    got = []
+    for entry in log_stream(url, "local", {}, poll, interval=0.2):
+        print(f"  {entry['timestamp']} | {entry['message']}")
+        got.append(entry["message"])
+        if len(got) == len(lines):
+            break
+    ok = got == [l["message"] for l in lines]
+    print(f"{'OK' if ok else 'FAIL'}: {len(got)} unique line(s), in order, across a reconnect")
+
+    # Nothing listens on port 1: the status stream must keep yielding so callers
+    # can enforce deadlines, then settle on polling.
+    polls = {"count": 0}
+
+    def poll_status():
+        polls["count"] += 1
+        return "RUNNING"
+
+    started = time.time()
+    stream = status_stream("ws://127.0.0.1:1/graphql", "local", "svc", poll_status, interval=0.1)
+    statuses = [next(stream) for _ in range(8)]
+    unreachable_ok = statuses == ["RUNNING"] * 8 and polls["count"] == 8 and time.time() - started < 5
+    print(f"{'OK' if unreachable_ok else 'FAIL'}: status stream kept yielding with the endpoint unreachable")
+    return ok and unreachable_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Follow OpenClaw logs or status via subscriptions (polling fallback).")
+    parser.add_argument("command", nargs="?", choices=["logs", "status"])
+    parser.add_argument("--zeabur-token", help="Zeabur API token (sk-xxx)")
+    parser.add_argument("--env-file", default=".env", help="Path to .env file (default: .env)")
+    parser.add_argument("--state-file", help="Deployment state store (default: OPENCLAW_STATE_FILE or .openclaw-state.json)")
+    parser.add_argument("--bot", help="Bot name from the state store")
+    parser.add_argument("--interval", type=float, default=3, help="Polling interval when falling back (default: 3)")
+    parser.add_argument("--local", action="store_true", help="Run against a local stand-in and exit")
+    args = parser.parse_args()
+
+    if args.local:
+        sys.exit(0 if _local_demo() else 1)
+    if not args.command or not args.bot:
+        parser.error("logs/status and --bot are required (or use --local)")
+
+    from check_server_status import load_env_file
+    from deploy_state import DEFAULT_STATE_FILE, DeployState
+
+    load_env_file(args.env_file)
+    token = args.zeabur_token or os.environ.get("ZEABUR_TOKEN")
+    if not token:
+        print("Error: missing ZEABUR_TOKEN (set in .env or --zeabur-token).")
+        sys.exit(1)
+    bot = DeployState(args.state_file or os.environ.get("OPENCLAW_STATE_FILE") or DEFAULT_STATE_FILE).get(args.bot)
+    if not bot or not bot.get("service_id"):
+        print(f"Error: bot '{args.bot}' has no service id in the state store.")
+        sys.exit(1)
+
+    from zeabur_api import ZeaburClient
+
+    client = ZeaburClient(token)
+    try:
+        if args.command == "logs":
+            for entry in client.watch_runtime_logs(bot["project_id"], bot["service_id"], bot["environment_id"],
+                                                   interval=args.interval):
+                print(f"{entry['timestamp']} | {entry['message']}", flush=True)
+        else:
+            last = None
+            for status in client.watch_service_status(bot["service_id"], interval=args.interval):
+                if status != last:
+                    print(f"{time.strftime('%H:%M:%S')} {status}", flush=True)
+                    last = status
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()